@@ -0,0 +1,171 @@
+"""
+Mikrobenchmark najczęstszych odczytów: ścieżka ORM kontra prekompilowane zapytania Core
+
+Uruchomienie (z katalogu głównego repozytorium):
+    python -m benchmarks.hot_reads [--debts 20000] [--repeat 20]
+
+Dla każdego odczytu wypisuje przepustowość (wiersze/s) oraz szczytową
+pamięć i liczbę bloków zaalokowanych w jednym wywołaniu (tracemalloc).
+"""
+import argparse
+import time
+import tracemalloc
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import and_, insert, select
+from sqlalchemy.orm import Session, selectinload
+
+from config.config_manager import ConfigManager
+from database.models.debt import Debt
+from database.models.schedule import Schedule
+from models.debt import Debt as DebtModel
+
+GUILD_ID = 1
+
+
+# --- Ścieżka ORM (sprzed zmiany) - punkt odniesienia ---
+
+def orm_get_debts(manager: ConfigManager, guild_id: int, is_settled: bool):
+    with Session(manager.engine) as session:
+        stmt = select(Debt).where(and_(Debt.guild_id == guild_id, Debt.is_settled == is_settled))
+        stmt = stmt.options(selectinload(Debt.reminders))
+        debts = []
+        for result in session.scalars(stmt).all():
+            debt = DebtModel(
+                debtor_id=result.debtor_id,
+                creditor_id=result.creditor_id,
+                amount=result.amount,
+                currency=result.currency,
+                description=result.description,
+                guild_id=result.guild_id,
+                is_settled=result.is_settled,
+                created_at=result.created_at,
+                updated_at=result.updated_at,
+                debt_id=result.id
+            )
+            debt.schedule_ids = [ds.schedule_id for ds in result.reminders]
+            debts.append(debt)
+        return debts
+
+
+def orm_get_debts_page(manager: ConfigManager, guild_id: int, after_id: int, limit: int):
+    with Session(manager.engine) as session:
+        stmt = (
+            select(Debt)
+            .where(and_(Debt.guild_id == guild_id, Debt.is_settled.is_(False), Debt.id > after_id))
+            .order_by(Debt.id)
+            .limit(limit + 1)
+        )
+        return [
+            DebtModel(
+                debtor_id=result.debtor_id,
+                creditor_id=result.creditor_id,
+                amount=result.amount,
+                currency=result.currency,
+                description=result.description,
+                guild_id=result.guild_id,
+                is_settled=result.is_settled,
+                created_at=result.created_at,
+                updated_at=result.updated_at,
+                debt_id=result.id
+            )
+            for result in session.scalars(stmt).all()[:limit]
+        ]
+
+
+def orm_get_all_cleaning_schedules(manager: ConfigManager):
+    with Session(manager.engine) as session:
+        return [
+            result.to_cleaning_domain()
+            for result in session.scalars(select(Schedule).where(Schedule.task_type == "cleaning")).all()
+        ]
+
+
+# --- Pomiar ---
+
+def measure(func, repeat: int) -> tuple[float, int, int, int]:
+    """Zwraca (wiersze/s, wiersze na wywołanie, szczyt pamięci w B, liczba bloków)"""
+    rows = len(func())  # rozgrzewka - kompilacja i pamięć podręczna zapytań
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    result = func()
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename") if stat.count_diff > 0)
+    del result
+
+    return rows * repeat / elapsed if elapsed else 0.0, rows, peak, blocks
+
+
+def populate(manager: ConfigManager, debts: int, schedules: int):
+    now = datetime.now()
+    with Session(manager.engine) as session:
+        session.execute(insert(Schedule), [
+            {
+                "task_type": "cleaning",
+                "guild_id": GUILD_ID,
+                "channel_id": 1000 + i,
+                "run_time": f"{i % 24:02d}:{i % 60:02d}",
+                "frequency_id": 1,
+                "added_by": 1,
+                "added_at": now
+            }
+            for i in range(schedules)
+        ])
+        session.commit()
+
+    manager.import_debts([
+        DebtModel(
+            debtor_id=i % 50,
+            creditor_id=50 + i % 7,
+            amount=Decimal("12.34"),
+            description=f"dług {i}",
+            guild_id=GUILD_ID,
+            is_settled=i % 5 == 0,
+            created_at=now
+        )
+        for i in range(debts)
+    ])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--debts", type=int, default=20000)
+    parser.add_argument("--schedules", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    manager = ConfigManager.temporary()
+    try:
+        populate(manager, args.debts, args.schedules)
+
+        cases = [
+            ("get_debts", lambda: orm_get_debts(manager, GUILD_ID, False),
+             lambda: manager.get_debts(GUILD_ID, is_settled=False)),
+            ("get_debts_page", lambda: orm_get_debts_page(manager, GUILD_ID, args.debts // 2, 10),
+             lambda: manager.get_debts_page(GUILD_ID, is_settled=False, after_id=args.debts // 2).debts),
+            ("get_all_cleaning_schedules", lambda: orm_get_all_cleaning_schedules(manager),
+             manager.get_all_cleaning_schedules),
+        ]
+
+        print(f"{'odczyt':<28}{'ścieżka':<8}{'wiersze/s':>14}{'wiersze':>9}{'szczyt KiB':>12}{'bloki':>10}")
+        for name, orm_func, core_func in cases:
+            # Zapytania stronicowane są krótkie - więcej powtórzeń dla stabilnego wyniku
+            repeat = args.repeat * 100 if name == "get_debts_page" else args.repeat
+            for label, func in (("ORM", orm_func), ("Core", core_func)):
+                rate, rows, peak, blocks = measure(func, repeat)
+                print(f"{name:<28}{label:<8}{rate:>14,.0f}{rows:>9}{peak / 1024:>12,.0f}{blocks:>10,}")
+    finally:
+        manager.close()
+
+
+if __name__ == "__main__":
+    main()
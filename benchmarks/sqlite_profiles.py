@@ -0,0 +1,110 @@
+"""
+Porównanie profili SQLite: dawne ustawienia domyślne (DELETE/FULL) kontra WAL/NORMAL
+
+Uruchomienie (z katalogu głównego repozytorium):
+    python -m benchmarks.sqlite_profiles [--writes 1000] [--reads 1000] [--directory /tmp]
+
+Dla każdego profilu na świeżej bazie w pliku tymczasowym mierzy:
+zapisy/s (add_debt, każdy we własnej transakcji), odczyty/s (strona
+długów) oraz zapisy/s i odczyty/s, gdy drugi wątek czyta równolegle.
+Wynik zależy od dysku - --directory wskazuje katalog na badanym nośniku.
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import threading
+import time
+from decimal import Decimal
+
+from config.config_manager import ConfigManager
+from database.sqlite_profile import SqliteProfile
+from models.debt import Debt as DebtModel
+
+GUILD_ID = 1
+
+PROFILES = [
+    # Ustawienia sprzed profilu - wartości domyślne SQLite
+    ("DELETE/FULL", SqliteProfile(journal_mode="DELETE", synchronous="FULL", mmap_size=0,
+                                  cache_size=-2000, temp_store="DEFAULT", wal_checkpoint_interval=0)),
+    ("WAL/NORMAL", SqliteProfile()),
+]
+
+
+def add_debt(manager: ConfigManager, i: int) -> bool:
+    return manager.add_debt(DebtModel(
+        debtor_id=i % 50,
+        creditor_id=50 + i % 7,
+        amount=Decimal("12.34"),
+        description=f"dług {i}",
+        guild_id=GUILD_ID
+    ))
+
+
+def read_page(manager: ConfigManager):
+    return manager.get_debts_page(GUILD_ID, is_settled=False, limit=10)
+
+
+def rate(func, count: int) -> float:
+    start = time.perf_counter()
+    for i in range(count):
+        func(i)
+    elapsed = time.perf_counter() - start
+    return count / elapsed if elapsed else 0.0
+
+
+def concurrent(manager: ConfigManager, writes: int) -> tuple[float, float]:
+    """Zapisy/s w wątku głównym i odczyty/s w wątku czytelnika działającym w tym samym czasie"""
+    stop = threading.Event()
+    reads = [0]
+
+    def reader():
+        while not stop.is_set():
+            read_page(manager)
+            reads[0] += 1
+
+    thread = threading.Thread(target=reader)
+    start = time.perf_counter()
+    thread.start()
+    try:
+        for i in range(writes):
+            add_debt(manager, i)
+    finally:
+        stop.set()
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return writes / elapsed, reads[0] / elapsed
+
+
+def run_profile(profile: SqliteProfile, directory: str, writes: int, reads: int) -> tuple[float, ...]:
+    temp_dir = tempfile.mkdtemp(prefix="poczuk-bench-", dir=directory)
+    manager = ConfigManager(os.path.join(temp_dir, "bot_database.db"), profile)
+    try:
+        add_debt(manager, 0)  # rozgrzewka - kompilacja zapytań i pamięć podręczna
+        read_page(manager)
+
+        write_rate = rate(lambda i: add_debt(manager, i), writes)
+        read_rate = rate(lambda i: read_page(manager), reads)
+        mixed_write_rate, mixed_read_rate = concurrent(manager, writes)
+        return write_rate, read_rate, mixed_write_rate, mixed_read_rate
+    finally:
+        manager.close()
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writes", type=int, default=1000)
+    parser.add_argument("--reads", type=int, default=1000)
+    parser.add_argument("--directory", default=None, help="katalog baz tymczasowych (domyślnie systemowy)")
+    args = parser.parse_args()
+
+    print(f"{'profil':<14}{'zapisy/s':>12}{'odczyty/s':>12}{'zapisy/s*':>12}{'odczyty/s*':>12}")
+    for name, profile in PROFILES:
+        results = run_profile(profile, args.directory, args.writes, args.reads)
+        print(f"{name:<14}" + "".join(f"{value:>12,.0f}" for value in results))
+    print("* zapis i odczyt jednocześnie w dwóch wątkach")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+import os
+
+import discord
+
+from services.db_backup import BackupInProgressError
+from utils import get_logger
+from utils.helpers import create_embed
+
+
+class BackupCommand:
+
+    def __init__(self, bot, config_manager, backup, logger=None):
+        self.bot = bot
+        self.config_manager = config_manager
+        self.backup = backup
+        self.logger = logger or get_logger(__name__)
+
+    async def handle(self, ctx):
+        """Tworzy kopię zapasową bazy danych na żądanie"""
+        try:
+            async with ctx.typing():
+                result = await self.config_manager.run(self.backup.run)
+
+            self.logger.info(f"Kopia zapasowa na żądanie: {result.path}, przez={ctx.author}")
+
+            embed = create_embed(
+                title="💾 Kopia zapasowa bazy danych",
+                description=f"Utworzono `{os.path.basename(result.path)}`",
+                color=discord.Color.green()
+            )
+            embed.add_field(name="Rozmiar bazy", value=f"{result.database_bytes / 1024 / 1024:.2f} MiB", inline=True)
+            embed.add_field(name="Po kompresji", value=f"{result.compressed_bytes / 1024 / 1024:.2f} MiB", inline=True)
+            embed.add_field(name="Czas", value=f"{result.duration:.2f} s", inline=True)
+            if result.guilds:
+                embed.add_field(name="Pliki serwerów", value=str(result.guilds), inline=True)
+            embed.add_field(
+                name="Przechowywane kopie",
+                value=f"{len(self.backup.list_backups())} (limit {self.backup.policy.keep})",
+                inline=True
+            )
+            await ctx.send(embed=embed)
+
+        except BackupInProgressError:
+            await ctx.send("⏳ Kopia zapasowa jest już w trakcie, spróbuj za chwilę")
+        except Exception as e:
+            self.logger.error(f"Błąd tworzenia kopii zapasowej: {e}", exc_info=True)
+            await ctx.send("❌ Wystąpił błąd podczas tworzenia kopii zapasowej")
@@ -0,0 +1,82 @@
+import discord
+
+from utils import get_logger
+from utils.helpers import create_embed
+
+# Limit długości wartości pola osadzenia Discord
+FIELD_LIMIT = 1024
+
+
+class DbStatsCommand:
+
+    def __init__(self, bot, config_manager, logger=None):
+        self.bot = bot
+        self.config_manager = config_manager
+        self.logger = logger or get_logger(__name__)
+
+    async def handle(self, ctx, mode: str = ""):
+        """Pokazuje statystyki zapytań do bazy danych (reset - zeruje je)"""
+        try:
+            query_stats = self.config_manager.query_stats
+            summary = query_stats.summary()
+
+            if not summary["enabled"]:
+                return await ctx.send("ℹ️ Statystyki zapytań są wyłączone (DB_QUERY_STATS=OFF)")
+
+            if mode.lower() in ("reset", "zeruj"):
+                query_stats.reset()
+                self.logger.info(f"Wyzerowano statystyki zapytań, przez={ctx.author}")
+                return await ctx.send("🧹 Wyzerowano statystyki zapytań")
+
+            embed = create_embed(
+                title="🗄️ Statystyki zapytań do bazy",
+                description=(
+                    f"Zapytań: **{summary['queries_total']}** | łączny czas: {summary['time_total_ms']:.0f} ms | "
+                    f"wolnych (≥ {summary['slow_query_ms']} ms): **{summary['slow_total']}**"
+                ),
+                color=discord.Color.blue()
+            )
+
+            statements = [
+                f"`{stats.total_time * 1000:.1f} ms` · {stats.count}× · max {stats.max_time * 1000:.1f} ms · "
+                f"wierszy {stats.rows}\n```sql\n{self._shorten(stats.statement, 90)}\n```"
+                for stats in query_stats.statements(limit=5)
+            ]
+            embed.add_field(
+                name="Instrukcje (łączny czas)",
+                value=self._join(statements) or "Brak danych",
+                inline=False
+            )
+
+            commands_stats = [
+                f"`${stats.name}` · {stats.invocations}× · "
+                f"{stats.queries / stats.invocations:.1f} zapytań (max {stats.max_queries}) · "
+                f"{stats.time * 1000 / stats.invocations:.1f} ms · "
+                f"{stats.rows / stats.invocations:.0f} wierszy · {stats.writes} zapisów"
+                for stats in query_stats.commands(limit=10)
+            ]
+            embed.add_field(
+                name="Komendy (średnio na wywołanie)",
+                value=self._join(commands_stats) or "Brak danych",
+                inline=False
+            )
+            await ctx.send(embed=embed)
+
+        except Exception as e:
+            self.logger.error(f"Błąd wyświetlania statystyk zapytań: {e}", exc_info=True)
+            await ctx.send("❌ Wystąpił błąd podczas pobierania statystyk zapytań")
+
+    @staticmethod
+    def _shorten(statement: str, length: int) -> str:
+        statement = " ".join(statement.split())
+        return statement if len(statement) <= length else statement[:length - 1] + "…"
+
+    @staticmethod
+    def _join(lines: list) -> str:
+        """Łączy wiersze, pomijając te, które przekroczyłyby limit pola"""
+        value = ""
+        for line in lines:
+            if len(value) + len(line) + 1 > FIELD_LIMIT:
+                break
+            value += line + "\n"
+        return value.strip()
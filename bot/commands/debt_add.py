@@ -35,11 +35,12 @@ class AddDebtCommand:
                 return
 
             # Sprawdź czy dług już istnieje (niezapłacony)
-            existing_debts = self.config_manager.get_debts(
+            existing_debts = await self.config_manager.get_debts(
                 guild_id=ctx.guild.id,
                 debtor_id=debtor.id,
                 creditor_id=creditor.id,
-                is_settled=False
+                is_settled=False,
+                include_schedule_ids=False
             )
 
             if existing_debts:
@@ -71,9 +72,10 @@ class AddDebtCommand:
                 guild_id=ctx.guild.id
             )
 
-            if self.config_manager.add_debt(debt):
-                # Zaloguj akcję
-                self.config_manager.add_log(
+            # Dług i wpis audytowy zatwierdzane razem w jednej transakcji
+            async with self.config_manager.unit_of_work() as uow:
+                uow.add_debt(debt)
+                uow.add_log(
                     user_id=ctx.author.id,
                     guild_id=ctx.guild.id,
                     log_level_name="INFO",
@@ -81,6 +83,7 @@ class AddDebtCommand:
                     details=f"Dodano dług: {debtor} → {creditor}: {amount} {currency}"
                 )
 
+            if uow.ok:
                 embed = create_embed(
                     title="✅ Dług dodany",
                     description=f"{debtor.mention} jest winien {creditor.mention}",
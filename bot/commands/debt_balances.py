@@ -0,0 +1,46 @@
+import discord
+
+from utils import get_logger
+from utils.helpers import create_embed
+
+
+class RebuildBalancesCommand:
+
+    def __init__(self, bot, config_manager, logger=None):
+        self.bot = bot
+        self.config_manager = config_manager
+        self.logger = logger or get_logger(__name__)
+
+    async def handle(self, ctx, mode: str = ""):
+        """Sprawdza lub przebudowuje salda długów serwera na podstawie tabeli długów"""
+        try:
+            verify_only = mode.lower() in ("verify", "check", "sprawdz")
+            result = await self.config_manager.rebuild_debt_balances(ctx.guild.id, verify_only=verify_only)
+            if result is None:
+                return await ctx.send("❌ Wystąpił błąd podczas przeliczania sald długów")
+
+            if result["mismatches"] == 0:
+                description = f"✅ Salda są zgodne z długami ({result['pairs']} par)"
+                color = discord.Color.green()
+            elif verify_only:
+                description = f"⚠️ Niezgodne salda: {result['mismatches']} (par: {result['pairs']})"
+                color = discord.Color.orange()
+            else:
+                description = f"🔧 Przebudowano salda: poprawiono {result['mismatches']} (par: {result['pairs']})"
+                color = discord.Color.green()
+
+            self.logger.info(
+                f"Salda długów ({'weryfikacja' if verify_only else 'przebudowa'}): "
+                f"par={result['pairs']}, niezgodności={result['mismatches']}, przez={ctx.author}"
+            )
+
+            embed = create_embed(
+                title="💰 Salda długów",
+                description=description,
+                color=color
+            )
+            await ctx.send(embed=embed)
+
+        except Exception as e:
+            self.logger.error(f"Błąd przebudowy sald długów: {e}", exc_info=True)
+            await ctx.send("❌ Wystąpił błąd podczas przeliczania sald długów")
@@ -1,8 +1,13 @@
 import discord
 
+from models.debt_balance import DebtBalance
+from models.debt_page import DebtPage
 from utils import get_logger
 from utils.helpers import create_embed
 
+PAGE_SIZE = 10
+SUMMARY_LIMIT = 10
+
 
 class ListDebtCommand:
 
@@ -12,35 +17,20 @@ class ListDebtCommand:
         self.logger = logger or get_logger(__name__)
 
     async def handle(self, ctx, member: discord.Member = None, show_settled: bool = False):
-        """Wyświetla listę długów w najprostszej formie"""
+        """Wyświetla podsumowanie długów i pierwszą stronę listy z przyciskami nawigacji"""
         try:
             guild_id = ctx.guild.id
+            title = f"💰 Długi {member.display_name}" if member else f"💰 Długi na serwerze"
 
-            # Pobierz długi
-            if member:
-                # Długi członka jako dłużnika
-                debts_as_debtor = self.config_manager.get_debts(
-                    guild_id=guild_id,
-                    debtor_id=member.id,
-                    is_settled=False if not show_settled else None
-                )
-                # Długi członka jako wierzyciela
-                debts_as_creditor = self.config_manager.get_debts(
-                    guild_id=guild_id,
-                    creditor_id=member.id,
-                    is_settled=False if not show_settled else None
-                )
-                debts = debts_as_debtor + debts_as_creditor
-                title = f"💰 Długi {member.display_name}"
+            member_id = member.id if member else None
+            if show_settled:
+                # Spłacone długi nie mają sald - jedno zapytanie GROUP BY po stronie SQL
+                totals = await self.config_manager.get_debt_totals(guild_id, member_id)
             else:
-                # Wszystkie długi na serwerze
-                debts = self.config_manager.get_debts(
-                    guild_id=guild_id,
-                    is_settled=False if not show_settled else None
-                )
-                title = f"💰 Długi na serwerze"
+                # Niespłacone długi - gotowe salda par, O(liczby par)
+                totals = await self.config_manager.get_debt_balances(guild_id, member_id)
 
-            if not debts:
+            if not totals:
                 embed = create_embed(
                     title=title,
                     description="Brak długów" if not show_settled else "Brak długów (w tym spłaconych)",
@@ -49,80 +39,134 @@ class ListDebtCommand:
                 await ctx.send(embed=embed)
                 return
 
-            # Grupuj długi według pary (dłużnik → wierzyciel)
-            debt_summary = {}
-            debt_details = {}
-
-            for debt in debts:
-                key = (debt.debtor_id, debt.creditor_id)
-
-                # Dodaj do sumy całkowitej
-                if key not in debt_summary:
-                    debt_summary[key] = debt.amount
-                else:
-                    debt_summary[key] += debt.amount
-
-                # Zapisz szczegóły poszczególnych długów
-                if key not in debt_details:
-                    debt_details[key] = []
-
-                debt_details[key].append(debt)
-
-            # Utwórz embed z prostym widokiem
-            embed = create_embed(
-                title=title,
-                description=f"Liczba długów: {len(debts)} | Pary: {len(debt_summary)}",
-                color=discord.Color.blue()
-            )
-
-            # Dodaj sekcję "KTO jest ILE WINNY dla KOGO"
-            summary_text = ""
-            for (debtor_id, creditor_id), total_amount in debt_summary.items():
-                debtor = ctx.guild.get_member(debtor_id)
-                creditor = ctx.guild.get_member(creditor_id)
-
-                debtor_name = debtor.mention if debtor else f"ID:{debtor_id}"
-                creditor_name = creditor.mention if creditor else f"ID:{creditor_id}"
+            # Jedno przejście po parach - bez przeszukiwania listy długów
+            pairs = {(total.debtor_id, total.creditor_id) for total in totals}
+            debt_count = sum(total.debt_count for total in totals)
+            header = f"Liczba długów: {debt_count} | Pary: {len(pairs)}"
+            summary_text = self._format_summary(ctx, totals)
 
-                # Formatuj kwotę
-                currency = next(
-                    (d.currency for d in debts if d.debtor_id == debtor_id and d.creditor_id == creditor_id), "PLN")
+            view = DebtPageView(self, ctx, member, show_settled, title, header, summary_text)
+            page = await view.fetch_page()
+            view.update_buttons(page)
 
-                summary_text += f"**{debtor_name}** → **{creditor_name}**: {total_amount:.2f} {currency}\n"
-
-            embed.add_field(
-                name="📊 PODSUMOWANIE: KTO → KOMU ILE",
-                value=summary_text or "Brak danych",
-                inline=False
-            )
-
-            # Dodaj sekcję ze szczegółami (tylko jeśli mniej niż 10 par)
-            if len(debt_details) <= 10:
-                details_text = ""
-                for (debtor_id, creditor_id), debts_list in debt_details.items():
-                    debtor = ctx.guild.get_member(debtor_id)
-                    creditor = ctx.guild.get_member(creditor_id)
-
-                    debtor_name = debtor.mention if debtor else f"ID:{debtor_id}"
-                    creditor_name = creditor.mention if creditor else f"ID:{creditor_id}"
-
-                    details_text += f"\n**{debtor_name} → {creditor_name}:**\n"
-
-                    for i, debt in enumerate(debts_list, 1):
-                        status = "✅ " if debt.is_settled else "❌ "
-                        description = f" ({debt.description[:30]}...)" if debt.description and len(
-                            debt.description) > 30 else f" ({debt.description})" if debt.description else ""
-                        details_text += f"{debt.debt_id}. {status}{debt.amount:.2f} {debt.currency}{description}\n"
-
-                if details_text:
-                    embed.add_field(
-                        name="📋 SZCZEGÓŁY: Poszczególne długi",
-                        value=details_text[:1000],  # Limit Discord
-                        inline=False
-                    )
-
-            await ctx.send(embed=embed)
+            embed = view.build_embed(page)
+            if page.has_next:
+                view.message = await ctx.send(embed=embed, view=view)
+            else:
+                # Jedna strona - przyciski są zbędne
+                await ctx.send(embed=embed)
 
         except Exception as e:
             self.logger.error(f"Błąd listowania długów: {e}", exc_info=True)
-            await ctx.send("❌ Wystąpił błąd podczas pobierania listy długów")
\ No newline at end of file
+            await ctx.send("❌ Wystąpił błąd podczas pobierania listy długów")
+
+    def _format_summary(self, ctx, totals: list[DebtBalance]) -> str:
+        """Sekcja "KTO jest ILE WINNY dla KOGO" ograniczona do SUMMARY_LIMIT par"""
+        lines = []
+        for total in totals[:SUMMARY_LIMIT]:
+            debtor_name = self.member_name(ctx, total.debtor_id)
+            creditor_name = self.member_name(ctx, total.creditor_id)
+            lines.append(f"**{debtor_name}** → **{creditor_name}**: {total.amount:.2f} {total.currency}")
+
+        if len(totals) > SUMMARY_LIMIT:
+            lines.append(f"\n...i {len(totals) - SUMMARY_LIMIT} więcej")
+
+        return "\n".join(lines)
+
+    @staticmethod
+    def member_name(ctx, member_id: int) -> str:
+        member = ctx.guild.get_member(member_id)
+        return member.mention if member else f"ID:{member_id}"
+
+
+class DebtPageView(discord.ui.View):
+    """Przyciski nawigacji po stronach listy długów
+
+    Każde kliknięcie pobiera z bazy tylko żądaną stronę (keyset po ID długu).
+    """
+
+    def __init__(self, command: ListDebtCommand, ctx, member, show_settled: bool,
+                 title: str, header: str, summary_text: str, timeout: float = 180):
+        super().__init__(timeout=timeout)
+        self.command = command
+        self.ctx = ctx
+        self.member = member
+        self.show_settled = show_settled
+        self.title = title
+        self.header = header
+        self.summary_text = summary_text
+        self.page = DebtPage()
+        self.page_number = 1
+        self.message = None
+
+    async def fetch_page(self, after_id: int = None, before_id: int = None) -> DebtPage:
+        self.page = await self.command.config_manager.get_debts_page(
+            guild_id=self.ctx.guild.id,
+            member_id=self.member.id if self.member else None,
+            is_settled=None if self.show_settled else False,
+            after_id=after_id,
+            before_id=before_id,
+            limit=PAGE_SIZE
+        )
+        return self.page
+
+    def update_buttons(self, page: DebtPage):
+        self.previous_page.disabled = not page.has_previous
+        self.next_page.disabled = not page.has_next
+
+    def build_embed(self, page: DebtPage) -> discord.Embed:
+        details_text = ""
+        for debt in page.debts:
+            debtor_name = self.command.member_name(self.ctx, debt.debtor_id)
+            creditor_name = self.command.member_name(self.ctx, debt.creditor_id)
+            status = "✅ " if debt.is_settled else "❌ "
+            description = f" ({debt.description[:30]}...)" if debt.description and len(
+                debt.description) > 30 else f" ({debt.description})" if debt.description else ""
+            details_text += (
+                f"`#{debt.debt_id}` {status}{debtor_name} → {creditor_name}: "
+                f"{debt.amount:.2f} {debt.currency}{description}\n"
+            )
+
+        embed = create_embed(
+            title=self.title,
+            description=f"{self.header}\n\n**📋 SZCZEGÓŁY: Poszczególne długi**\n{details_text or 'Brak danych'}",
+            color=discord.Color.blue()
+        )
+        embed.add_field(
+            name="📊 PODSUMOWANIE: KTO → KOMU ILE",
+            value=self.summary_text or "Brak danych",
+            inline=False
+        )
+        embed.set_footer(text=f"Strona {self.page_number}")
+        return embed
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.ctx.author.id:
+            await interaction.response.send_message("❌ Tylko autor komendy może zmieniać strony", ephemeral=True)
+            return False
+        return True
+
+    async def on_timeout(self):
+        self.previous_page.disabled = True
+        self.next_page.disabled = True
+        if self.message:
+            try:
+                await self.message.edit(view=self)
+            except discord.HTTPException:
+                pass
+
+    async def _show(self, interaction: discord.Interaction, page: DebtPage):
+        self.update_buttons(page)
+        await interaction.response.edit_message(embed=self.build_embed(page), view=self)
+
+    @discord.ui.button(label="◀ Poprzednia", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        page = await self.fetch_page(before_id=self.page.first_id)
+        self.page_number = max(1, self.page_number - 1)
+        await self._show(interaction, page)
+
+    @discord.ui.button(label="Następna ▶", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        page = await self.fetch_page(after_id=self.page.last_id)
+        self.page_number += 1
+        await self._show(interaction, page)
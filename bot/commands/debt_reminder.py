@@ -31,9 +31,10 @@ class ReminderDebtCommand:
                 added_by=ctx.author.id
             )
 
-            if self.config_manager.add_debt_reminder_schedule(schedule):
-                # Zaloguj akcję
-                self.config_manager.add_log(
+            # Harmonogram i wpis audytowy zatwierdzane razem w jednej transakcji
+            async with self.config_manager.unit_of_work() as uow:
+                uow.add_debt_reminder_schedule(schedule)
+                uow.add_log(
                     user_id=ctx.author.id,
                     guild_id=ctx.guild.id,
                     log_level_name="INFO",
@@ -41,6 +42,7 @@ class ReminderDebtCommand:
                     details=f"Dodano harmonogram przypomnień: {channel.name} ({channel.id}) o {run_time}"
                 )
 
+            if uow.ok:
                 embed = create_embed(
                     title="✅ Harmonogram przypomnień dodany",
                     description=f"Przypomnienia o długach będą wysyłane na {channel.mention} o **{run_time}**",
@@ -11,9 +11,15 @@ class SettleDebtCommand:
     async def handle(self, ctx, debt_id: int):
         """Oznacza dług jako spłacony"""
         try:
-            if self.config_manager.settle_debt(debt_id):
-                # Zaloguj akcję
-                self.config_manager.add_log(
+            # Nieistniejący dług to zwykła pomyłka użytkownika, a nie błąd zapisu
+            if await self.config_manager.get_debt(ctx.guild.id, debt_id) is None:
+                self.logger.info(f"Nie znaleziono długu do spłaty: #{debt_id}, przez={ctx.author}")
+                return await ctx.send(f"❌ Nie znaleziono długu #{debt_id}")
+
+            # Spłata i wpis audytowy zatwierdzane razem w jednej transakcji
+            async with self.config_manager.unit_of_work() as uow:
+                uow.settle_debt(debt_id, ctx.guild.id)
+                uow.add_log(
                     user_id=ctx.author.id,
                     guild_id=ctx.guild.id,
                     log_level_name="INFO",
@@ -21,9 +27,10 @@ class SettleDebtCommand:
                     details=f"Spłacono dług ID: {debt_id}"
                 )
 
+            if uow.ok:
                 await ctx.send(f"✅ Dług #{debt_id} oznaczony jako spłacony")
             else:
-                await ctx.send(f"❌ Nie znaleziono długu #{debt_id}")
+                await ctx.send(f"❌ Nie udało się spłacić długu #{debt_id}")
 
         except Exception as e:
             self.logger.error(f"Błąd spłacania długu: {e}", exc_info=True)
@@ -0,0 +1,112 @@
+import os
+import tempfile
+
+import discord
+
+from services.debt_transfer import DebtTransfer, FORMATS, detect_format
+from utils import get_logger
+from utils.helpers import create_embed
+
+
+class ExportDebtsCommand:
+
+    def __init__(self, bot, config_manager, logger=None):
+        self.bot = bot
+        self.config_manager = config_manager
+        self.logger = logger or get_logger(__name__)
+        self.transfer = DebtTransfer(config_manager.sync)
+
+    async def handle(self, ctx, file_format: str = "csv"):
+        """Eksportuje wszystkie długi serwera do załącznika CSV/NDJSON"""
+        file_format = file_format.lower()
+        if file_format not in FORMATS:
+            await ctx.send(f"❌ Nieobsługiwany format. Dostępne: {', '.join(FORMATS)}")
+            return
+
+        path = None
+        try:
+            async with ctx.typing():
+                path, rows = await self.config_manager.run(self.transfer.export, ctx.guild.id, file_format)
+
+            if os.path.getsize(path) > ctx.guild.filesize_limit:
+                await ctx.send("❌ Plik eksportu przekracza limit rozmiaru załączników na tym serwerze")
+                return
+
+            await ctx.send(
+                f"📤 Wyeksportowano długi: {rows}",
+                file=discord.File(path, filename=f"debts-{ctx.guild.id}.{file_format}")
+            )
+            await self.config_manager.add_log(
+                user_id=ctx.author.id,
+                guild_id=ctx.guild.id,
+                log_level_name="INFO",
+                action_type_name="EXPORT_DEBTS",
+                details=f"Eksport długów: {rows} ({file_format})"
+            )
+
+        except Exception as e:
+            self.logger.error(f"Błąd eksportu długów: {e}", exc_info=True)
+            await ctx.send("❌ Wystąpił błąd podczas eksportu długów")
+        finally:
+            if path and os.path.exists(path):
+                os.remove(path)
+
+
+class ImportDebtsCommand:
+
+    def __init__(self, bot, config_manager, logger=None):
+        self.bot = bot
+        self.config_manager = config_manager
+        self.logger = logger or get_logger(__name__)
+        self.transfer = DebtTransfer(config_manager.sync)
+
+    async def handle(self, ctx):
+        """Importuje długi z załączonego pliku CSV/NDJSON"""
+        if not ctx.message.attachments:
+            await ctx.send("❌ Dołącz plik .csv lub .ndjson z długami")
+            return
+
+        attachment = ctx.message.attachments[0]
+        file_format = detect_format(attachment.filename)
+        if file_format is None:
+            await ctx.send("❌ Nieobsługiwany typ pliku. Użyj .csv lub .ndjson")
+            return
+
+        fd, path = tempfile.mkstemp(prefix=f"debts-import-{ctx.guild.id}-", suffix=f".{file_format}")
+        os.close(fd)
+        try:
+            async with ctx.typing():
+                # Zapis na dysk zamiast wczytywania całego załącznika do pamięci
+                await attachment.save(path)
+                result = await self.config_manager.run(self.transfer.import_file, ctx.guild.id, path, file_format)
+
+            await self.config_manager.add_log(
+                user_id=ctx.author.id,
+                guild_id=ctx.guild.id,
+                log_level_name="INFO",
+                action_type_name="IMPORT_DEBTS",
+                details=(f"Import długów z {attachment.filename}: zaimportowano {result.imported}, "
+                         f"odrzucono {result.rejected}, błędy zapisu {result.failed}")
+            )
+
+            embed = create_embed(
+                title="📥 Import długów",
+                description=f"Zaimportowano: **{result.imported}**",
+                color=discord.Color.green() if not result.rejected and not result.failed else discord.Color.orange()
+            )
+            if result.rejected:
+                embed.add_field(name="Odrzucone wiersze", value=str(result.rejected), inline=True)
+            if result.failed:
+                embed.add_field(name="Błędy zapisu", value=str(result.failed), inline=True)
+            if result.errors:
+                embed.add_field(name="Przykładowe błędy", value="\n".join(result.errors)[:1024], inline=False)
+            await ctx.send(embed=embed)
+
+        except ValueError as e:
+            await ctx.send(f"❌ Niepoprawny plik: {e}")
+        except Exception as e:
+            self.logger.error(f"Błąd importu długów: {e}", exc_info=True)
+            await ctx.send("❌ Wystąpił błąd podczas importu długów")
+        finally:
+            if os.path.exists(path):
+                os.remove(path)
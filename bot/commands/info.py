@@ -18,9 +18,13 @@ class InfoCommand:
             self.logger.info(f"Komenda !info wywołana przez {ctx.author} ({ctx.author.id})")
 
             # Pobierz dane
-            cleaning_schedules = self.config_manager.get_all_cleaning_schedules()
-            reminder_schedules = self.config_manager.get_debt_reminder_schedules(ctx.guild.id)
-            debts = self.config_manager.get_debts(guild_id=ctx.guild.id, is_settled=False)
+            cleaning_schedules = await self.config_manager.get_all_cleaning_schedules()
+            reminder_schedules = await self.config_manager.get_debt_reminder_schedules(ctx.guild.id)
+            debts = await self.config_manager.get_debts(
+                guild_id=ctx.guild.id,
+                is_settled=False,
+                include_schedule_ids=False
+            )
 
             # Statystyki systemowe
             process = psutil.Process(os.getpid())
@@ -50,6 +54,33 @@ class InfoCommand:
             embed.add_field(name="💾 RAM", value=f"{memory_mb:.1f} MB", inline=True)
             embed.add_field(name="⚡ CPU", value=f"{cpu_percent:.1f}%", inline=True)
 
+            audit_stats = self.config_manager.audit_log.stats()
+            embed.add_field(
+                name="📝 Kolejka logów",
+                value=f"{audit_stats['depth']} oczekujących | ostatni zapis: "
+                      f"{audit_stats['last_flush_size']} w {audit_stats['last_flush_latency_ms']}ms",
+                inline=False
+            )
+
+            writer_stats = self.config_manager.writer.stats()
+            embed.add_field(
+                name="✍️ Zapis do bazy",
+                value=f"{writer_stats['depth']} oczekujących | ostatnia partia: "
+                      f"{writer_stats['last_batch_size']} w {writer_stats['last_commit_latency_ms']}ms | "
+                      f"największa: {writer_stats['largest_batch']}",
+                inline=False
+            )
+
+            shards = self.config_manager.shards
+            if shards:
+                shard_stats = shards.stats()
+                embed.add_field(
+                    name="🗂️ Pliki serwerów",
+                    value=f"{shard_stats['open']}/{shard_stats['max_open']} otwartych | "
+                          f"otwarć: {shard_stats['opened_total']} | zamknięć LRU: {shard_stats['evicted_total']}",
+                    inline=False
+                )
+
             embed.add_field(
                 name="📦 Kod źródłowy",
                 value="[GitHub](https://github.com/kvdpxne/poczuk)",
@@ -0,0 +1,77 @@
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+import discord
+
+from database.migrations import DEFAULT_ACTION_TYPES
+from utils import get_logger
+from utils.helpers import create_embed
+
+# Najdłuższy okres statystyk (dni)
+MAX_DAYS = 31
+
+ACTION_DESCRIPTIONS = {action["name"]: action["description"] for action in DEFAULT_ACTION_TYPES}
+
+
+class LogStatsCommand:
+
+    def __init__(self, bot, config_manager, log_rollups, logger=None):
+        self.bot = bot
+        self.config_manager = config_manager
+        self.log_rollups = log_rollups
+        self.logger = logger or get_logger(__name__)
+
+    async def handle(self, ctx, days: int = 7):
+        """Pokazuje aktywność serwera z ostatnich dni na podstawie liczników logów"""
+        try:
+            days = min(max(days, 1), MAX_DAYS)
+            now = datetime.now(timezone.utc)
+            since_day = (now - timedelta(days=days - 1)).strftime("%Y-%m-%d")
+            since_hour = (now - timedelta(hours=23)).strftime("%Y-%m-%d %H")
+
+            daily = await self.config_manager.get_log_rollups(ctx.guild.id, "day", since_day)
+            hourly = await self.config_manager.get_log_rollups(ctx.guild.id, "hour", since_hour)
+
+            embed = create_embed(
+                title=f"📊 Statystyki serwera - ostatnie {days} dni",
+                description=(
+                    f"Zdarzeń: **{sum(rollup.count for rollup in daily)}** | "
+                    f"ostatnie 24 h: **{sum(rollup.count for rollup in hourly)}**"
+                ),
+                color=discord.Color.blue()
+            )
+
+            actions = Counter()
+            per_day = {}
+            for rollup in daily:
+                actions[rollup.action_type] += rollup.count
+                total, errors = per_day.get(rollup.period, (0, 0))
+                per_day[rollup.period] = (
+                    total + rollup.count,
+                    errors + (rollup.count if rollup.log_level == "ERROR" else 0)
+                )
+
+            embed.add_field(
+                name="Akcje",
+                value="\n".join(
+                    f"{ACTION_DESCRIPTIONS.get(action, action)}: **{count}**"
+                    for action, count in actions.most_common()
+                ) or "Brak danych",
+                inline=False
+            )
+            embed.add_field(
+                name="Dni (UTC)",
+                value="\n".join(
+                    f"`{period}` {total}" + (f" · błędów {errors}" if errors else "")
+                    for period, (total, errors) in sorted(per_day.items(), reverse=True)
+                ) or "Brak danych",
+                inline=False
+            )
+            embed.set_footer(
+                text=f"Liczniki odświeżane co {self.log_rollups.policy.interval_minutes} min"
+            )
+            await ctx.send(embed=embed)
+
+        except Exception as e:
+            self.logger.error(f"Błąd wyświetlania statystyk serwera: {e}", exc_info=True)
+            await ctx.send("❌ Wystąpił błąd podczas pobierania statystyk serwera")
@@ -4,11 +4,16 @@ import discord
 
 from bot.commands import AvatarCommand, CoinFlipCommand, UptimeCommand, SetNicknameCommand, HelpCommand, VersionCommand, \
     WhoisCommand, InfoCommand, PurgeCommand, SourceCodeCommand, CleanCommand
+from bot.commands.db_backup import BackupCommand
+from bot.commands.db_stats import DbStatsCommand
 from bot.commands.debt_add import AddDebtCommand
+from bot.commands.debt_balances import RebuildBalancesCommand
 from bot.commands.debt_list import ListDebtCommand
 from bot.commands.debt_reminder import ReminderDebtCommand
 from bot.commands.debt_settle import SettleDebtCommand
+from bot.commands.debt_transfer import ExportDebtsCommand, ImportDebtsCommand
 from bot.commands.delete_nickname import DeleteNicknameCommand
+from bot.commands.log_stats import LogStatsCommand
 from bot.commands.ping import PingCommand
 from models.cleaning_schedule import CleaningSchedule
 from utils.helpers import create_embed, get_current_datetime
@@ -29,6 +34,12 @@ class CommandHandler:
         self.debt_list = ListDebtCommand(bot, config_manager, self.logger)
         self.debt_reminder = ReminderDebtCommand(bot, config_manager, self.validator, self.logger)
         self.debt_settle = SettleDebtCommand(bot, config_manager, self.logger)
+        self.debt_balances = RebuildBalancesCommand(bot, config_manager, self.logger)
+        self.debt_export = ExportDebtsCommand(bot, config_manager, self.logger)
+        self.debt_import = ImportDebtsCommand(bot, config_manager, self.logger)
+        self.db_backup = BackupCommand(bot, config_manager, scheduler.backup, self.logger)
+        self.db_stats = DbStatsCommand(bot, config_manager, self.logger)
+        self.log_stats = LogStatsCommand(bot, config_manager, scheduler.log_rollups, self.logger)
 
         # Inicjalizacja modułów komend
         self.avatar_command = AvatarCommand(bot, self.logger)
@@ -54,7 +65,7 @@ class CommandHandler:
                 return await ctx.send("❌ Nieprawidłowy format czasu. Użyj HH:MM (np. 03:00)")
 
             # Sprawdź czy kanał już ma harmonogram
-            existing = self.config_manager.get_cleaning_schedule(channel.id, ctx.guild.id)
+            existing = await self.config_manager.get_cleaning_schedule(channel.id, ctx.guild.id)
             if existing:
                 self.logger.info(f"Próba dodania istniejącego harmonogramu: {channel.id} od {ctx.author}")
                 return await ctx.send(
@@ -84,10 +95,10 @@ class CommandHandler:
                 exclude_pinned=exclude_pinned
             )
 
-            # Zapisz harmonogram
-            if self.config_manager.add_cleaning_schedule(new_schedule):
-                # Zaloguj akcję
-                self.config_manager.add_log(
+            # Zapisz harmonogram razem z wpisem audytowym w jednej transakcji
+            async with self.config_manager.unit_of_work() as uow:
+                uow.add_cleaning_schedule(new_schedule)
+                uow.add_log(
                     user_id=ctx.author.id,
                     guild_id=ctx.guild.id,
                     log_level_name="INFO",
@@ -95,6 +106,7 @@ class CommandHandler:
                     details=f"Dodano harmonogram czyszczenia: {channel.name} ({channel.id}) o {clean_time}"
                 )
 
+            if uow.ok:
                 self.logger.info(
                     f"Dodano harmonogram czyszczenia: kanał={channel.name} ({channel.id}), "
                     f"czas={clean_time}, częstotliwość={frequency_id}, "
@@ -151,11 +163,35 @@ class CommandHandler:
         """Obsługuje listowanie długów"""
         await self.debt_list.handle(ctx, member, show_settled)
 
+    async def handle_rebuild_balances(self, ctx, mode: str = ""):
+        """Obsługuje weryfikację/przebudowę sald długów"""
+        await self.debt_balances.handle(ctx, mode)
+
+    async def handle_export_debts(self, ctx, file_format: str = "csv"):
+        """Obsługuje eksport długów do pliku"""
+        await self.debt_export.handle(ctx, file_format)
+
+    async def handle_import_debts(self, ctx):
+        """Obsługuje import długów z załącznika"""
+        await self.debt_import.handle(ctx)
+
+    async def handle_backup(self, ctx):
+        """Obsługuje kopię zapasową bazy na żądanie"""
+        await self.db_backup.handle(ctx)
+
+    async def handle_db_stats(self, ctx, mode: str = ""):
+        """Obsługuje statystyki zapytań do bazy"""
+        await self.db_stats.handle(ctx, mode)
+
+    async def handle_log_stats(self, ctx, days: int = 7):
+        """Obsługuje statystyki aktywności serwera"""
+        await self.log_stats.handle(ctx, days)
+
     # Aktualizacja istniejących metod
     async def handle_list(self, ctx):
         """Obsługuje komendę !list - pokazuje wszystkie harmonogramy"""
-        cleaning_schedules = self.config_manager.get_all_cleaning_schedules()
-        reminder_schedules = self.config_manager.get_debt_reminder_schedules(ctx.guild.id)
+        cleaning_schedules = await self.config_manager.get_all_cleaning_schedules()
+        reminder_schedules = await self.config_manager.get_debt_reminder_schedules(ctx.guild.id)
 
         if not cleaning_schedules and not reminder_schedules:
             embed = create_embed(
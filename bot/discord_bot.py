@@ -1,8 +1,12 @@
+import asyncio
+from typing import Optional
+
 import discord
 from discord.ext import commands
 
 from bot.commands_handler import CommandHandler
-from config.config_manager import ConfigManager
+from config.async_config_manager import AsyncConfigManager
+from config.config_manager import get_config_manager
 from config.token_manager import TokenManager
 from scheduler.scheduler import Scheduler
 from utils.logger import get_logger, log_info, log_command
@@ -32,13 +36,14 @@ class DiscordBot(commands.Bot):
             activity=activity
         )
 
-        # Inicjalizacja menedżerów
-        self.config_manager = ConfigManager()
+        # Inicjalizacja menedżerów (dostęp do bazy poza pętlą zdarzeń)
+        self.config_manager = AsyncConfigManager(get_config_manager())
         self.token_manager = TokenManager()
 
         # Inicjalizacja komponentów
         self.scheduler = Scheduler(self, self.config_manager)
         self.command_handler = CommandHandler(self, self.config_manager, self.scheduler)
+        self.scheduler_task: Optional[asyncio.Task] = None
 
         # Ustawienie eventów
         self._setup_events()
@@ -51,6 +56,12 @@ class DiscordBot(commands.Bot):
         async def on_ready():
             await self._on_ready_handler()
 
+        @self.event
+        async def on_guild_join(guild):
+            """Wczytuje ustawienia nowego serwera do pamięci podręcznej"""
+            await self.config_manager.load_guild_settings(guild.id)
+            self.logger.info(f"Dołączono do serwera: {guild.name} ({guild.id})")
+
         @self.event
         async def on_message(message):
             """Przetwarza wszystkie wiadomości i wywołuje komendy"""
@@ -85,6 +96,37 @@ class DiscordBot(commands.Bot):
         async def list_debts_command(ctx, member: discord.Member = None):
             await self.command_handler.handle_list_debts(ctx, member)
 
+        @self.command(name="rebuildbalances", aliases=["debtbalances", "przeliczsalda"])
+        @commands.has_permissions(administrator=True)
+        async def rebuild_balances_command(ctx, mode: str = ""):
+            await self.command_handler.handle_rebuild_balances(ctx, mode)
+
+        @self.command(name="exportdebts", aliases=["debtexport", "eksportdlugow"])
+        @commands.has_permissions(administrator=True)
+        async def export_debts_command(ctx, file_format: str = "csv"):
+            await self.command_handler.handle_export_debts(ctx, file_format)
+
+        @self.command(name="importdebts", aliases=["debtimport", "importdlugow"])
+        @commands.has_permissions(administrator=True)
+        async def import_debts_command(ctx):
+            await self.command_handler.handle_import_debts(ctx)
+
+        # Kopia obejmuje bazę wszystkich serwerów - tylko właściciel bota
+        @self.command(name="backup", aliases=["kopia"])
+        @commands.is_owner()
+        async def backup_command(ctx):
+            await self.command_handler.handle_backup(ctx)
+
+        # Statystyki obejmują zapytania wszystkich serwerów - tylko właściciel bota
+        @self.command(name="dbstats", aliases=["querystats", "statystykibazy"])
+        @commands.is_owner()
+        async def db_stats_command(ctx, mode: str = ""):
+            await self.command_handler.handle_db_stats(ctx, mode)
+
+        @self.command(name="stats", aliases=["logstats", "statystyki"])
+        async def log_stats_command(ctx, days: int = 7):
+            await self.command_handler.handle_log_stats(ctx, days)
+
         @self.command(name="addreminder", aliases=["remindadd", "dodajprzypomnienie"])
         @commands.has_permissions(administrator=True)
         async def add_reminder_command(ctx, channel: discord.TextChannel, run_time: str,
@@ -177,13 +219,12 @@ class DiscordBot(commands.Bot):
         log_info('main', f"Bot zalogowany jako: {self.user.name} ({self.user.id})")
         log_info('main', f"Liczba serwerów: {len(self.guilds)}")
 
+        # Wczytaj ustawienia wszystkich serwerów jednym przebiegiem
+        await self.config_manager.preload_guild_settings([guild.id for guild in self.guilds])
+
         # Ustaw czas startu dla komendy status
         self.start_time = datetime.now()
 
-        # Uruchom harmonogram
-        self.loop.create_task(self.scheduler.start())
-        self.logger.info("Uruchomiono harmonogram czyszczenia")
-
     async def _on_command_error_handler(self, ctx, error):
         """Obsługa błędów komend"""
         from utils.logger import log_error
@@ -191,6 +232,9 @@ class DiscordBot(commands.Bot):
         if isinstance(error, commands.MissingPermissions):
             await ctx.send("❌ Brak uprawnień! Wymagana rola: Administrator")
             self.logger.warning(f"Brak uprawnień: {ctx.author} próbował użyć {ctx.command.name}")
+        elif isinstance(error, commands.NotOwner):
+            await ctx.send("❌ Ta komenda jest dostępna tylko dla właściciela bota")
+            self.logger.warning(f"Brak uprawnień właściciela: {ctx.author} próbował użyć {ctx.command.name}")
         elif isinstance(error, commands.ChannelNotFound):
             await ctx.send("❌ Nie znaleziono kanału. Upewnij się, że podałeś poprawną nazwę/ID.")
         elif isinstance(error, commands.MissingRequiredArgument):
@@ -200,6 +244,35 @@ class DiscordBot(commands.Bot):
             log_error('commands', error, f"Komenda: Nieznana, Użytkownik: {ctx.author}")
             # log_error('commands', error, f"Komenda: {ctx.command.name}, Użytkownik: {ctx.author}")
 
+    async def invoke(self, ctx):
+        """Wykonuje komendę, przypisując jej zapytania do bazy (statystyki zapytań)
+
+        Zdarzenie on_command jest uruchamiane jako osobne zadanie, więc kontekst
+        komendy ustawiony w nim nie obejmowałby samej komendy.
+        """
+        if ctx.command is None:
+            return await super().invoke(ctx)
+
+        with self.config_manager.query_stats.command(ctx.command.qualified_name):
+            await super().invoke(ctx)
+
+    async def setup_hook(self):
+        """Uruchamia zadania w tle przed połączeniem z Discordem
+
+        Harmonogram startuje tutaj, a nie w on_ready - to zdarzenie powtarza
+        się przy każdym ponownym połączeniu. Zaczyna działać po wait_until_ready.
+        """
+        self.config_manager.start()
+        self.scheduler_task = asyncio.create_task(self.scheduler.start(), name="scheduler")
+        self.logger.info("Uruchomiono harmonogram czyszczenia")
+
+    async def close(self):
+        """Zamyka połączenie z Discordem, zapisuje oczekujące logi i zamyka bazę danych"""
+        await super().close()
+        if self.scheduler_task is not None:
+            self.scheduler_task.cancel()
+        await self.config_manager.close()
+
     def run_bot(self):
         token = self.token_manager.load_token()
 
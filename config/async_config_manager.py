@@ -0,0 +1,157 @@
+"""
+Asynchroniczny dostęp do konfiguracji - nie blokuje pętli zdarzeń discord.py
+"""
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from config.audit_log_queue import AuditLogQueue
+from config.database_writer import DatabaseWriter
+from config.config_manager import ConfigManager
+from config.unit_of_work import UnitOfWork
+from models.log_entry import LogEntry
+from utils.logger import get_logger
+
+T = TypeVar("T")
+
+
+class AsyncConfigManager:
+    """Asynchroniczna nakładka na ConfigManager
+
+    Każda publiczna metoda ConfigManager jest dostępna jako korutyna wykonywana
+    w dedykowanej puli wątków, więc wolny zapis do SQLite nie wstrzymuje
+    heartbeatów ani komend innych serwerów. Operacje zapisu (write_operations)
+    trafiają do jednego pisarza, który zatwierdza je partiami w osobnym wątku;
+    unit_of_work() łączy zapisy jednej komendy w jedną, niepodzielną operację.
+    Logi audytowe trafiają do kolejki zapisywanej zbiorczo w tle.
+
+    Po start() także zapisy synchronicznego ConfigManager wykonywane w puli
+    wątków (usługi konserwacyjne, import) trafiają do pisarza - poza bazą
+    w pamięci, gdzie pisarz i czytelnicy dzielą jeden wątek, a wątek
+    czekający na pisarza blokowałby go.
+    """
+
+    def __init__(self, config_manager: ConfigManager, max_workers: int = 4):
+        self.sync = config_manager
+        self.logger = get_logger(__name__)
+        if config_manager.is_memory:
+            # Baza w pamięci ma jedno współdzielone połączenie - operacje muszą być sekwencyjne
+            max_workers = 1
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="database"
+        )
+        # Przy shardingu zapisy różnych serwerów są zatwierdzane równolegle
+        self._writer_executor = self._executor if config_manager.is_memory else ThreadPoolExecutor(
+            max_workers=max(config_manager.shard_policy.writers, 1) if config_manager.is_sharded else 1,
+            thread_name_prefix="database-writer"
+        )
+        self.writer = DatabaseWriter(
+            lambda calls, guild_id: self._run_in(self._writer_executor, self.sync.execute_writes, calls, guild_id),
+            self.sync.write_result,
+            route=self.sync.write_target
+        )
+        self.audit_log = AuditLogQueue(lambda entries: self.write("add_logs", entries))
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+
+    def start(self):
+        """Uruchamia zadania w tle - wymaga działającej pętli zdarzeń"""
+        self.writer.start()
+        self.audit_log.start()
+        if not self.sync.is_memory:
+            self._loop = asyncio.get_running_loop()
+            self._loop_thread_id = threading.get_ident()
+            self.sync.write_router = self._write_from_thread
+
+    async def run(self, func: Callable[..., T], *args, **kwargs) -> T:
+        """Wykonuje funkcję synchroniczną w puli wątków bazy danych"""
+        return await self._run_in(self._executor, func, *args, **kwargs)
+
+    async def write(self, name: str, *args, **kwargs) -> Any:
+        """Wykonuje operację zapisu przez pisarza (grupowo) lub od razu, jeśli pisarz nie działa"""
+        self.sync.query_stats.record_write()
+        if self.writer.is_running:
+            return await self.writer.submit(name, *args, **kwargs)
+        return await self._run_in(self._writer_executor, self.sync.write_now, name, *args, **kwargs)
+
+    def _write_from_thread(self, name: str, *args, **kwargs) -> Any:
+        """Przekazuje zapis synchronicznego ConfigManager do pisarza i czeka na wynik"""
+        if threading.get_ident() == self._loop_thread_id:
+            # Czekanie w wątku pętli zdarzeń zablokowałoby samego pisarza
+            return self.sync.write_now(name, *args, **kwargs)
+        return asyncio.run_coroutine_threadsafe(self.write(name, *args, **kwargs), self._loop).result()
+
+    def unit_of_work(self) -> UnitOfWork:
+        """Jednostka pracy komendy (async with) - wszystkie operacje trafiają do pisarza jako jedna"""
+        return UnitOfWork(self.write, self.sync.write_operations)
+
+    @staticmethod
+    async def _run_in(executor: ThreadPoolExecutor, func: Callable[..., T], *args, **kwargs) -> T:
+        # Kopia kontekstu przenosi do wątku bieżącą komendę (statystyki zapytań)
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(executor, functools.partial(context.run, func, *args, **kwargs))
+
+    async def add_log(self, user_id: int, guild_id: int, log_level_name: str,
+                      action_type_name: str, details: str) -> bool:
+        """Dodaje wpis do kolejki logów audytowych bez czekania na zapis"""
+        entry = LogEntry(
+            user_id=user_id,
+            guild_id=guild_id,
+            log_level_name=log_level_name,
+            action_type_name=action_type_name,
+            details=details
+        )
+
+        # Bez działającej kolejki (np. poza botem) zapisz od razu
+        if not self.audit_log.is_running:
+            return await self.write("add_logs", [entry]) > 0
+
+        self.audit_log.enqueue(entry)
+        return True
+
+    async def get_guild_setting(self, guild_id: int, key: str, default: Any = None) -> str:
+        """Odczyt ustawienia serwera - trafienie w pamięć podręczną nie przełącza wątku"""
+        settings = self.sync.guild_settings_cache.get(guild_id)
+        if settings is not None:
+            return settings.get(key, default)
+        return await self.run(self.sync.get_guild_setting, guild_id, key, default)
+
+    async def get_user_setting(self, user_id: int, key: str, default: Any = None) -> str:
+        """Odczyt ustawienia użytkownika - trafienie w pamięć podręczną nie przełącza wątku"""
+        settings = self.sync.user_settings_cache.get(user_id)
+        if settings is not None:
+            return settings.get(key, default)
+        return await self.run(self.sync.get_user_setting, user_id, key, default)
+
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self.sync, name)
+        if name.startswith("_") or not callable(attribute):
+            return attribute
+
+        if name in self.sync.write_operations:
+            @functools.wraps(attribute)
+            async def write_wrapper(*args, **kwargs):
+                return await self.write(name, *args, **kwargs)
+
+            return write_wrapper
+
+        @functools.wraps(attribute)
+        async def wrapper(*args, **kwargs):
+            return await self.run(attribute, *args, **kwargs)
+
+        return wrapper
+
+    async def close(self):
+        """Zapisuje oczekujące logi, czeka na operacje w toku i zamyka pulę wątków"""
+        self.sync.write_router = None
+        await self.audit_log.stop()
+        await self.writer.stop()
+        await asyncio.to_thread(self._executor.shutdown, wait=True)
+        if self._writer_executor is not self._executor:
+            await asyncio.to_thread(self._writer_executor.shutdown, wait=True)
+        self.logger.info("Zamknięto pulę wątków bazy danych")
@@ -0,0 +1,135 @@
+"""
+Kolejka zapisu logów audytowych w tle (write-behind)
+"""
+import asyncio
+import time
+from typing import Awaitable, Callable, List, Optional
+
+from models.log_entry import LogEntry
+from utils.logger import get_logger
+
+
+class AuditLogQueue:
+    """Zbiera wpisy audytowe i zapisuje je zbiorczo w tle
+
+    Wywołujący dodają wpisy bez czekania na bazę danych. Zadanie w tle zapisuje
+    je jednym INSERT-em, gdy uzbiera się batch_size wpisów lub minie
+    flush_interval sekund od pierwszego oczekującego wpisu.
+    """
+
+    def __init__(
+        self,
+        writer: Callable[[List[LogEntry]], Awaitable[int]],
+        batch_size: int = 100,
+        flush_interval: float = 2.0
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.logger = get_logger(__name__)
+
+        self._writer = writer
+        self._queue: asyncio.Queue[Optional[LogEntry]] = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+
+        # Statystyki do doboru progów
+        self.last_flush_size = 0
+        self.last_flush_latency = 0.0
+        self.flushed_total = 0
+        self.failed_total = 0
+
+    @property
+    def depth(self) -> int:
+        """Liczba wpisów oczekujących na zapis"""
+        return self._queue.qsize()
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def enqueue(self, entry: LogEntry):
+        """Dodaje wpis do kolejki bez blokowania"""
+        self._queue.put_nowait(entry)
+
+    def start(self):
+        """Uruchamia zadanie zapisujące w tle"""
+        if not self.is_running:
+            self._task = asyncio.create_task(self._run(), name="audit-log-flush")
+
+    async def stop(self):
+        """Zatrzymuje zadanie i zapisuje wszystkie oczekujące wpisy"""
+        if self.is_running:
+            self._queue.put_nowait(None)
+            await self._task
+        self._task = None
+
+        # Wpisy dodane przed startem lub po sygnale zakończenia
+        await self._flush(self._drain())
+
+    def stats(self) -> dict:
+        """Zwraca statystyki kolejki"""
+        return {
+            "depth": self.depth,
+            "last_flush_size": self.last_flush_size,
+            "last_flush_latency_ms": round(self.last_flush_latency * 1000, 2),
+            "flushed_total": self.flushed_total,
+            "failed_total": self.failed_total
+        }
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+
+        while True:
+            entry = await self._queue.get()
+            if entry is None:
+                return
+
+            batch = [entry]
+            deadline = loop.time() + self.flush_interval
+            stopping = False
+
+            # Zbieraj do progu rozmiaru lub czasu
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    entry = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if entry is None:
+                    stopping = True
+                    break
+                batch.append(entry)
+
+            await self._flush(batch)
+            if stopping:
+                return
+
+    def _drain(self) -> List[LogEntry]:
+        entries = []
+        while not self._queue.empty():
+            entry = self._queue.get_nowait()
+            if entry is not None:
+                entries.append(entry)
+        return entries
+
+    async def _flush(self, batch: List[LogEntry]):
+        if not batch:
+            return
+
+        start = time.perf_counter()
+        try:
+            written = await self._writer(batch)
+        except Exception as e:
+            self.logger.error(f"Błąd zapisu {len(batch)} logów audytowych: {e}", exc_info=True)
+            written = 0
+
+        self.last_flush_latency = time.perf_counter() - start
+        self.last_flush_size = len(batch)
+        self.flushed_total += written
+        self.failed_total += len(batch) - written
+
+        self.logger.debug(
+            f"Zapisano logi audytowe: {written}/{len(batch)} w {self.last_flush_latency * 1000:.1f}ms, "
+            f"w kolejce={self.depth}"
+        )
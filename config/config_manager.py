@@ -1,199 +1,745 @@
 import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+from dataclasses import replace
 from datetime import datetime
-from typing import List, Optional, Any
+from decimal import Decimal
+from types import MappingProxyType
+from typing import List, Optional, Any, Mapping, Tuple, Dict, Iterator, Callable
 
-from sqlalchemy import create_engine, select, delete, update, and_
+from sqlalchemy import create_engine, select, delete, update, and_, insert, text, func, literal
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
 
-from database.base import Base
+from config.database_writer import WriteCall, WriteOperation, WriteOutcome
+from config.schedule_index import ScheduleIndex
+from config.settings_cache import SettingsCache
+from config.unit_of_work import UNIT_OF_WORK_OPERATION, UnitOfWork, UnitOfWorkAborted
+from database import queries
+from database.migrations import MigrationRunner
 from database.models.action_type import ActionType
 from database.models.debt import Debt
+from database.models.debt_balance import DebtBalance
 from database.models.debt_schedule import DebtSchedule
-from database.models.frequency import Frequency
 from database.models.guild_setting import GuildSetting
 from database.models.log import Log
 from database.models.log_level import LogLevel
+from database.models.log_rollup import LogRollup
+from database.models.rollup_state import RollupState
 from database.models.schedule import Schedule
 from database.models.user_setting import UserSetting
+from database.query_stats import QueryStats
+from database.shard_pool import ShardPolicy, ShardPool
+from database.sqlite_profile import SqliteProfile
 from models.cleaning_schedule import CleaningSchedule
 from models.debt import Debt as DebtModel
+from models.debt_balance import DebtBalance as DebtBalanceModel
+from models.debt_page import DebtPage
 from models.debt_reminder_schedule import DebtReminderSchedule
+from models.log_entry import LogEntry
+from models.log_rollup import LogRollup as LogRollupModel
 from utils.logger import get_logger
 
+DEFAULT_DB_PATH = "data/bot_database.db"
+MEMORY_DB_PATH = ":memory:"
+
+WAL_CHECKPOINT_MODES = ("PASSIVE", "FULL", "RESTART", "TRUNCATE")
+
+# Klucz listy akcji wykonywanych po zatwierdzeniu transakcji (Session.info)
+AFTER_COMMIT_KEY = "after_commit"
+
+# Maksymalna liczba ID w jednym zapytaniu IN
+IN_CLAUSE_CHUNK = 500
+
+# Szczegółowość liczników logów -> format okresu (strftime SQLite, UTC)
+LOG_ROLLUP_PERIODS = {"hour": "%Y-%m-%d %H", "day": "%Y-%m-%d"}
+
+# Nazwa znacznika postępu agregacji logów w rollup_state
+LOG_ROLLUP_STATE = "logs"
+
+
+def after_commit(session: Session, callback: Callable[[], Any]):
+    """Rejestruje akcję do wykonania po udanym zatwierdzeniu transakcji sesji"""
+    session.info.setdefault(AFTER_COMMIT_KEY, []).append(callback)
+
 
 class ConfigManager:
     """Zarządza konfiguracją bota - Single Responsibility Principle"""
 
-    def __init__(self, db_path: str = "data/bot_database.db"):
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, storage_profile: Optional[SqliteProfile] = None,
+                 shard_policy: Optional[ShardPolicy] = None):
         self.db_path = db_path
         self.logger = get_logger(__name__)
-        self._ensure_data_directory()
-        self.engine = create_engine(f"sqlite:///{self.db_path}")
-        self._create_tables()
-        self._seed_default_data()
+        self.storage_profile = storage_profile or SqliteProfile.from_env()
+        self.shard_policy = shard_policy or ShardPolicy.from_env()
+        self.query_stats = QueryStats()
+        self.write_router: Optional[Callable[..., Any]] = None
+        self._temp_dir: Optional[str] = None
+
+        if self.is_memory:
+            # Każde nowe połączenie do :memory: to osobna, pusta baza - wszyscy
+            # korzystają z jednego połączenia. WAL i mmap nie dotyczą pamięci.
+            self.storage_profile = replace(self.storage_profile, journal_mode="MEMORY", mmap_size=0)
+            self.engine = create_engine(
+                "sqlite://",
+                poolclass=StaticPool,
+                connect_args={"check_same_thread": False, **self.query_stats.connect_args}
+            )
+        else:
+            self._ensure_data_directory()
+            self.engine = create_engine(f"sqlite:///{self.db_path}", connect_args=self.query_stats.connect_args)
+
+        self.storage_profile.apply(self.engine)
+        self.query_stats.attach(self.engine)
+        self._migrate()
+
+        # Dane serwerów we własnych plikach - nie dotyczy bazy w pamięci
+        self.shards: Optional[ShardPool] = None
+        if self.shard_policy.enabled and not self.is_memory:
+            self.shards = ShardPool(self.shard_policy, self.storage_profile, self.engine, self.query_stats)
+
+        self._load_reference_cache()
+        self.schedule_index = ScheduleIndex()
+        self.guild_settings_cache = SettingsCache()
+        self.user_settings_cache = SettingsCache()
+        self.write_operations: Dict[str, WriteOperation] = {
+            "add_log": WriteOperation(self._add_log_op, "Błąd dodawania logu"),
+            "add_logs": WriteOperation(self._add_logs_op, "Błąd zbiorczego dodawania logów", default=0),
+            "add_cleaning_schedule": WriteOperation(
+                self._add_cleaning_schedule_op, "Błąd dodawania harmonogramu czyszczenia"
+            ),
+            "update_cleaning_schedule_last_run": WriteOperation(
+                self._update_cleaning_schedule_last_run_op, "Błąd aktualizacji harmonogramu"
+            ),
+            "remove_cleaning_schedule": WriteOperation(
+                self._remove_cleaning_schedule_op, "Błąd usuwania harmonogramu"
+            ),
+            "add_debt": WriteOperation(
+                self._add_debt_op, "Błąd dodawania długu", guild_of=lambda debt: debt.guild_id
+            ),
+            "settle_debt": WriteOperation(
+                self._settle_debt_op, "Błąd oznaczania długu jako spłacony",
+                guild_of=lambda debt_id, guild_id=None: guild_id
+            ),
+            "add_debt_reminder_schedule": WriteOperation(
+                self._add_debt_reminder_schedule_op, "Błąd dodawania harmonogramu przypomnień"
+            ),
+            "set_guild_setting": WriteOperation(self._set_guild_setting_op, "Błąd zapisu ustawień gildii"),
+            "set_user_setting": WriteOperation(self._set_user_setting_op, "Błąd zapisu ustawień użytkownika"),
+            "delete_logs": WriteOperation(self._delete_logs_op, "Błąd usuwania logów", default=0),
+            "rollup_logs_batch": WriteOperation(self._rollup_logs_batch_op, "Błąd agregacji logów", default=0),
+            "prune_log_rollups": WriteOperation(
+                self._prune_log_rollups_op, "Błąd usuwania liczników logów", default=0
+            ),
+            "import_guild_debts": WriteOperation(
+                self._import_guild_debts_op, "Błąd importu partii długów", default=0,
+                guild_of=lambda debts: debts[0].guild_id
+            ),
+            "rebuild_debt_balances": WriteOperation(
+                self._rebuild_debt_balances_op, "Błąd przebudowy sald długów", default=None,
+                guild_of=lambda guild_id, verify_only=False: guild_id
+            ),
+            UNIT_OF_WORK_OPERATION: WriteOperation(self._unit_of_work_op, "Błąd zapisu jednostki pracy", default=None),
+        }
+
+    @classmethod
+    def in_memory(cls, storage_profile: Optional[SqliteProfile] = None) -> 'ConfigManager':
+        """Baza w pamięci (testy, benchmarki) - znika razem z instancją
+
+        Wszystkie wątki dzielą jedno połączenie, więc operacje należy wykonywać
+        sekwencyjnie (AsyncConfigManager używa wtedy jednego wątku).
+        """
+        return cls(MEMORY_DB_PATH, storage_profile)
+
+    @classmethod
+    def temporary(cls, storage_profile: Optional[SqliteProfile] = None) -> 'ConfigManager':
+        """Baza w pliku tymczasowym (pełne zachowanie WAL) usuwanym przez close()"""
+        temp_dir = tempfile.mkdtemp(prefix="poczuk-db-")
+        manager = cls(os.path.join(temp_dir, "bot_database.db"), storage_profile)
+        manager._temp_dir = temp_dir
+        return manager
+
+    @property
+    def is_memory(self) -> bool:
+        return self.db_path == MEMORY_DB_PATH
+
+    @property
+    def is_sharded(self) -> bool:
+        return self.shards is not None
+
+    def close(self):
+        """Zamyka połączenia; baza tymczasowa jest usuwana z dysku"""
+        if self.shards:
+            self.shards.close()
+        self.engine.dispose()
+        if self._temp_dir:
+            shutil.rmtree(self._temp_dir, ignore_errors=True)
+            self._temp_dir = None
 
     def _ensure_data_directory(self):
-        """Tworzy katalog danych jeśli nie istnieje"""
-        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
-
-    def _create_tables(self):
-        """Tworzy tabele w bazie danych"""
-        Base.metadata.create_all(self.engine)
-
-    def _seed_default_data(self):
-        """Wypełnia domyślne dane w tabelach referencyjnych"""
-        with Session(self.engine) as session:
-            # Domyślne częstotliwości
-            frequencies = session.scalars(select(Frequency)).all()
-            if not frequencies:
-                default_frequencies = [
-                    Frequency(name="daily", description="Codziennie"),
-                    Frequency(name="weekly", description="Co tydzień"),
-                    Frequency(name="interval", description="Co określony interwał"),
-                ]
-                session.add_all(default_frequencies)
-
-            # Domyślne typy akcji
-            action_types = session.scalars(select(ActionType)).all()
-            if not action_types:
-                default_action_types = [
-                    ActionType(name="ADD_SCHEDULE", description="Dodanie harmonogramu"),
-                    ActionType(name="DELETE_SCHEDULE", description="Usunięcie harmonogramu"),
-                    ActionType(name="UPDATE_SETTING", description="Aktualizacja ustawienia"),
-                    ActionType(name="ADD_DEBT", description="Dodanie długu"),
-                    ActionType(name="SETTLE_DEBT", description="Spłata długu"),
-                    ActionType(name="RUN_CLEANING", description="Wykonanie czyszczenia"),
-                    ActionType(name="SEND_REMINDER", description="Wysłanie przypomnienia"),
-                ]
-                session.add_all(default_action_types)
-
-            # Domyślne poziomy logowania
-            log_levels = session.scalars(select(LogLevel)).all()
-            if not log_levels:
-                default_log_levels = [
-                    LogLevel(name="INFO", description="Informacja"),
-                    LogLevel(name="WARN", description="Ostrzeżenie"),
-                    LogLevel(name="ERROR", description="Błąd"),
-                    LogLevel(name="DEBUG", description="Debug"),
-                ]
-                session.add_all(default_log_levels)
+        """Tworzy katalog danych jeśli nie istnieje (ścieżka bez katalogu oznacza bieżący)"""
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _migrate(self):
+        """Doprowadza schemat i dane referencyjne do aktualnej wersji (database/migrations.py)"""
+        MigrationRunner(self.engine).run()
+
+    def _guild_engine(self, guild_id: int) -> Engine:
+        """Silnik z danymi serwera - jego plik przy shardingu, inaczej wspólna baza"""
+        return self.shards.engine(guild_id) if self.shards else self.engine
+
+    def _file_engine(self, guild_id: Optional[int] = None) -> Engine:
+        """Silnik jednego pliku bazy: serwera dla guild_id, inaczej wspólnej bazy"""
+        return self._guild_engine(guild_id) if guild_id is not None else self.engine
+
+    def _session(self, guild_id: Optional[int] = None) -> Session:
+        """Sesja, w której tabele serwera trafiają do jego pliku, a pozostałe do wspólnej bazy"""
+        if guild_id is None or self.shards is None:
+            return Session(self.engine)
+        return Session(self.engine, binds=self.shards.binds(guild_id))
+
+    def _load_reference_cache(self, session: Optional[Session] = None):
+        """Ładuje mapy nazwa -> ID dla poziomów logowania i typów akcji
+
+        Tabele referencyjne zmieniają się tylko przy seedowaniu, więc mapy są
+        niemutowalne i podmieniane w całości przy odświeżeniu. Wewnątrz
+        operacji zapisu odświeżenie korzysta z jej sesji - druga sesja
+        w trakcie transakcji pisarza przy bazie w pamięci (jedno wspólne
+        połączenie) wycofałaby tę transakcję przy zamknięciu.
+        """
+        if session is None:
+            with Session(self.engine) as session:
+                return self._load_reference_cache(session)
+
+        self._log_level_ids: Mapping[str, int] = MappingProxyType(
+            dict(session.execute(select(LogLevel.name, LogLevel.id)).all())
+        )
+        self._action_type_ids: Mapping[str, int] = MappingProxyType(
+            dict(session.execute(select(ActionType.name, ActionType.id)).all())
+        )
+
+    def _resolve_log_reference_ids(self, session: Session, log_level_name: str,
+                                   action_type_name: str) -> tuple[Optional[int], Optional[int]]:
+        """Zwraca ID poziomu logowania i typu akcji, odświeżając cache przy nieznanej nazwie"""
+        if log_level_name not in self._log_level_ids or action_type_name not in self._action_type_ids:
+            self._load_reference_cache(session)
+        return self._log_level_ids.get(log_level_name), self._action_type_ids.get(action_type_name)
+
+    def checkpoint_wal(self, mode: str = "PASSIVE") -> bool:
+        """Przenosi strony z pliku WAL do bazy
+
+        PASSIVE nie blokuje czytelników ani pisarzy; TRUNCATE dodatkowo zeruje
+        plik WAL (do użycia w oknie konserwacji).
+        """
+        if mode not in WAL_CHECKPOINT_MODES:
+            raise ValueError(f"Nieprawidłowy tryb checkpointu: {mode}")
+
+        try:
+            with self.engine.connect() as connection:
+                busy, wal_pages, checkpointed = connection.execute(
+                    text(f"PRAGMA wal_checkpoint({mode})")
+                ).one()
+                self.logger.debug(f"Checkpoint WAL: {checkpointed}/{wal_pages} stron, busy={busy}")
+                return not busy
+        except Exception as e:
+            self.logger.error(f"Błąd checkpointu WAL: {e}")
+            return False
+
+    def get_storage_stats(self) -> Dict[str, int]:
+        """Zwraca rozmiar bazy danych w stronach i bajtach"""
+        try:
+            with self.engine.connect() as connection:
+                page_size = connection.execute(text("PRAGMA page_size")).scalar()
+                page_count = connection.execute(text("PRAGMA page_count")).scalar()
+                freelist_count = connection.execute(text("PRAGMA freelist_count")).scalar()
+                auto_vacuum = connection.execute(text("PRAGMA auto_vacuum")).scalar()
+            wal_path = f"{self.db_path}-wal"
+            return {
+                "page_size": page_size,
+                "page_count": page_count,
+                "freelist_count": freelist_count,
+                "size_bytes": page_size * page_count,
+                "free_bytes": page_size * freelist_count,
+                "wal_bytes": os.path.getsize(wal_path) if os.path.exists(wal_path) else 0,
+                "auto_vacuum": auto_vacuum
+            }
+        except Exception as e:
+            self.logger.error(f"Błąd odczytu rozmiaru bazy danych: {e}")
+            return {}
+
+    # --- Konserwacja bazy danych (uruchamiać poza pętlą zdarzeń) ---
+    # ANALYZE i VACUUM nie mogą działać w transakcji pisarza, więc omijają go:
+    # biorą blokadę zapisu same (busy_timeout czeka na bieżącą partię pisarza),
+    # a zadanie konserwacji uruchamia je tylko w oknie ciszy.
+    # Z guild_id operacje dotyczą pliku serwera (sharding), inaczej wspólnej bazy.
+
+    def optimize(self, analysis_limit: int = 1000, full_analyze: bool = False, guild_id: Optional[int] = None):
+        """Odświeża statystyki planera zapytań
+
+        PRAGMA optimize analizuje tylko tabele, których statystyki mogły się
+        zdezaktualizować, a analysis_limit ogranicza liczbę czytanych wierszy
+        indeksu. full_analyze wykonuje pełne ANALYZE wszystkich tabel.
+        """
+        with self._file_engine(guild_id).connect() as connection:
+            connection.exec_driver_sql(f"PRAGMA analysis_limit={int(analysis_limit)}")
+            connection.exec_driver_sql("ANALYZE" if full_analyze else "PRAGMA optimize")
+            connection.commit()
+
+    def incremental_vacuum(self, max_pages: int = 0, guild_id: Optional[int] = None) -> int:
+        """Zwalnia do max_pages wolnych stron (0 = wszystkie), zwraca liczbę zwolnionych"""
+        with self._file_engine(guild_id).connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            free_before = connection.exec_driver_sql("PRAGMA freelist_count").scalar()
+            # cursor.execute() wykonuje tylko jeden krok pragmy (jedna strona) - executescript wykonuje całość
+            connection.connection.driver_connection.executescript(f"PRAGMA incremental_vacuum({int(max_pages)});")
+            free_after = connection.exec_driver_sql("PRAGMA freelist_count").scalar()
+        return free_before - free_after
+
+    def vacuum(self, auto_vacuum: Optional[str] = None):
+        """Pełny VACUUM (przepisuje cały plik), opcjonalnie zmieniając tryb auto_vacuum
+
+        Blokuje zapisy na cały czas przebudowy - dłużej niż busy_timeout przy
+        dużym pliku, więc partie pisarza w tym czasie kończą się błędem.
+        """
+        with self.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            if auto_vacuum is not None:
+                connection.exec_driver_sql(f"PRAGMA auto_vacuum={auto_vacuum}")
+            connection.exec_driver_sql("VACUUM")
+
+    def backup(self, target_path: str, guild_id: Optional[int] = None) -> int:
+        """Kopiuje bazę do target_path przez API kopii zapasowej SQLite, zwraca liczbę stron
+
+        Cała baza jest kopiowana jednym krokiem (pages=-1) w ramach jednej
+        transakcji odczytu, więc wynik jest spójny. W trybie WAL pisarze
+        działają w tym czasie normalnie; kopiowanie porcjami byłoby gorsze -
+        każdy zapis z innego połączenia zaczyna je od nowa od pierwszej strony.
+        Z guild_id kopiowany jest plik serwera (sharding).
+        """
+        target = sqlite3.connect(target_path)
+        try:
+            source = self._file_engine(guild_id).raw_connection()
+            try:
+                source.driver_connection.backup(target, pages=-1)
+            finally:
+                source.close()
+            return target.execute("PRAGMA page_count").fetchone()[0]
+        finally:
+            target.close()
+
+    def check_integrity(self, full: bool = False, guild_id: Optional[int] = None) -> List[str]:
+        """Sprawdza spójność pliku bazy, zwraca listę problemów (pusta = OK)
+
+        quick_check pomija porównanie indeksów z tabelami i jest wielokrotnie
+        szybszy od integrity_check.
+        """
+        pragma = "PRAGMA integrity_check" if full else "PRAGMA quick_check"
+        with self._file_engine(guild_id).connect() as connection:
+            problems = [row[0] for row in connection.exec_driver_sql(pragma)]
+        return [] if problems == ["ok"] else problems
+
+    # --- Zapis: operacje pojedynczo lub partiami (DatabaseWriter) ---
+
+    def write(self, name: str, *args, **kwargs) -> Any:
+        """Wykonuje jedną operację zapisu
+
+        Gdy działa pisarz (AsyncConfigManager.start ustawia write_router),
+        operacja trafia do jego kolejki - także z usług wykonywanych w puli
+        wątków (retencja, agregacja logów, import). Bez pisarza jest
+        wykonywana od razu we własnej transakcji.
+        """
+        if self.write_router is not None:
+            return self.write_router(name, *args, **kwargs)
+        return self.write_now(name, *args, **kwargs)
+
+    def write_now(self, name: str, *args, **kwargs) -> Any:
+        """Wykonuje jedną operację zapisu we własnej transakcji w bieżącym wątku"""
+        try:
+            call = (name, args, kwargs)
+            outcome = self.execute_writes([call], self.write_target(call))[0]
+        except Exception as e:
+            outcome = WriteOutcome(ok=False, error=e)
+        return self.write_result(name, outcome)
+
+    def write_target(self, call: WriteCall) -> Optional[int]:
+        """ID serwera, do którego pliku trafia operacja (None - wspólna baza)"""
+        if self.shards is None:
+            return None
+
+        name, args, kwargs = call
+        if name == UNIT_OF_WORK_OPERATION:
+            targets = {self.write_target(inner) for inner in args[0]} - {None}
+            if len(targets) > 1:
+                raise ValueError("Jednostka pracy obejmuje dane kilku serwerów")
+            return targets.pop() if targets else None
+
+        operation = self.write_operations[name]
+        if operation.guild_of is None:
+            return None
+        guild_id = operation.guild_of(*args, **kwargs)
+        if guild_id is None:
+            raise ValueError(f"Operacja {name} wymaga ID serwera przy włączonym shardingu")
+        return guild_id
+
+    def execute_writes(self, calls: List[WriteCall], guild_id: Optional[int] = None) -> List[WriteOutcome]:
+        """Wykonuje partię operacji zapisu w jednej transakcji (group commit)
+
+        Każda operacja działa we własnym SAVEPOINT - błąd wycofuje tylko ją,
+        a pozostałe są zatwierdzane wspólnym COMMIT. Akcje zarejestrowane przez
+        after_commit (indeksy i cache w pamięci) wykonują się dopiero po
+        udanym zatwierdzeniu. Błąd samego COMMIT jest zgłaszany wyjątkiem.
+
+        Przy shardingu guild_id (write_target) wskazuje plik serwera: dostaje on
+        blokadę zapisu, a wspólna baza transakcję odroczoną - partie różnych
+        serwerów nie czekają na siebie. Zmiany w obu bazach są zatwierdzane
+        osobno - awaria między dwoma COMMIT może utrwalić tylko jedną z nich.
+        """
+        outcomes = []
+        with self._session(guild_id) as session:
+            # Sterownik sqlite3 nie otwiera transakcji przed SAVEPOINT - bez jawnego
+            # BEGIN zwolnienie pierwszego punktu zapisu zatwierdzałoby transakcję.
+            # IMMEDIATE bierze blokadę zapisu od razu, zamiast przy pierwszym zapisie.
+            if guild_id is not None and self.shards:
+                session.connection(bind_arguments={"mapper": Debt}).exec_driver_sql("BEGIN IMMEDIATE")
+                session.connection().exec_driver_sql("BEGIN")
+            else:
+                session.connection().exec_driver_sql("BEGIN IMMEDIATE")
+            callbacks = session.info.setdefault(AFTER_COMMIT_KEY, [])
+
+            for name, args, kwargs in calls:
+                registered = len(callbacks)
+                try:
+                    with session.begin_nested():
+                        value = self.write_operations[name].op(session, *args, **kwargs)
+                    outcomes.append(WriteOutcome(ok=True, value=value))
+                except Exception as e:
+                    del callbacks[registered:]
+                    outcomes.append(WriteOutcome(ok=False, error=e))
 
             session.commit()
 
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                self.logger.error(f"Błąd akcji po zatwierdzeniu zapisu: {e}", exc_info=True)
+
+        return outcomes
+
+    def unit_of_work(self) -> UnitOfWork:
+        """Jednostka pracy: operacje z bloku with zatwierdzane razem w jednej transakcji"""
+        return UnitOfWork(self.write, self.write_operations)
+
+    def _unit_of_work_op(self, session: Session, calls: List[WriteCall]) -> List[Any]:
+        values = []
+        for name, args, kwargs in calls:
+            value = self.write_operations[name].op(session, *args, **kwargs)
+            if value is False:
+                raise UnitOfWorkAborted(f"Operacja {name} nie powiodła się")
+            values.append(value)
+        return values
+
+    def write_result(self, name: str, outcome: WriteOutcome) -> Any:
+        """Zamienia wynik operacji na wartość zwracaną (błąd - log i wartość domyślna)"""
+        if outcome.ok:
+            return outcome.value
+        operation = self.write_operations[name]
+        self.logger.error(f"{operation.error_message}: {outcome.error}")
+        return operation.default
+
     # --- Zarządzanie logami ---
 
     def add_log(self, user_id: int, guild_id: int, log_level_name: str,
                 action_type_name: str, details: str) -> bool:
         """Dodaje wpis do logów"""
+        return self.write("add_log", user_id, guild_id, log_level_name, action_type_name, details)
+
+    def _add_log_op(self, session: Session, user_id: int, guild_id: int, log_level_name: str,
+                    action_type_name: str, details: str) -> bool:
+        # ID z cache tabel referencyjnych - zapis to pojedynczy INSERT
+        log_level_id, action_type_id = self._resolve_log_reference_ids(session, log_level_name, action_type_name)
+        if log_level_id is None:
+            self.logger.error(f"Nieznany poziom logowania: {log_level_name}")
+            return False
+
+        if action_type_id is None:
+            self.logger.error(f"Nieznany typ akcji: {action_type_name}")
+            return False
+
+        session.execute(insert(Log).values(
+            user_id=user_id,
+            guild_id=guild_id,
+            log_level_id=log_level_id,
+            action_type_id=action_type_id,
+            details=details
+        ))
+        return True
+
+    def add_logs(self, entries: List[LogEntry]) -> int:
+        """Dodaje wiele wpisów do logów jednym INSERT-em w jednej transakcji
+
+        :return: Liczba zapisanych wpisów
+        """
+        return self.write("add_logs", entries)
+
+    def _add_logs_op(self, session: Session, entries: List[LogEntry]) -> int:
+        rows = []
+        for entry in entries:
+            log_level_id, action_type_id = self._resolve_log_reference_ids(
+                session,
+                entry.log_level_name,
+                entry.action_type_name
+            )
+            if log_level_id is None or action_type_id is None:
+                self.logger.error(
+                    f"Pominięto wpis logu o nieznanym poziomie/typie: "
+                    f"{entry.log_level_name}/{entry.action_type_name}"
+                )
+                continue
+
+            rows.append({
+                "user_id": entry.user_id,
+                "guild_id": entry.guild_id,
+                "log_level_id": log_level_id,
+                "action_type_id": action_type_id,
+                "details": entry.details,
+                "created_at": entry.created_at
+            })
+
+        if rows:
+            session.execute(insert(Log), rows)
+        return len(rows)
+
+    # --- Retencja logów ---
+
+    def get_logs_for_archive(self, limit: int, created_before: Optional[datetime] = None,
+                             guild_id: Optional[int] = None, below_id: Optional[int] = None) -> List[dict]:
+        """Pobiera najstarsze wpisy logów spełniające kryteria retencji (rosnąco po ID)
+
+        Zwraca tylko wpisy już policzone w log_rollups - usunięcie
+        nieprzetworzonego wpisu zaniżyłoby liczniki.
+        """
         try:
             with Session(self.engine) as session:
-                # Znajdź ID poziomu logowania
-                log_level = session.scalar(
-                    select(LogLevel).where(LogLevel.name == log_level_name)
-                )
-                if not log_level:
-                    self.logger.error(f"Nieznany poziom logowania: {log_level_name}")
-                    return False
+                conditions = [Log.id <= self._log_rollup_last_id().scalar_subquery()]
+
+                if created_before is not None:
+                    conditions.append(Log.created_at < created_before)
+
+                if guild_id is not None:
+                    conditions.append(Log.guild_id == guild_id)
 
-                # Znajdź ID typu akcji
-                action_type = session.scalar(
-                    select(ActionType).where(ActionType.name == action_type_name)
+                if below_id is not None:
+                    conditions.append(Log.id < below_id)
+
+                stmt = (
+                    select(
+                        Log.id,
+                        Log.guild_id,
+                        Log.user_id,
+                        LogLevel.name.label("log_level"),
+                        ActionType.name.label("action_type"),
+                        Log.details,
+                        Log.created_at
+                    )
+                    .join(LogLevel, Log.log_level_id == LogLevel.id)
+                    .join(ActionType, Log.action_type_id == ActionType.id)
+                    .where(and_(*conditions))
+                    .order_by(Log.id)
+                    .limit(limit)
                 )
-                if not action_type:
-                    self.logger.error(f"Nieznany typ akcji: {action_type_name}")
-                    return False
-
-                # Dodaj log
-                log = Log(
-                    user_id=user_id,
-                    guild_id=guild_id,
-                    log_level_id=log_level.id,
-                    action_type_id=action_type.id,
-                    details=details
+                return [dict(row) for row in session.execute(stmt).mappings()]
+        except Exception as e:
+            self.logger.error(f"Błąd pobierania logów do archiwizacji: {e}")
+            return []
+
+    def get_log_row_budget_cutoffs(self, max_rows: int) -> Dict[int, int]:
+        """Zwraca dla serwerów przekraczających limit wierszy najmniejsze ID, które zostaje"""
+        try:
+            with Session(self.engine) as session:
+                guild_ids = session.scalars(
+                    select(Log.guild_id).group_by(Log.guild_id).having(func.count() > max_rows)
+                ).all()
+
+                cutoffs = {}
+                for guild_id in guild_ids:
+                    cutoffs[guild_id] = session.scalar(
+                        select(Log.id)
+                        .where(Log.guild_id == guild_id)
+                        .order_by(Log.id.desc())
+                        .offset(max_rows - 1)
+                        .limit(1)
+                    )
+                return cutoffs
+        except Exception as e:
+            self.logger.error(f"Błąd wyznaczania limitów logów: {e}")
+            return {}
+
+    # --- Liczniki logów (log_rollups) ---
+
+    def rollup_logs(self, batch_size: int = 5000) -> int:
+        """Dolicza do log_rollups wpisy logów dodane od poprzedniego przebiegu
+
+        Wpisy są przetwarzane partiami kolejnych ID, każda partia jako osobna
+        operacja zapisu. Liczniki godzinowe i dzienne partii oraz nowy
+        znacznik postępu (rollup_state) są zapisywane w jednej transakcji,
+        więc każdy wpis jest liczony dokładnie raz.
+
+        :return: Liczba przetworzonych wpisów
+        """
+        processed = 0
+        while True:
+            count = self.write("rollup_logs_batch", batch_size)
+            processed += count
+            if count < batch_size:
+                return processed
+
+    def _rollup_logs_batch_op(self, session: Session, batch_size: int) -> int:
+        last_id = session.execute(self._log_rollup_last_id()).scalar()
+
+        batch = select(Log.id).where(Log.id > last_id).order_by(Log.id).limit(batch_size).subquery()
+        upper_id, count = session.execute(select(func.max(batch.c.id), func.count()).select_from(batch)).one()
+        if not count:
+            return 0
+
+        for granularity, period_format in LOG_ROLLUP_PERIODS.items():
+            period = func.strftime(period_format, Log.created_at)
+            totals = (
+                select(
+                    Log.guild_id,
+                    literal(granularity),
+                    period,
+                    Log.action_type_id,
+                    Log.log_level_id,
+                    func.count()
                 )
-                session.add(log)
-                session.commit()
-                return True
+                .where(Log.id > last_id, Log.id <= upper_id)
+                .group_by(Log.guild_id, period, Log.action_type_id, Log.log_level_id)
+            )
+            stmt = sqlite_insert(LogRollup).from_select(
+                ["guild_id", "granularity", "period", "action_type_id", "log_level_id", "count"], totals
+            )
+            session.execute(stmt.on_conflict_do_update(
+                index_elements=["guild_id", "granularity", "period", "action_type_id", "log_level_id"],
+                set_={"count": LogRollup.count + stmt.excluded.count}
+            ))
+
+        state = sqlite_insert(RollupState).values(name=LOG_ROLLUP_STATE, last_id=upper_id)
+        session.execute(state.on_conflict_do_update(
+            index_elements=["name"],
+            set_={"last_id": state.excluded.last_id, "updated_at": func.now()}
+        ))
+        return count
+
+    def get_log_rollups(self, guild_id: int, granularity: str, since: str) -> List[LogRollupModel]:
+        """Liczniki logów serwera od okresu since (format jak LOG_ROLLUP_PERIODS)"""
+        try:
+            with self.engine.connect() as connection:
+                return [
+                    LogRollupModel(*row)
+                    for row in connection.execute(
+                        queries.GUILD_LOG_ROLLUPS,
+                        {"guild_id": guild_id, "granularity": granularity, "since": since}
+                    )
+                ]
         except Exception as e:
-            self.logger.error(f"Błąd dodawania logu: {e}")
-            return False
+            self.logger.error(f"Błąd pobierania liczników logów: {e}")
+            return []
+
+    def prune_log_rollups(self, granularity: str, before: str) -> int:
+        """Usuwa liczniki danej szczegółowości z okresów wcześniejszych niż before"""
+        return self.write("prune_log_rollups", granularity, before)
+
+    @staticmethod
+    def _prune_log_rollups_op(session: Session, granularity: str, before: str) -> int:
+        return session.execute(delete(LogRollup).where(
+            LogRollup.granularity == granularity,
+            LogRollup.period < before
+        )).rowcount
+
+    @staticmethod
+    def _log_rollup_last_id():
+        """ID ostatniego wpisu logów policzonego w log_rollups (0 przed pierwszym przebiegiem)"""
+        return select(func.coalesce(
+            select(RollupState.last_id).where(RollupState.name == LOG_ROLLUP_STATE).scalar_subquery(), 0
+        ))
+
+    def delete_logs(self, log_ids: List[int]) -> int:
+        """Usuwa wpisy logów o podanych ID jedną operacją zapisu"""
+        return self.write("delete_logs", log_ids)
+
+    @staticmethod
+    def _delete_logs_op(session: Session, log_ids: List[int]) -> int:
+        return session.execute(delete(Log).where(Log.id.in_(log_ids))).rowcount
 
     # --- Harmonogramy czyszczenia ---
 
     def add_cleaning_schedule(self, schedule: CleaningSchedule) -> bool:
         """Dodaje harmonogram czyszczenia"""
-        try:
-            with Session(self.engine) as session:
-                schedule_db = Schedule(
-                    task_type="cleaning",
-                    guild_id=schedule.guild_id,
-                    channel_id=schedule.channel_id,
-                    run_time=schedule.time,
-                    frequency_id=schedule.frequency_id,
-                    is_active=schedule.is_active,
-                    added_by=schedule.added_by,
-                    added_at=schedule.added_at,
-                    last_run_at=schedule.last_run_at,
-                    exclude_pinned=schedule.exclude_pinned,
-                    message_template=None
-                )
-                session.add(schedule_db)
-                session.commit()
-                schedule.schedule_id = schedule_db.id
-                return True
-        except Exception as e:
-            self.logger.error(f"Błąd dodawania harmonogramu czyszczenia {schedule.channel_id}: {e}")
-            return False
+        return self.write("add_cleaning_schedule", schedule)
+
+    def _add_cleaning_schedule_op(self, session: Session, schedule: CleaningSchedule) -> bool:
+        schedule_db = Schedule(
+            task_type="cleaning",
+            guild_id=schedule.guild_id,
+            channel_id=schedule.channel_id,
+            run_time=schedule.time,
+            frequency_id=schedule.frequency_id,
+            is_active=schedule.is_active,
+            added_by=schedule.added_by,
+            added_at=schedule.added_at,
+            last_run_at=schedule.last_run_at,
+            exclude_pinned=schedule.exclude_pinned,
+            message_template=None
+        )
+        session.add(schedule_db)
+        session.flush()
+        schedule_id = schedule_db.id
+
+        def publish():
+            schedule.schedule_id = schedule_id
+            self.schedule_index.add_cleaning(schedule)
+
+        after_commit(session, publish)
+        return True
 
     def update_cleaning_schedule_last_run(self, schedule_id: int, last_run_at: datetime) -> bool:
         """Aktualizuje czas ostatniego uruchomienia harmonogramu"""
-        try:
-            with Session(self.engine) as session:
-                stmt = update(Schedule).where(
-                    Schedule.id == schedule_id
-                ).values(last_run_at=last_run_at)
-                session.execute(stmt)
-                session.commit()
-                return True
-        except Exception as e:
-            self.logger.error(f"Błąd aktualizacji harmonogramu {schedule_id}: {e}")
-            return False
+        return self.write("update_cleaning_schedule_last_run", schedule_id, last_run_at)
+
+    def _update_cleaning_schedule_last_run_op(self, session: Session, schedule_id: int, last_run_at: datetime) -> bool:
+        session.execute(update(Schedule).where(Schedule.id == schedule_id).values(last_run_at=last_run_at))
+        after_commit(session, lambda: self.schedule_index.update_last_run(schedule_id, last_run_at))
+        return True
 
     def remove_cleaning_schedule(self, channel_id: int, guild_id: int) -> bool:
         """Usuwa harmonogram czyszczenia"""
-        try:
-            with Session(self.engine) as session:
-                stmt = delete(Schedule).where(
-                    and_(
-                        Schedule.channel_id == channel_id,
-                        Schedule.guild_id == guild_id,
-                        Schedule.task_type == "cleaning"
-                    )
-                )
-                result = session.execute(stmt)
-                session.commit()
-                return result.rowcount > 0
-        except Exception as e:
-            self.logger.error(f"Błąd usuwania harmonogramu {channel_id}: {e}")
-            return False
+        return self.write("remove_cleaning_schedule", channel_id, guild_id)
+
+    def _remove_cleaning_schedule_op(self, session: Session, channel_id: int, guild_id: int) -> bool:
+        result = session.execute(delete(Schedule).where(
+            and_(
+                Schedule.channel_id == channel_id,
+                Schedule.guild_id == guild_id,
+                Schedule.task_type == "cleaning"
+            )
+        ))
+        after_commit(session, lambda: self.schedule_index.remove_cleaning(guild_id, channel_id))
+        return result.rowcount > 0
 
     def get_cleaning_schedule(self, channel_id: int, guild_id: int) -> Optional[CleaningSchedule]:
         """Pobiera harmonogram czyszczenia"""
         try:
-            with Session(self.engine) as session:
-                stmt = select(Schedule).where(
-                    and_(
-                        Schedule.channel_id == channel_id,
-                        Schedule.guild_id == guild_id,
-                        Schedule.task_type == "cleaning"
-                    )
-                )
-                result = session.scalar(stmt)
-                if result:
-                    domain_schedule = result.to_cleaning_domain()
-                    domain_schedule.schedule_id = result.id
-                    return domain_schedule
-                return None
+            with self.engine.connect() as connection:
+                row = connection.execute(
+                    queries.CLEANING_SCHEDULE_BY_CHANNEL,
+                    {"channel_id": channel_id, "guild_id": guild_id}
+                ).first()
+                return CleaningSchedule(*row) if row else None
         except Exception as e:
             self.logger.error(f"Błąd pobierania harmonogramu {channel_id}: {e}")
             return None
@@ -201,17 +747,8 @@ class ConfigManager:
     def get_all_cleaning_schedules(self) -> List[CleaningSchedule]:
         """Pobiera wszystkie harmonogramy czyszczenia"""
         try:
-            with Session(self.engine) as session:
-                stmt = select(Schedule).where(
-                    Schedule.task_type == "cleaning"
-                )
-                results = session.scalars(stmt).all()
-                schedules = []
-                for result in results:
-                    domain_schedule = result.to_cleaning_domain()
-                    domain_schedule.schedule_id = result.id
-                    schedules.append(domain_schedule)
-                return schedules
+            with self.engine.connect() as connection:
+                return [CleaningSchedule(*row) for row in connection.execute(queries.ALL_CLEANING_SCHEDULES)]
         except Exception as e:
             self.logger.error(f"Błąd ładowania harmonogramów czyszczenia: {e}")
             return []
@@ -219,215 +756,485 @@ class ConfigManager:
     # --- Zarządzanie długami ---
 
     def add_debt(self, debt: DebtModel) -> bool:
-        """Dodaje nowy dług"""
-        try:
-            with Session(self.engine) as session:
-                debt_db = Debt(
-                    debtor_id=debt.debtor_id,
-                    creditor_id=debt.creditor_id,
-                    amount=debt.amount,
-                    currency=debt.currency,
-                    description=debt.description,
-                    guild_id=debt.guild_id,
-                    is_settled=debt.is_settled,
-                    created_at=debt.created_at,
-                    updated_at=debt.updated_at
-                )
-                session.add(debt_db)
-                session.commit()
-                debt.debt_id = debt_db.id
-
-                # Dodaj powiązania z harmonogramami przypomnień
-                for schedule_id in debt.schedule_ids:
-                    debt_schedule = DebtSchedule(
-                        debt_id=debt_db.id,
-                        schedule_id=schedule_id
-                    )
-                    session.add(debt_schedule)
+        """Dodaje nowy dług i aktualizuje saldo pary w tej samej transakcji"""
+        return self.write("add_debt", debt)
 
-                session.commit()
-                return True
-        except Exception as e:
-            self.logger.error(f"Błąd dodawania długu: {e}")
+    def _add_debt_op(self, session: Session, debt: DebtModel) -> bool:
+        debt_id = session.execute(
+            insert(Debt).values(
+                debtor_id=debt.debtor_id,
+                creditor_id=debt.creditor_id,
+                amount=debt.amount,
+                currency=debt.currency,
+                description=debt.description,
+                guild_id=debt.guild_id,
+                is_settled=debt.is_settled,
+                created_at=debt.created_at,
+                updated_at=debt.updated_at
+            ).returning(Debt.id)
+        ).scalar_one()
+
+        # Powiązania z harmonogramami przypomnień jednym INSERT-em
+        if debt.schedule_ids:
+            session.execute(insert(DebtSchedule), [
+                {"debt_id": debt_id, "schedule_id": schedule_id}
+                for schedule_id in debt.schedule_ids
+            ])
+
+        if not debt.is_settled:
+            self._apply_balance_delta(
+                session, debt.guild_id, debt.debtor_id, debt.creditor_id,
+                debt.currency, debt.amount, 1
+            )
+
+        after_commit(session, lambda: setattr(debt, "debt_id", debt_id))
+        return True
+
+    def settle_debt(self, debt_id: int, guild_id: Optional[int] = None) -> bool:
+        """Oznacza dług jako spłacony i aktualizuje saldo pary w tej samej transakcji
+
+        :param guild_id: Serwer długu - dług innego serwera nie zostanie spłacony (wymagany przy shardingu)
+        """
+        return self.write("settle_debt", debt_id, guild_id)
+
+    def _settle_debt_op(self, session: Session, debt_id: int, guild_id: Optional[int] = None) -> bool:
+        debt_db = session.get(Debt, debt_id)
+        if not debt_db or (guild_id is not None and debt_db.guild_id != guild_id):
             return False
 
-    def settle_debt(self, debt_id: int) -> bool:
-        """Oznacza dług jako spłacony"""
+        # Ponowna spłata nie może drugi raz pomniejszyć salda
+        if not debt_db.is_settled:
+            debt_db.is_settled = True
+            debt_db.updated_at = datetime.now()
+            self._apply_balance_delta(
+                session, debt_db.guild_id, debt_db.debtor_id, debt_db.creditor_id,
+                debt_db.currency, -debt_db.amount, -1
+            )
+            session.flush()
+        return True
+
+    def get_debt(self, guild_id: int, debt_id: int) -> Optional[DebtModel]:
+        """Pobiera dług serwera po ID (bez powiązanych harmonogramów)"""
         try:
-            with Session(self.engine) as session:
-                stmt = update(Debt).where(
-                    Debt.id == debt_id
-                ).values(is_settled=True, updated_at=datetime.now())
-                result = session.execute(stmt)
-                session.commit()
-                return result.rowcount > 0
+            with self._guild_engine(guild_id).connect() as connection:
+                row = connection.execute(queries.DEBT_BY_ID, {"debt_id": debt_id, "guild_id": guild_id}).first()
+                return DebtModel(*row) if row else None
         except Exception as e:
-            self.logger.error(f"Błąd oznaczania długu jako spłacony {debt_id}: {e}")
-            return False
+            self.logger.error(f"Błąd pobierania długu {debt_id}: {e}")
+            return None
 
     def get_debts(self, guild_id: int, debtor_id: Optional[int] = None,
-                  creditor_id: Optional[int] = None, is_settled: Optional[bool] = None) -> List[DebtModel]:
-        """Pobiera długi według kryteriów"""
-        try:
-            with Session(self.engine) as session:
-                conditions = [Debt.guild_id == guild_id]
-
-                if debtor_id is not None:
-                    conditions.append(Debt.debtor_id == debtor_id)
-
-                if creditor_id is not None:
-                    conditions.append(Debt.creditor_id == creditor_id)
-
-                if is_settled is not None:
-                    conditions.append(Debt.is_settled == is_settled)
-
-                stmt = select(Debt).where(and_(*conditions))
-                results = session.scalars(stmt).all()
-
-                debts = []
-                for result in results:
-                    debt = DebtModel(
-                        debtor_id=result.debtor_id,
-                        creditor_id=result.creditor_id,
-                        amount=result.amount,
-                        currency=result.currency,
-                        description=result.description,
-                        guild_id=result.guild_id,
-                        is_settled=result.is_settled,
-                        created_at=result.created_at,
-                        updated_at=result.updated_at,
-                        debt_id=result.id
-                    )
+                  creditor_id: Optional[int] = None, is_settled: Optional[bool] = None,
+                  include_schedule_ids: bool = True) -> List[DebtModel]:
+        """Pobiera długi według kryteriów
 
-                    # Pobierz powiązane harmonogramy
-                    schedule_stmt = select(DebtSchedule).where(
-                        DebtSchedule.debt_id == result.id
-                    )
-                    schedule_results = session.scalars(schedule_stmt).all()
-                    debt.schedule_ids = [ds.schedule_id for ds in schedule_results]
+        Powiązane harmonogramy są ładowane jednym dodatkowym zapytaniem na
+        IN_CLAUSE_CHUNK długów. Jeśli wywołujący nie potrzebuje schedule_ids,
+        może całkowicie pominąć to zapytanie.
+        """
+        try:
+            with self._guild_engine(guild_id).connect() as connection:
+                debts = [
+                    DebtModel(*row)
+                    for row in connection.execute(queries.debts_query(guild_id, debtor_id, creditor_id, is_settled))
+                ]
 
-                    debts.append(debt)
+                if include_schedule_ids and debts:
+                    by_id = {debt.debt_id: debt for debt in debts}
+                    debt_ids = list(by_id)
+                    for start in range(0, len(debt_ids), IN_CLAUSE_CHUNK):
+                        rows = connection.execute(
+                            queries.DEBT_SCHEDULE_IDS,
+                            {"debt_ids": debt_ids[start:start + IN_CLAUSE_CHUNK]}
+                        )
+                        for debt_id, schedule_id in rows:
+                            by_id[debt_id].schedule_ids.append(schedule_id)
 
                 return debts
         except Exception as e:
             self.logger.error(f"Błąd pobierania długów: {e}")
             return []
 
+    def get_debts_page(self, guild_id: int, member_id: Optional[int] = None,
+                       is_settled: Optional[bool] = None, after_id: Optional[int] = None,
+                       before_id: Optional[int] = None, limit: int = 10) -> DebtPage:
+        """Pobiera stronę długów uporządkowaną po ID (paginacja keyset)
+
+        Kolejna strona zaczyna się po after_id, poprzednia kończy przed before_id.
+        Koszt zapytania nie zależy od numeru strony ani rozmiaru rejestru.
+
+        :param member_id: Tylko długi, w których członek jest dłużnikiem lub wierzycielem
+        """
+        try:
+            with self._guild_engine(guild_id).connect() as connection:
+                # Jeden dodatkowy wiersz mówi, czy istnieje kolejna strona w tym kierunku
+                rows = connection.execute(
+                    queries.debts_page_query(guild_id, member_id, is_settled, after_id, before_id, limit + 1)
+                ).all()
+
+            has_more = len(rows) > limit
+            debts = [DebtModel(*row) for row in rows[:limit]]
+
+            if before_id is not None:
+                debts.reverse()
+                return DebtPage(debts=debts, has_previous=has_more, has_next=True)
+            return DebtPage(debts=debts, has_previous=after_id is not None, has_next=has_more)
+        except Exception as e:
+            self.logger.error(f"Błąd pobierania strony długów: {e}")
+            return DebtPage()
+
+    # --- Salda długów ---
+
+    @staticmethod
+    def _apply_balance_delta(session: Session, guild_id: int, debtor_id: int, creditor_id: int,
+                             currency: str, amount: Decimal, debt_count: int):
+        """Zmienia saldo pary w bieżącej transakcji, usuwając je po spłacie wszystkich długów"""
+        stmt = sqlite_insert(DebtBalance).values(
+            guild_id=guild_id,
+            debtor_id=debtor_id,
+            creditor_id=creditor_id,
+            currency=currency,
+            amount=amount,
+            debt_count=debt_count
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["guild_id", "debtor_id", "creditor_id", "currency"],
+            set_={
+                "amount": DebtBalance.amount + stmt.excluded.amount,
+                "debt_count": DebtBalance.debt_count + stmt.excluded.debt_count,
+                "updated_at": func.now()
+            }
+        )
+        session.execute(stmt)
+
+        if debt_count < 0:
+            session.execute(delete(DebtBalance).where(
+                DebtBalance.guild_id == guild_id,
+                DebtBalance.debtor_id == debtor_id,
+                DebtBalance.creditor_id == creditor_id,
+                DebtBalance.currency == currency,
+                DebtBalance.debt_count <= 0
+            ))
+
+    def get_debt_balances(self, guild_id: int, member_id: Optional[int] = None) -> List[DebtBalanceModel]:
+        """Pobiera salda niespłaconych długów serwera (opcjonalnie tylko pary z udziałem członka)"""
+        try:
+            with self._guild_engine(guild_id).connect() as connection:
+                return [
+                    DebtBalanceModel(*row)
+                    for row in connection.execute(queries.debt_balances_query(guild_id, member_id))
+                ]
+        except Exception as e:
+            self.logger.error(f"Błąd pobierania sald długów: {e}")
+            return []
+
+    def get_open_debt_descriptions(self, guild_id: int, debtor_id: int, creditor_id: int,
+                                   currency: str) -> List[str]:
+        """Opisy niespłaconych długów jednej pary w walucie (do przypomnień)"""
+        try:
+            with self._guild_engine(guild_id).connect() as connection:
+                return list(connection.execute(queries.OPEN_DEBT_DESCRIPTIONS, {
+                    "guild_id": guild_id,
+                    "debtor_id": debtor_id,
+                    "creditor_id": creditor_id,
+                    "currency": currency
+                }).scalars())
+        except Exception as e:
+            self.logger.error(f"Błąd pobierania opisów długów: {e}")
+            return []
+
+    def get_debt_totals(self, guild_id: int, member_id: Optional[int] = None,
+                        is_settled: Optional[bool] = None) -> List[DebtBalanceModel]:
+        """Sumuje długi po stronie SQL według pary i waluty jednym zapytaniem GROUP BY
+
+        W odróżnieniu od get_debt_balances obsługuje też długi spłacone.
+
+        :param member_id: Tylko pary, w których członek jest dłużnikiem lub wierzycielem
+        """
+        try:
+            with self._guild_engine(guild_id).connect() as connection:
+                return [
+                    DebtBalanceModel(*row)
+                    for row in connection.execute(queries.debt_totals_query(guild_id, member_id, is_settled))
+                ]
+        except Exception as e:
+            self.logger.error(f"Błąd sumowania długów: {e}")
+            return []
+
+    def rebuild_debt_balances(self, guild_id: int, verify_only: bool = False) -> Optional[Dict[str, int]]:
+        """Przelicza salda serwera z tabeli długów i porównuje je z zapisanymi
+
+        Przy shardingu czytany jest tylko plik serwera.
+
+        :param verify_only: Tylko sprawdza zgodność, bez zapisu
+        :return: Liczba par oraz liczba niezgodności przed przebudową (None przy błędzie)
+        """
+        return self.write("rebuild_debt_balances", guild_id, verify_only)
+
+    def _rebuild_debt_balances_op(self, session: Session, guild_id: int, verify_only: bool = False) -> Dict[str, int]:
+        expected = {
+            (row.debtor_id, row.creditor_id, row.currency): (row.amount, row.debt_count)
+            for row in session.execute(
+                select(
+                    Debt.debtor_id,
+                    Debt.creditor_id,
+                    Debt.currency,
+                    func.sum(Debt.amount).label("amount"),
+                    func.count().label("debt_count")
+                )
+                .where(Debt.guild_id == guild_id, Debt.is_settled.is_(False))
+                .group_by(Debt.debtor_id, Debt.creditor_id, Debt.currency)
+            )
+        }
+        stored = {
+            (row.debtor_id, row.creditor_id, row.currency): (row.amount, row.debt_count)
+            for row in session.execute(
+                select(DebtBalance.debtor_id, DebtBalance.creditor_id, DebtBalance.currency,
+                       DebtBalance.amount, DebtBalance.debt_count)
+                .where(DebtBalance.guild_id == guild_id)
+            )
+        }
+        mismatches = sum(1 for key in expected.keys() | stored.keys() if expected.get(key) != stored.get(key))
+
+        if not verify_only and mismatches:
+            session.execute(delete(DebtBalance).where(DebtBalance.guild_id == guild_id))
+            if expected:
+                session.execute(insert(DebtBalance), [
+                    {
+                        "guild_id": guild_id,
+                        "debtor_id": debtor_id,
+                        "creditor_id": creditor_id,
+                        "currency": currency,
+                        "amount": amount,
+                        "debt_count": debt_count
+                    }
+                    for (debtor_id, creditor_id, currency), (amount, debt_count) in expected.items()
+                ])
+            after_commit(session, lambda: self.logger.info(
+                f"Przebudowano salda długów: serwer={guild_id}, par={len(expected)}, niezgodności={mismatches}"
+            ))
+
+        return {"pairs": len(expected), "mismatches": mismatches}
+
+    def iter_debts(self, guild_id: int, batch_size: int = 1000) -> Iterator[DebtModel]:
+        """Strumieniowo zwraca wszystkie długi serwera (kursor po stronie bazy, partiami po batch_size)
+
+        Połączenie jest otwarte do wyczerpania generatora - konsumować w jednym wątku.
+        """
+        with self._guild_engine(guild_id).connect() as connection:
+            rows = connection.execution_options(yield_per=batch_size).execute(
+                select(*queries.DEBT_COLUMNS).where(Debt.guild_id == guild_id).order_by(Debt.id)
+            )
+            for row in rows:
+                yield DebtModel(*row)
+
+    def import_debts(self, debts: List[DebtModel]) -> int:
+        """Wstawia partię długów jednym INSERT-em i aktualizuje salda par w tej samej transakcji
+
+        Przy shardingu długi różnych serwerów są zapisywane osobnymi operacjami.
+
+        :return: Liczba wstawionych długów (0 przy błędzie - partia jest wycofywana w całości)
+        """
+        if not debts:
+            return 0
+
+        guild_ids = {debt.guild_id for debt in debts}
+        if self.shards and len(guild_ids) > 1:
+            # Każdy serwer ma własny plik, więc i własną transakcję
+            return sum(self.write("import_guild_debts", [debt for debt in debts if debt.guild_id == guild_id])
+                       for guild_id in guild_ids)
+        return self.write("import_guild_debts", debts)
+
+    def _import_guild_debts_op(self, session: Session, debts: List[DebtModel]) -> int:
+        session.execute(insert(Debt), [
+            {
+                "debtor_id": debt.debtor_id,
+                "creditor_id": debt.creditor_id,
+                "amount": debt.amount,
+                "currency": debt.currency,
+                "description": debt.description,
+                "guild_id": debt.guild_id,
+                "is_settled": debt.is_settled,
+                "created_at": debt.created_at,
+                "updated_at": debt.updated_at
+            }
+            for debt in debts
+        ])
+
+        # Jedna zmiana salda na parę zamiast na każdy dług
+        deltas: Dict[Tuple[int, int, int, str], List] = {}
+        for debt in debts:
+            if debt.is_settled:
+                continue
+            delta = deltas.setdefault(
+                (debt.guild_id, debt.debtor_id, debt.creditor_id, debt.currency), [Decimal("0"), 0]
+            )
+            delta[0] += debt.amount
+            delta[1] += 1
+
+        for (guild_id, debtor_id, creditor_id, currency), (amount, debt_count) in deltas.items():
+            self._apply_balance_delta(session, guild_id, debtor_id, creditor_id, currency, amount, debt_count)
+        return len(debts)
+
     # --- Harmonogramy przypomnień o długach ---
 
     def add_debt_reminder_schedule(self, schedule: DebtReminderSchedule) -> bool:
         """Dodaje harmonogram przypomnień o długach"""
-        try:
-            with Session(self.engine) as session:
-                schedule_db = Schedule(
-                    task_type="debt_reminder",
-                    guild_id=schedule.guild_id,
-                    channel_id=schedule.channel_id,
-                    run_time=schedule.run_time,
-                    frequency_id=schedule.frequency_id,
-                    is_active=schedule.is_active,
-                    added_by=schedule.added_by,
-                    added_at=schedule.added_at,
-                    last_run_at=schedule.last_run_at,
-                    exclude_pinned=False,
-                    message_template=schedule.message_template
-                )
-                session.add(schedule_db)
-                session.commit()
-                schedule.schedule_id = schedule_db.id
-                return True
-        except Exception as e:
-            self.logger.error(f"Błąd dodawania harmonogramu przypomnień: {e}")
-            return False
+        return self.write("add_debt_reminder_schedule", schedule)
+
+    def _add_debt_reminder_schedule_op(self, session: Session, schedule: DebtReminderSchedule) -> bool:
+        schedule_db = Schedule(
+            task_type="debt_reminder",
+            guild_id=schedule.guild_id,
+            channel_id=schedule.channel_id,
+            run_time=schedule.run_time,
+            frequency_id=schedule.frequency_id,
+            is_active=schedule.is_active,
+            added_by=schedule.added_by,
+            added_at=schedule.added_at,
+            last_run_at=schedule.last_run_at,
+            exclude_pinned=False,
+            message_template=schedule.message_template
+        )
+        session.add(schedule_db)
+        session.flush()
+        schedule_id = schedule_db.id
+
+        def publish():
+            schedule.schedule_id = schedule_id
+            self.schedule_index.add_reminder(schedule)
+
+        after_commit(session, publish)
+        return True
 
     def get_debt_reminder_schedules(self, guild_id: Optional[int] = None) -> List[DebtReminderSchedule]:
         """Pobiera harmonogramy przypomnień o długach"""
         try:
-            with Session(self.engine) as session:
-                conditions = [Schedule.task_type == "debt_reminder"]
-                if guild_id is not None:
-                    conditions.append(Schedule.guild_id == guild_id)
-
-                stmt = select(Schedule).where(and_(*conditions))
-                results = session.scalars(stmt).all()
-
-                schedules = []
-                for result in results:
-                    schedule = DebtReminderSchedule(
-                        guild_id=result.guild_id,
-                        channel_id=result.channel_id,
-                        run_time=result.run_time,
-                        frequency_id=result.frequency_id,
-                        message_template=result.message_template,
-                        is_active=result.is_active,
-                        added_by=result.added_by,
-                        added_at=result.added_at,
-                        last_run_at=result.last_run_at,
-                        schedule_id=result.id
-                    )
-                    schedules.append(schedule)
-
-                return schedules
+            with self.engine.connect() as connection:
+                if guild_id is None:
+                    rows = connection.execute(queries.ALL_REMINDER_SCHEDULES)
+                else:
+                    rows = connection.execute(queries.GUILD_REMINDER_SCHEDULES, {"guild_id": guild_id})
+                return [DebtReminderSchedule(*row) for row in rows]
         except Exception as e:
             self.logger.error(f"Błąd pobierania harmonogramów przypomnień: {e}")
             return []
 
+    # --- Indeks harmonogramów dla schedulera ---
+
+    def get_due_schedules(self, run_time: str) -> Tuple[List[CleaningSchedule], List[DebtReminderSchedule]]:
+        """Zwraca aktywne harmonogramy czyszczenia i przypomnień na podaną godzinę (HH:MM)"""
+        try:
+            self.schedule_index.load(self._load_active_schedules)
+            return self.schedule_index.due(run_time)
+        except Exception as e:
+            self.logger.error(f"Błąd ładowania indeksu harmonogramów: {e}")
+            return [], []
+
+    def get_schedule_run_times(self) -> List[str]:
+        """Zwraca godziny (HH:MM), o których są aktywne harmonogramy"""
+        try:
+            self.schedule_index.load(self._load_active_schedules)
+            return self.schedule_index.run_times()
+        except Exception as e:
+            self.logger.error(f"Błąd ładowania indeksu harmonogramów: {e}")
+            return []
+
+    def _load_active_schedules(self) -> Tuple[List[CleaningSchedule], List[DebtReminderSchedule]]:
+        """Ładuje wszystkie aktywne harmonogramy (dwa zapytania po indeksie task_type)"""
+        with self.engine.connect() as connection:
+            cleaning_schedules = [
+                CleaningSchedule(*row) for row in connection.execute(queries.ACTIVE_CLEANING_SCHEDULES)
+            ]
+            reminder_schedules = [
+                DebtReminderSchedule(*row) for row in connection.execute(queries.ACTIVE_REMINDER_SCHEDULES)
+            ]
+            return cleaning_schedules, reminder_schedules
+
     # --- Ustawienia serwera (guild settings) ---
     def set_guild_setting(self, guild_id: int, key: str, value: str) -> bool:
         """Ustawia wartość dla serwera"""
-        try:
-            with Session(self.engine) as session:
-                setting = GuildSetting(
-                    guild_id=guild_id,
-                    key=key,
-                    value=str(value)
-                )
-                session.merge(setting)
-                session.commit()
-                return True
-        except Exception as e:
-            self.logger.error(f"Błąd zapisu ustawień gildii {guild_id}.{key}: {e}")
-            return False
+        return self.write("set_guild_setting", guild_id, key, value)
+
+    def _set_guild_setting_op(self, session: Session, guild_id: int, key: str, value: str) -> bool:
+        session.merge(GuildSetting(guild_id=guild_id, key=key, value=str(value)))
+        session.flush()
+        after_commit(session, lambda: self.guild_settings_cache.update(guild_id, key, str(value)))
+        return True
 
     def get_guild_setting(self, guild_id: int, key: str, default: Any = None) -> str:
-        """Pobiera wartość ustawienia serwera"""
+        """Pobiera wartość ustawienia serwera (z pamięci podręcznej, przy braku - wszystkie ustawienia serwera)"""
         try:
-            with Session(self.engine) as session:
-                stmt = select(GuildSetting).where(
-                    GuildSetting.guild_id == guild_id,
-                    GuildSetting.key == key
-                )
-                result = session.scalar(stmt)
-                return result.value if result else default
+            settings = self.guild_settings_cache.get(guild_id)
+            if settings is None:
+                settings = self.load_guild_settings(guild_id)
+            return settings.get(key, default)
         except Exception:
             return default
 
+    def load_guild_settings(self, guild_id: int) -> Mapping[str, str]:
+        """Ładuje wszystkie ustawienia serwera jednym zapytaniem i zapisuje je w pamięci podręcznej"""
+        return self.preload_guild_settings([guild_id]).get(guild_id, MappingProxyType({}))
+
+    def preload_guild_settings(self, guild_ids: List[int]) -> Dict[int, Mapping[str, str]]:
+        """Ładuje ustawienia wielu serwerów (np. przy starcie bota) do pamięci podręcznej"""
+        return self._preload_settings(GuildSetting, GuildSetting.guild_id, self.guild_settings_cache, guild_ids)
+
     # --- Ustawienia użytkownika (user settings) ---
     def set_user_setting(self, user_id: int, key: str, value: str) -> bool:
         """Ustawia wartość dla użytkownika"""
-        try:
-            with Session(self.engine) as session:
-                setting = UserSetting(
-                    user_id=user_id,
-                    key=key,
-                    value=str(value)
-                )
-                session.merge(setting)
-                session.commit()
-                return True
-        except Exception as e:
-            self.logger.error(f"Błąd zapisu ustawień użytkownika {user_id}.{key}: {e}")
-            return False
+        return self.write("set_user_setting", user_id, key, value)
+
+    def _set_user_setting_op(self, session: Session, user_id: int, key: str, value: str) -> bool:
+        session.merge(UserSetting(user_id=user_id, key=key, value=str(value)))
+        session.flush()
+        after_commit(session, lambda: self.user_settings_cache.update(user_id, key, str(value)))
+        return True
 
     def get_user_setting(self, user_id: int, key: str, default: Any = None) -> str:
-        """Pobiera wartość ustawienia użytkownika"""
+        """Pobiera wartość ustawienia użytkownika (z pamięci podręcznej, przy braku - wszystkie ustawienia)"""
         try:
-            with Session(self.engine) as session:
-                stmt = select(UserSetting).where(
-                    UserSetting.user_id == user_id,
-                    UserSetting.key == key
-                )
-                result = session.scalar(stmt)
-                return result.value if result else default
+            settings = self.user_settings_cache.get(user_id)
+            if settings is None:
+                settings = self._preload_settings(
+                    UserSetting, UserSetting.user_id, self.user_settings_cache, [user_id]
+                )[user_id]
+            return settings.get(key, default)
         except Exception:
             return default
+
+    def _preload_settings(self, model, owner_column, cache: SettingsCache,
+                          owner_ids: List[int]) -> Dict[int, Mapping[str, str]]:
+        """Wczytuje komplet ustawień właścicieli (partiami po IN_CLAUSE_CHUNK) do pamięci podręcznej"""
+        loaded = {}
+        for start in range(0, len(owner_ids), IN_CLAUSE_CHUNK):
+            chunk = owner_ids[start:start + IN_CLAUSE_CHUNK]
+            generations = {owner_id: cache.generation(owner_id) for owner_id in chunk}
+            settings = {owner_id: {} for owner_id in chunk}
+
+            with Session(self.engine) as session:
+                rows = session.execute(
+                    select(owner_column, model.key, model.value).where(owner_column.in_(chunk))
+                )
+                for owner_id, key, value in rows:
+                    settings[owner_id][key] = value
+
+            for owner_id, owner_settings in settings.items():
+                cache.put(owner_id, owner_settings, generations[owner_id])
+                loaded[owner_id] = MappingProxyType(owner_settings)
+
+        return loaded
+
+
+# Rejestr instancji w obrębie procesu - jeden silnik i jedna inicjalizacja na plik bazy
+_config_managers: dict[str, ConfigManager] = {}
+_config_managers_lock = threading.Lock()
+
+
+def get_config_manager(db_path: str = DEFAULT_DB_PATH) -> ConfigManager:
+    """Zwraca współdzieloną instancję ConfigManager dla danego pliku bazy"""
+    key = db_path if db_path == MEMORY_DB_PATH else os.path.abspath(db_path)
+    with _config_managers_lock:
+        if key not in _config_managers:
+            _config_managers[key] = ConfigManager(db_path)
+        return _config_managers[key]
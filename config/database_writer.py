@@ -0,0 +1,177 @@
+"""
+Jeden pisarz bazy danych z grupowym zatwierdzaniem (group commit)
+"""
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from utils.logger import get_logger
+
+
+@dataclass(frozen=True)
+class WriteOperation:
+    """Operacja zapisu: op(session, *args) wykonywana w transakcji wywołującego
+
+    Przy błędzie wywołujący dostaje default, a błąd trafia do logu
+    z prefiksem error_message. guild_of(*args) zwraca ID serwera, którego
+    plik zmienia operacja (sharding); None - operacja wspólnej bazy.
+    """
+    op: Callable[..., Any]
+    error_message: str
+    default: Any = False
+    guild_of: Optional[Callable[..., Optional[int]]] = None
+
+
+@dataclass(frozen=True)
+class WriteOutcome:
+    """Wynik jednej operacji w partii - wartość albo wyjątek"""
+    ok: bool
+    value: Any = None
+    error: Optional[BaseException] = None
+
+
+# (nazwa operacji, argumenty pozycyjne, argumenty nazwane)
+WriteCall = Tuple[str, tuple, dict]
+
+
+class DatabaseWriter:
+    """Kolejkuje operacje zapisu i zatwierdza je partiami w jednej transakcji
+
+    Wszystkie zapisy przechodzą przez jedno zadanie, więc połączenia nie
+    konkurują o blokadę zapisu SQLite, a jeden COMMIT (jeden fsync) obejmuje
+    wiele operacji. Partia to wszystko, co czekało w kolejce w chwili
+    rozpoczęcia zapisu (najwyżej max_batch) - pojedynczy zapis nie czeka na
+    kolejne. Każda operacja ma własny Future z wynikiem lub błędem.
+
+    route(call) wskazuje bazę operacji (sharding) - partia jest dzielona na
+    grupy według bazy, zatwierdzane równolegle osobnymi wywołaniami executor.
+    """
+
+    def __init__(
+        self,
+        executor: Callable[[List[WriteCall], Any], Awaitable[List[WriteOutcome]]],
+        resolve: Callable[[str, WriteOutcome], Any],
+        route: Optional[Callable[[WriteCall], Any]] = None,
+        max_batch: int = 256
+    ):
+        self.max_batch = max_batch
+        self.logger = get_logger(__name__)
+
+        self._executor = executor
+        self._resolve = resolve
+        self._route = route
+        self._queue: asyncio.Queue[Optional[Tuple[WriteCall, Any, asyncio.Future]]] = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+
+        # Statystyki
+        self.batches_total = 0
+        self.operations_total = 0
+        self.largest_batch = 0
+        self.last_batch_size = 0
+        self.last_commit_latency = 0.0
+
+    @property
+    def depth(self) -> int:
+        """Liczba operacji oczekujących na zapis"""
+        return self._queue.qsize()
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """Uruchamia zadanie pisarza"""
+        if not self.is_running:
+            self._task = asyncio.create_task(self._run(), name="database-writer")
+
+    async def stop(self):
+        """Zatrzymuje pisarza po zapisaniu wszystkich oczekujących operacji"""
+        if self.is_running:
+            self._queue.put_nowait(None)
+            await self._task
+        self._task = None
+
+    async def submit(self, name: str, *args, **kwargs) -> Any:
+        """Kolejkuje operację i czeka na jej wynik po zatwierdzeniu partii"""
+        call = (name, args, kwargs)
+        try:
+            target = self._route(call) if self._route else None
+        except Exception as e:
+            return self._resolve(name, WriteOutcome(ok=False, error=e))
+
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((call, target, future))
+        return await future
+
+    def stats(self) -> dict:
+        """Zwraca statystyki pisarza"""
+        return {
+            "depth": self.depth,
+            "batches_total": self.batches_total,
+            "operations_total": self.operations_total,
+            "largest_batch": self.largest_batch,
+            "last_batch_size": self.last_batch_size,
+            "last_commit_latency_ms": round(self.last_commit_latency * 1000, 2)
+        }
+
+    async def _run(self):
+        while True:
+            item = await self._queue.get()
+            if item is None:
+                return
+
+            batch = [item]
+            stopping = False
+            while len(batch) < self.max_batch and not self._queue.empty():
+                item = self._queue.get_nowait()
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self._commit(batch)
+            if stopping:
+                # Operacje dodane po sygnale zakończenia też muszą dostać wynik
+                remaining = self._drain()
+                if remaining:
+                    await self._commit(remaining)
+                return
+
+    def _drain(self) -> list:
+        items = []
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not None:
+                items.append(item)
+        return items
+
+    async def _commit(self, batch: list):
+        groups: Dict[Any, list] = {}
+        for item in batch:
+            groups.setdefault(item[1], []).append(item)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(self._commit_group(target, items) for target, items in groups.items()))
+
+        self.last_commit_latency = time.perf_counter() - start
+        self.last_batch_size = len(batch)
+        self.largest_batch = max(self.largest_batch, len(batch))
+        self.batches_total += 1
+        self.operations_total += len(batch)
+
+    async def _commit_group(self, target: Any, items: list):
+        try:
+            outcomes = await self._executor([call for call, _, _ in items], target)
+        except Exception as e:
+            # Nieudany COMMIT - żadna operacja grupy nie została zapisana
+            self.logger.error(f"Błąd zatwierdzania partii {len(items)} zapisów: {e}", exc_info=True)
+            outcomes = [WriteOutcome(ok=False, error=e)] * len(items)
+
+        for ((name, _, _), _, future), outcome in zip(items, outcomes):
+            if future.done():
+                continue
+            try:
+                future.set_result(self._resolve(name, outcome))
+            except Exception as e:
+                future.set_exception(e)
@@ -0,0 +1,117 @@
+"""
+Indeks aktywnych harmonogramów w pamięci - Single Responsibility Principle
+"""
+import threading
+from collections import defaultdict
+from datetime import datetime
+from typing import Callable, Dict, List, Tuple
+
+from models.cleaning_schedule import CleaningSchedule
+from models.debt_reminder_schedule import DebtReminderSchedule
+
+
+class ScheduleIndex:
+    """Indeks aktywnych harmonogramów według godziny uruchomienia (HH:MM)
+
+    Ładowany raz z bazy danych, a potem aktualizowany przez ConfigManager przy
+    każdym zapisie (write-through). Sprawdzenie minuty kosztuje więc
+    O(harmonogramów do wykonania), a nie O(wszystkich harmonogramów).
+    Subskrybenci (subscribe) są powiadamiani o każdej zmianie zbioru
+    harmonogramów - z wątku, który ją zapisał.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._cleaning: Dict[int, CleaningSchedule] = {}
+        self._reminders: Dict[int, DebtReminderSchedule] = {}
+        self._cleaning_by_time: Dict[str, Dict[int, CleaningSchedule]] = defaultdict(dict)
+        self._reminders_by_time: Dict[str, Dict[int, DebtReminderSchedule]] = defaultdict(dict)
+        self._listeners: List[Callable[[], None]] = []
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded
+
+    def load(self, loader: Callable[[], Tuple[List[CleaningSchedule], List[DebtReminderSchedule]]]):
+        """Wypełnia indeks danymi z bazy (tylko za pierwszym razem)"""
+        with self._lock:
+            if self._loaded:
+                return
+
+            cleaning_schedules, reminder_schedules = loader()
+            for schedule in cleaning_schedules:
+                self._put_cleaning(schedule)
+            for schedule in reminder_schedules:
+                self._put_reminder(schedule)
+
+            self._loaded = True
+
+    def subscribe(self, listener: Callable[[], None]):
+        """Rejestruje funkcję wywoływaną po każdej zmianie harmonogramów"""
+        with self._lock:
+            self._listeners.append(listener)
+
+    def run_times(self) -> List[str]:
+        """Godziny (HH:MM), o których jest co najmniej jeden harmonogram"""
+        with self._lock:
+            return sorted(
+                {run_time for run_time, schedules in self._cleaning_by_time.items() if schedules}
+                | {run_time for run_time, schedules in self._reminders_by_time.items() if schedules}
+            )
+
+    def due(self, run_time: str) -> Tuple[List[CleaningSchedule], List[DebtReminderSchedule]]:
+        """Zwraca harmonogramy do uruchomienia o podanej godzinie"""
+        with self._lock:
+            return (
+                list(self._cleaning_by_time.get(run_time, {}).values()),
+                list(self._reminders_by_time.get(run_time, {}).values())
+            )
+
+    # --- Aktualizacje write-through (wywoływane po zatwierdzeniu transakcji) ---
+
+    def add_cleaning(self, schedule: CleaningSchedule):
+        with self._lock:
+            if self._loaded:
+                self._put_cleaning(schedule)
+                self._notify()
+
+    def add_reminder(self, schedule: DebtReminderSchedule):
+        with self._lock:
+            if self._loaded:
+                self._put_reminder(schedule)
+                self._notify()
+
+    def remove_cleaning(self, guild_id: int, channel_id: int):
+        with self._lock:
+            removed = [
+                schedule for schedule in self._cleaning.values()
+                if schedule.guild_id == guild_id and schedule.channel_id == channel_id
+            ]
+            for schedule in removed:
+                del self._cleaning[schedule.schedule_id]
+                self._cleaning_by_time[schedule.time].pop(schedule.schedule_id, None)
+            if removed:
+                self._notify()
+
+    def update_last_run(self, schedule_id: int, last_run_at: datetime):
+        with self._lock:
+            schedule = self._cleaning.get(schedule_id)
+            if schedule:
+                schedule.last_run_at = last_run_at
+
+    def _notify(self):
+        for listener in self._listeners:
+            listener()
+
+    def _put_cleaning(self, schedule: CleaningSchedule):
+        if not schedule.is_active or schedule.schedule_id is None:
+            return
+        self._cleaning[schedule.schedule_id] = schedule
+        self._cleaning_by_time[schedule.time][schedule.schedule_id] = schedule
+
+    def _put_reminder(self, schedule: DebtReminderSchedule):
+        if not schedule.is_active or schedule.schedule_id is None:
+            return
+        self._reminders[schedule.schedule_id] = schedule
+        self._reminders_by_time[schedule.run_time][schedule.schedule_id] = schedule
@@ -0,0 +1,88 @@
+"""
+Pamięć podręczna ustawień serwerów i użytkowników (LRU + TTL)
+"""
+import threading
+import time
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Hashable, Mapping, Optional
+
+
+class SettingsCache:
+    """Przechowuje komplet ustawień jednego właściciela (serwera/użytkownika) pod jego ID
+
+    Wpisy wygasają po ttl sekundach, a po przekroczeniu max_entries usuwane są
+    najdawniej używane. Słowniki ustawień są niemutowalne - zapis podmienia
+    cały wpis, więc odczyty nie wymagają kopiowania.
+
+    Numer zapisu (generation) chroni przed wstawieniem danych odczytanych
+    przed zapisem. Jest przechowywany w samym wpisie, więc znika razem z nim;
+    właściciele bez wpisu dzielą wspólny próg - numer ostatniego zapisu lub
+    usunięcia takiego właściciela. Zapis jednego z nich unieważnia więc także
+    trwające odczyty pozostałych (co najwyżej zbędne chybienie).
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 600.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict = OrderedDict()  # właściciel -> (wygasa, ustawienia, numer zapisu)
+        self._lock = threading.Lock()
+        self._writes = 0  # numer ostatniego zapisu
+        self._floor = 0  # numer zapisu właścicieli bez wpisu
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, owner_id: Hashable) -> Optional[Mapping[str, str]]:
+        """Zwraca ustawienia właściciela lub None, jeśli ich nie ma albo wygasły"""
+        with self._lock:
+            entry = self._entries.get(owner_id)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self._drop(owner_id)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(owner_id)
+            self.hits += 1
+            return entry[1]
+
+    def generation(self, owner_id: Hashable) -> int:
+        """Zwraca numer zapisu właściciela - pobrać przed odczytem z bazy"""
+        with self._lock:
+            entry = self._entries.get(owner_id)
+            return entry[2] if entry is not None else self._floor
+
+    def put(self, owner_id: Hashable, settings: dict, generation: int):
+        """Zapisuje komplet ustawień właściciela odczytany przy danym numerze zapisu"""
+        with self._lock:
+            entry = self._entries.get(owner_id)
+            if (entry[2] if entry is not None else self._floor) != generation:
+                return
+            self._entries[owner_id] = (time.monotonic() + self.ttl, MappingProxyType(dict(settings)), generation)
+            self._entries.move_to_end(owner_id)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+
+    def update(self, owner_id: Hashable, key: str, value: str):
+        """Write-through: aktualizuje pojedynczy klucz, jeśli właściciel jest w pamięci"""
+        with self._lock:
+            self._writes += 1
+            entry = self._entries.get(owner_id)
+            if entry is None:
+                self._floor = self._writes
+                return
+            settings = dict(entry[1])
+            settings[key] = value
+            self._entries[owner_id] = (entry[0], MappingProxyType(settings), self._writes)
+
+    def invalidate(self, owner_id: Hashable):
+        """Usuwa wpis właściciela (np. po nieudanym zapisie)"""
+        with self._lock:
+            self._writes += 1
+            self._entries.pop(owner_id, None)
+            self._floor = self._writes
+
+    def _drop(self, owner_id: Hashable):
+        """Usuwa wpis, przenosząc jego numer zapisu do wspólnego progu"""
+        _, _, generation = self._entries.pop(owner_id)
+        self._floor = max(self._floor, generation)
@@ -0,0 +1,67 @@
+"""
+Jednostka pracy komendy - kilka operacji zapisu zatwierdzanych razem
+"""
+import functools
+from typing import Any, Callable, Dict, List, Optional
+
+from config.database_writer import WriteCall, WriteOperation
+
+# Nazwa operacji zbiorczej w ConfigManager.write_operations
+UNIT_OF_WORK_OPERATION = "unit_of_work"
+
+
+class UnitOfWorkAborted(Exception):
+    """Operacja jednostki pracy zwróciła False - cała jednostka jest wycofywana"""
+
+
+class UnitOfWork:
+    """Zbiera operacje zapisu jednej komendy i zatwierdza je w jednej transakcji
+
+    Operacje (nazwy z ConfigManager.write_operations, np. uow.add_debt(debt),
+    uow.add_log(...)) są tylko zapamiętywane. Przy wyjściu z bloku with bez
+    wyjątku trafiają do bazy jednym wywołaniem zapisu - jeden SAVEPOINT
+    w partii pisarza i jeden COMMIT dla całej komendy. Niepowodzenie
+    dowolnej operacji (wyjątek albo wynik False) wycofuje wszystkie.
+
+    Wyniki: ok oraz results[i] w kolejności dodania operacji.
+    Obsługuje with (ConfigManager) i async with (AsyncConfigManager).
+    """
+
+    def __init__(self, write: Callable[..., Any], operations: Dict[str, WriteOperation]):
+        self._write = write
+        self._operations = operations
+        self.calls: List[WriteCall] = []
+        self.results: Optional[List[Any]] = None
+
+    @property
+    def ok(self) -> bool:
+        """Czy jednostka została zatwierdzona"""
+        return self.results is not None
+
+    def add(self, name: str, *args, **kwargs) -> int:
+        """Dodaje operację do jednostki i zwraca jej indeks w results"""
+        if name not in self._operations or name == UNIT_OF_WORK_OPERATION:
+            raise ValueError(f"Nieznana operacja zapisu: {name}")
+        self.calls.append((name, args, kwargs))
+        return len(self.calls) - 1
+
+    def __getattr__(self, name: str) -> Callable[..., int]:
+        if name.startswith("_") or name not in self._operations:
+            raise AttributeError(name)
+        return functools.partial(self.add, name)
+
+    def __enter__(self) -> 'UnitOfWork':
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> bool:
+        if exc_type is None and self.calls:
+            self.results = self._write(UNIT_OF_WORK_OPERATION, self.calls)
+        return False
+
+    async def __aenter__(self) -> 'UnitOfWork':
+        return self
+
+    async def __aexit__(self, exc_type, exc, traceback) -> bool:
+        if exc_type is None and self.calls:
+            self.results = await self._write(UNIT_OF_WORK_OPERATION, self.calls)
+        return False
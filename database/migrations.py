@@ -0,0 +1,309 @@
+"""
+Wersjonowanie schematu i migracje bazy danych uruchamiane przy starcie
+"""
+import functools
+from dataclasses import dataclass
+from typing import Callable, List, Sequence
+
+from sqlalchemy import (Column, DateTime, Integer, MetaData, String, Table, delete, func, insert, inspect,
+                        select, text)
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import OperationalError
+
+from database.base import Base
+from database.models.action_type import ActionType
+from database.models.debt import Debt
+from database.models.debt_balance import DebtBalance
+from database.models.debt_schedule import DebtSchedule
+from database.models.frequency import Frequency
+from database.models.log import Log
+from database.models.log_level import LogLevel
+from database.models.log_rollup import LogRollup
+from database.models.rollup_state import RollupState
+from utils.logger import get_logger
+
+# Tabela wersji jest poza metadanymi modeli - create_all jej nie dotyka
+schema_metadata = MetaData()
+schema_version = Table(
+    "schema_version",
+    schema_metadata,
+    Column("version", Integer, primary_key=True),
+    Column("name", String(100), nullable=False),
+    Column("applied_at", DateTime, nullable=False, server_default=func.now())
+)
+
+# Tabele przechowywane w plikach serwerów przy włączonym shardingu (database.shard_pool)
+SHARDED_MODELS = (Debt, DebtSchedule, DebtBalance)
+
+# Wiersze kopiowane naraz przy zakładaniu pliku serwera
+SHARD_COPY_BATCH = 1000
+
+DEFAULT_FREQUENCIES = [
+    {"name": "daily", "description": "Codziennie"},
+    {"name": "weekly", "description": "Co tydzień"},
+    {"name": "interval", "description": "Co określony interwał"},
+]
+
+DEFAULT_ACTION_TYPES = [
+    {"name": "ADD_SCHEDULE", "description": "Dodanie harmonogramu"},
+    {"name": "DELETE_SCHEDULE", "description": "Usunięcie harmonogramu"},
+    {"name": "UPDATE_SETTING", "description": "Aktualizacja ustawienia"},
+    {"name": "ADD_DEBT", "description": "Dodanie długu"},
+    {"name": "SETTLE_DEBT", "description": "Spłata długu"},
+    {"name": "RUN_CLEANING", "description": "Wykonanie czyszczenia"},
+    {"name": "SEND_REMINDER", "description": "Wysłanie przypomnienia"},
+    {"name": "EXPORT_DEBTS", "description": "Eksport długów"},
+    {"name": "IMPORT_DEBTS", "description": "Import długów"},
+]
+
+DEFAULT_LOG_LEVELS = [
+    {"name": "INFO", "description": "Informacja"},
+    {"name": "WARN", "description": "Ostrzeżenie"},
+    {"name": "ERROR", "description": "Błąd"},
+    {"name": "DEBUG", "description": "Debug"},
+]
+
+
+@dataclass(frozen=True)
+class Migration:
+    """Pojedyncza migracja - upgrade wykonywany w transakcji razem z zapisem wersji"""
+    version: int
+    name: str
+    upgrade: Callable[[Connection], None]
+
+
+def add_column_if_missing(connection: Connection, table_name: str, column_name: str, ddl: str):
+    """ALTER TABLE ... ADD COLUMN, pomijane jeśli kolumna już istnieje
+
+    :param ddl: Definicja kolumny bez nazwy, np. "DATETIME" lub "INTEGER NOT NULL DEFAULT 0"
+    """
+    columns = {column["name"] for column in inspect(connection).get_columns(table_name)}
+    if column_name not in columns:
+        connection.execute(text(f'ALTER TABLE "{table_name}" ADD COLUMN "{column_name}" {ddl}'))
+
+
+# --- Migracje (tylko dopisywać na końcu, nigdy nie zmieniać zastosowanych) ---
+
+def _initial_schema(connection: Connection):
+    """Tabele i indeksy modeli
+
+    Na istniejących bazach tworzy tylko brakujące obiekty, więc pliki sprzed
+    wprowadzenia migracji przechodzą przez nią bez zmian w danych.
+    """
+    Base.metadata.create_all(connection)
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
+
+
+def _debt_schedules_last_reminded_at(connection: Connection):
+    """Kolumna last_reminded_at w starszych plikach bazy"""
+    add_column_if_missing(connection, "debt_schedules", "last_reminded_at", "DATETIME")
+
+
+def _reference_data(connection: Connection):
+    """Dane referencyjne - INSERT OR IGNORE dodaje tylko brakujące nazwy"""
+    connection.execute(insert(Frequency).prefix_with("OR IGNORE"), DEFAULT_FREQUENCIES)
+    connection.execute(insert(ActionType).prefix_with("OR IGNORE"), DEFAULT_ACTION_TYPES)
+    connection.execute(insert(LogLevel).prefix_with("OR IGNORE"), DEFAULT_LOG_LEVELS)
+
+
+def _debt_balances(connection: Connection):
+    """Wypełnia salda par z istniejących niespłaconych długów"""
+    connection.execute(delete(DebtBalance))
+    connection.execute(
+        insert(DebtBalance).from_select(
+            ["guild_id", "debtor_id", "creditor_id", "currency", "amount", "debt_count"],
+            select(
+                Debt.guild_id,
+                Debt.debtor_id,
+                Debt.creditor_id,
+                Debt.currency,
+                func.sum(Debt.amount),
+                func.count()
+            )
+            .where(Debt.is_settled.is_(False))
+            .group_by(Debt.guild_id, Debt.debtor_id, Debt.creditor_id, Debt.currency)
+        )
+    )
+
+
+def _log_rollups(connection: Connection):
+    """Liczniki logów i znacznik postępu agregacji (wypełniane przez rollup_logs)"""
+    Base.metadata.create_all(connection, tables=[LogRollup.__table__, RollupState.__table__])
+
+
+def _logs_autoincrement(connection: Connection):
+    """Przebudowuje tabelę logs z AUTOINCREMENT
+
+    Bez niego SQLite nadaje ponownie ID usuniętych wpisów z końca tabeli
+    (np. po retencji), a rollup_logs i retencja uznałyby takie wpisy za już
+    policzone. Licznik ID startuje od znacznika postępu agregacji.
+    """
+    table_sql = connection.execute(
+        text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'logs'")
+    ).scalar()
+    if "AUTOINCREMENT" not in table_sql.upper():
+        connection.execute(text('ALTER TABLE logs RENAME TO logs_old'))
+        for index in Log.__table__.indexes:
+            connection.execute(text(f'DROP INDEX IF EXISTS "{index.name}"'))
+        Log.__table__.create(connection)
+
+        columns = ", ".join(f'"{column.name}"' for column in Log.__table__.columns)
+        connection.execute(text(f'INSERT INTO logs ({columns}) SELECT {columns} FROM logs_old'))
+        connection.execute(text('DROP TABLE logs_old'))
+
+    last_id = connection.execute(select(func.max(RollupState.last_id))).scalar() or 0
+    connection.execute(
+        text("INSERT INTO sqlite_sequence (name, seq) SELECT 'logs', 0 "
+             "WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = 'logs')")
+    )
+    connection.execute(
+        text("UPDATE sqlite_sequence SET seq = MAX(seq, :last_id) WHERE name = 'logs'"),
+        {"last_id": last_id}
+    )
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "initial_schema", _initial_schema),
+    Migration(2, "debt_schedules_last_reminded_at", _debt_schedules_last_reminded_at),
+    Migration(3, "reference_data", _reference_data),
+    Migration(4, "debt_balances", _debt_balances),
+    Migration(5, "log_rollups", _log_rollups),
+    Migration(6, "logs_autoincrement", _logs_autoincrement),
+]
+
+
+# --- Migracje plików serwerów ---
+
+def _guild_schema(connection: Connection):
+    """Tabele SHARDED_MODELS razem z indeksami"""
+    Base.metadata.create_all(connection, tables=[model.__table__ for model in SHARDED_MODELS])
+
+
+def _guild_data_from_main_database(source: Engine, guild_id: int, connection: Connection):
+    """Kopiuje dotychczasowe dane serwera ze wspólnej bazy z zachowaniem ID
+
+    Wspólna baza nie jest tu modyfikowana - skopiowane wiersze usuwa z niej
+    release_guild_data_from_main_database po zatwierdzeniu kopii.
+    """
+    debt_ids = select(Debt.id).where(Debt.guild_id == guild_id)
+    statements = [
+        (Debt.__table__, select(Debt.__table__).where(Debt.guild_id == guild_id)),
+        (DebtSchedule.__table__, select(DebtSchedule.__table__).where(DebtSchedule.debt_id.in_(debt_ids))),
+        (DebtBalance.__table__, select(DebtBalance.__table__).where(DebtBalance.guild_id == guild_id)),
+    ]
+
+    with source.connect() as source_connection:
+        for table, stmt in statements:
+            rows = source_connection.execution_options(yield_per=SHARD_COPY_BATCH).execute(stmt)
+            for partition in rows.partitions():
+                connection.execute(insert(table), [dict(row._mapping) for row in partition])
+
+
+def release_guild_data_from_main_database(source: Engine, guild_id: int) -> int:
+    """Usuwa ze wspólnej bazy dane serwera przeniesione już do jego pliku
+
+    Wywoływać dopiero po zatwierdzeniu kopii (shard_migrations). Bez tego
+    ponowne utworzenie pliku serwera skopiowałoby nieaktualne wiersze,
+    a wspólna baza dalej zawierałaby długi obsługiwane już w pliku serwera.
+    Przy braku wierszy kosztuje jeden odczyt po indeksie guild_id. Jak
+    migracje zapisuje poza pisarzem (BEGIN IMMEDIATE, busy_timeout czeka na
+    jego partię) - wywoływane przy otwieraniu pliku serwera, zanim jego
+    silnik trafi do pisarza.
+
+    :return: Liczba usuniętych długów
+    """
+    with source.connect() as connection:
+        # Salda istnieją tylko dla długów, więc wystarczy sprawdzić długi
+        if connection.execute(select(Debt.id).where(Debt.guild_id == guild_id).limit(1)).first() is None:
+            return 0
+
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+        debt_ids = select(Debt.id).where(Debt.guild_id == guild_id)
+        connection.execute(delete(DebtSchedule).where(DebtSchedule.debt_id.in_(debt_ids)))
+        connection.execute(delete(DebtBalance).where(DebtBalance.guild_id == guild_id))
+        removed = connection.execute(delete(Debt).where(Debt.guild_id == guild_id)).rowcount
+        connection.commit()
+        return removed
+
+
+def shard_migrations(source: Engine, guild_id: int) -> List[Migration]:
+    """Migracje pliku bazy serwera (source - wspólna baza z danymi sprzed shardingu)"""
+    return [
+        Migration(1, "guild_schema", _guild_schema),
+        Migration(2, "guild_data_from_main_database",
+                  functools.partial(_guild_data_from_main_database, source, guild_id)),
+    ]
+
+
+class MigrationRunner:
+    """Stosuje brakujące migracje w kolejności wersji
+
+    Przy aktualnym schemacie kosztuje jeden odczyt tabeli schema_version.
+    Każda migracja działa w osobnej transakcji BEGIN IMMEDIATE, która blokuje
+    zapis innym procesom - dwa równoczesne starty nie zastosują jej dwa razy.
+    """
+
+    def __init__(self, engine: Engine, migrations: Sequence[Migration] = MIGRATIONS):
+        versions = [migration.version for migration in migrations]
+        if versions != sorted(set(versions)):
+            raise ValueError("Wersje migracji muszą być unikalne i rosnące")
+
+        self.engine = engine
+        self.migrations = list(migrations)
+        self.logger = get_logger(__name__)
+
+    @property
+    def latest_version(self) -> int:
+        return self.migrations[-1].version if self.migrations else 0
+
+    def current_version(self) -> int:
+        """Zwraca najwyższą zastosowaną wersję (0 dla nowej bazy)"""
+        with self.engine.connect() as connection:
+            try:
+                return self._read_version(connection)
+            except OperationalError:
+                # Brak tabeli schema_version - baza sprzed migracji albo nowa
+                return 0
+
+    def run(self) -> int:
+        """Stosuje brakujące migracje, zwraca ich liczbę"""
+        current = self.current_version()
+        if current >= self.latest_version:
+            return 0
+
+        applied = 0
+        for migration in self.migrations:
+            if migration.version <= current:
+                continue
+            if self._apply(migration):
+                applied += 1
+
+        self.logger.info(f"Schemat bazy danych: wersja {current} -> {self.latest_version} (migracji: {applied})")
+        return applied
+
+    def _apply(self, migration: Migration) -> bool:
+        with self.engine.connect() as connection:
+            # Sterownik sqlite3 nie otwiera transakcji przed DDL - robimy to jawnie
+            connection.exec_driver_sql("BEGIN IMMEDIATE")
+            try:
+                schema_metadata.create_all(connection)
+                # Ponowny odczyt pod blokadą - inny proces mógł już zastosować migrację
+                if self._read_version(connection) >= migration.version:
+                    connection.rollback()
+                    return False
+
+                self.logger.info(f"Migracja {migration.version}: {migration.name}")
+                migration.upgrade(connection)
+                connection.execute(insert(schema_version).values(version=migration.version, name=migration.name))
+                connection.commit()
+                return True
+            except Exception:
+                connection.rollback()
+                self.logger.error(f"Migracja {migration.version} ({migration.name}) nie powiodła się", exc_info=True)
+                raise
+
+    @staticmethod
+    def _read_version(connection: Connection) -> int:
+        return connection.execute(select(func.max(schema_version.c.version))).scalar() or 0
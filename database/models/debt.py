@@ -2,7 +2,7 @@ from datetime import datetime
 from decimal import Decimal
 from typing import Optional, TYPE_CHECKING
 
-from sqlalchemy import Integer, Boolean, DateTime, func, DECIMAL, Text, String
+from sqlalchemy import Integer, Boolean, DateTime, func, DECIMAL, Text, String, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from database.base import Base
@@ -13,6 +13,15 @@ if TYPE_CHECKING:
 
 class Debt(Base):
     __tablename__ = "debts"
+    __table_args__ = (
+        # Długi serwera według statusu oraz dłużnika / pary dłużnik-wierzyciel
+        Index("ix_debts_guild_id_is_settled_debtor_id_creditor_id",
+              "guild_id", "is_settled", "debtor_id", "creditor_id"),
+        # Długi serwera według wierzyciela (bez podanego dłużnika)
+        Index("ix_debts_guild_id_creditor_id_is_settled", "guild_id", "creditor_id", "is_settled"),
+        # Paginacja keyset po ID w obrębie serwera i statusu
+        Index("ix_debts_guild_id_is_settled_id", "guild_id", "is_settled", "id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     debtor_id: Mapped[int] = mapped_column(Integer, nullable=False)
@@ -0,0 +1,24 @@
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import Integer, DateTime, func, DECIMAL, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from database.base import Base
+
+
+class DebtBalance(Base):
+    """Zmaterializowana suma niespłaconych długów pary dłużnik -> wierzyciel"""
+    __tablename__ = "debt_balances"
+
+    guild_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    debtor_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    creditor_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    currency: Mapped[str] = mapped_column(String(3), primary_key=True)
+    amount: Mapped[Decimal] = mapped_column(DECIMAL(12, 2), nullable=False, default=0)
+    debt_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        server_default=func.now(),
+        onupdate=func.now()
+    )
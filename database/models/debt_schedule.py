@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import Optional, TYPE_CHECKING
 
-from sqlalchemy import DateTime, ForeignKey, func
+from sqlalchemy import DateTime, ForeignKey, func, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from database.base import Base
@@ -13,6 +13,9 @@ if TYPE_CHECKING:
 
 class DebtSchedule(Base):
     __tablename__ = "debt_schedules"
+    __table_args__ = (
+        Index("ix_debt_schedules_debt_id", "debt_id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     debt_id: Mapped[int] = mapped_column(ForeignKey("debts.id"), nullable=False)
@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Integer, ForeignKey, Text, DateTime, func
+from sqlalchemy import Integer, ForeignKey, Text, DateTime, func, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from database.base import Base
@@ -15,6 +15,11 @@ if TYPE_CHECKING:
 
 class Log(Base):
     __tablename__ = "logs"
+    __table_args__ = (
+        Index("ix_logs_guild_id_created_at", "guild_id", "created_at"),
+        # ID nigdy nie są używane ponownie - rollup_logs śledzi postęp po ID
+        {"sqlite_autoincrement": True},
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(Integer, nullable=False)
@@ -0,0 +1,17 @@
+from sqlalchemy import ForeignKey, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from database.base import Base
+
+
+class LogRollup(Base):
+    """Liczba wpisów logów serwera w godzinie lub dniu (UTC), agregowana przyrostowo"""
+    __tablename__ = "log_rollups"
+
+    # Kolejność kluczy = kolejność indeksu: odczyt po serwerze, szczegółowości i okresie
+    guild_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    granularity: Mapped[str] = mapped_column(String(5), primary_key=True)  # "hour" / "day"
+    period: Mapped[str] = mapped_column(String(13), primary_key=True)  # "YYYY-MM-DD HH" / "YYYY-MM-DD"
+    action_type_id: Mapped[int] = mapped_column(ForeignKey("action_types.id"), primary_key=True)
+    log_level_id: Mapped[int] = mapped_column(ForeignKey("log_levels.id"), primary_key=True)
+    count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
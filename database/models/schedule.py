@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import Optional, TYPE_CHECKING
 
-from sqlalchemy import String, Integer, Boolean, DateTime, ForeignKey, func, Text
+from sqlalchemy import String, Integer, Boolean, DateTime, ForeignKey, func, Text, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from database.base import Base
@@ -13,6 +13,10 @@ if TYPE_CHECKING:
 
 class Schedule(Base):
     __tablename__ = "schedules"
+    __table_args__ = (
+        # Filtry: task_type / task_type + guild_id / task_type + guild_id + channel_id
+        Index("ix_schedules_task_type_guild_id_channel_id", "task_type", "guild_id", "channel_id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     task_type: Mapped[str] = mapped_column(String(20), default="cleaning")
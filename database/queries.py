@@ -0,0 +1,208 @@
+"""
+Prekompilowane zapytania Core dla najczęstszych odczytów
+
+Stałe instrukcje są budowane raz przy imporcie i wykonywane z parametrami
+(bindparam), a zapytania ze zmiennym zestawem warunków używają lambda_stmt -
+w obu przypadkach SQLAlchemy kompiluje SQL tylko raz i bierze go z pamięci
+podręcznej. Wiersze są mapowane prosto na dataclassy z models/ bez tworzenia
+obiektów ORM.
+
+Listy kolumn *_COLUMNS mają kolejność pól odpowiedniej dataclassy, więc
+wiersz przekazuje się pozycyjnie: Model(*row).
+"""
+from typing import Optional
+
+from sqlalchemy import bindparam, func, lambda_stmt, literal_column, or_, select
+from sqlalchemy.sql import StatementLambdaElement
+
+from database.models.action_type import ActionType
+from database.models.debt import Debt
+from database.models.debt_balance import DebtBalance
+from database.models.debt_schedule import DebtSchedule
+from database.models.log_level import LogLevel
+from database.models.log_rollup import LogRollup
+from database.models.schedule import Schedule
+
+# models.debt.Debt
+DEBT_COLUMNS = (
+    Debt.debtor_id,
+    Debt.creditor_id,
+    Debt.amount,
+    Debt.description,
+    Debt.guild_id,
+    Debt.currency,
+    Debt.is_settled,
+    Debt.created_at,
+    Debt.updated_at,
+    Debt.id,
+)
+
+# models.cleaning_schedule.CleaningSchedule (nazwa kanału nie jest przechowywana w bazie)
+CLEANING_SCHEDULE_COLUMNS = (
+    Schedule.channel_id,
+    literal_column("''").label("channel_name"),
+    Schedule.run_time,
+    Schedule.added_by,
+    Schedule.added_at,
+    Schedule.guild_id,
+    Schedule.frequency_id,
+    Schedule.is_active,
+    Schedule.exclude_pinned,
+    Schedule.last_run_at,
+    Schedule.id,
+)
+
+# models.debt_reminder_schedule.DebtReminderSchedule
+REMINDER_SCHEDULE_COLUMNS = (
+    Schedule.guild_id,
+    Schedule.channel_id,
+    Schedule.run_time,
+    Schedule.frequency_id,
+    Schedule.message_template,
+    Schedule.is_active,
+    Schedule.added_by,
+    Schedule.added_at,
+    Schedule.last_run_at,
+    Schedule.id,
+)
+
+# models.debt_balance.DebtBalance
+DEBT_BALANCE_COLUMNS = (
+    DebtBalance.guild_id,
+    DebtBalance.debtor_id,
+    DebtBalance.creditor_id,
+    DebtBalance.currency,
+    DebtBalance.amount,
+    DebtBalance.debt_count,
+)
+
+# models.log_rollup.LogRollup
+LOG_ROLLUP_COLUMNS = (
+    LogRollup.guild_id,
+    LogRollup.granularity,
+    LogRollup.period,
+    ActionType.name,
+    LogLevel.name,
+    LogRollup.count,
+)
+
+# --- Instrukcje stałe ---
+
+CLEANING_SCHEDULE_BY_CHANNEL = select(*CLEANING_SCHEDULE_COLUMNS).where(
+    Schedule.channel_id == bindparam("channel_id"),
+    Schedule.guild_id == bindparam("guild_id"),
+    Schedule.task_type == "cleaning"
+)
+
+ALL_CLEANING_SCHEDULES = select(*CLEANING_SCHEDULE_COLUMNS).where(Schedule.task_type == "cleaning")
+
+ACTIVE_CLEANING_SCHEDULES = ALL_CLEANING_SCHEDULES.where(Schedule.is_active.is_(True))
+
+ALL_REMINDER_SCHEDULES = select(*REMINDER_SCHEDULE_COLUMNS).where(Schedule.task_type == "debt_reminder")
+
+GUILD_REMINDER_SCHEDULES = ALL_REMINDER_SCHEDULES.where(Schedule.guild_id == bindparam("guild_id"))
+
+ACTIVE_REMINDER_SCHEDULES = ALL_REMINDER_SCHEDULES.where(Schedule.is_active.is_(True))
+
+GUILD_LOG_ROLLUPS = (
+    select(*LOG_ROLLUP_COLUMNS)
+    .join(ActionType, LogRollup.action_type_id == ActionType.id)
+    .join(LogLevel, LogRollup.log_level_id == LogLevel.id)
+    .where(
+        LogRollup.guild_id == bindparam("guild_id"),
+        LogRollup.granularity == bindparam("granularity"),
+        LogRollup.period >= bindparam("since")
+    )
+    .order_by(LogRollup.period, ActionType.name, LogLevel.name)
+)
+
+DEBT_BY_ID = select(*DEBT_COLUMNS).where(
+    Debt.id == bindparam("debt_id"),
+    Debt.guild_id == bindparam("guild_id")
+)
+
+# Opisy niespłaconych długów pary w danej walucie (indeks guild_id, is_settled, debtor_id, creditor_id)
+OPEN_DEBT_DESCRIPTIONS = (
+    select(Debt.description)
+    .where(
+        Debt.guild_id == bindparam("guild_id"),
+        Debt.is_settled.is_(False),
+        Debt.debtor_id == bindparam("debtor_id"),
+        Debt.creditor_id == bindparam("creditor_id"),
+        Debt.currency == bindparam("currency"),
+        Debt.description.is_not(None),
+        Debt.description != ""
+    )
+    .order_by(Debt.id)
+)
+
+DEBT_SCHEDULE_IDS = (
+    select(DebtSchedule.debt_id, DebtSchedule.schedule_id)
+    .where(DebtSchedule.debt_id.in_(bindparam("debt_ids", expanding=True)))
+    .order_by(DebtSchedule.id)
+)
+
+# --- Instrukcje ze zmiennymi warunkami ---
+
+
+def debts_query(guild_id: int, debtor_id: Optional[int] = None, creditor_id: Optional[int] = None,
+                is_settled: Optional[bool] = None) -> StatementLambdaElement:
+    """Długi serwera według opcjonalnych kryteriów"""
+    stmt = lambda_stmt(lambda: select(*DEBT_COLUMNS).where(Debt.guild_id == guild_id))
+    if debtor_id is not None:
+        stmt += lambda s: s.where(Debt.debtor_id == debtor_id)
+    if creditor_id is not None:
+        stmt += lambda s: s.where(Debt.creditor_id == creditor_id)
+    if is_settled is not None:
+        stmt += lambda s: s.where(Debt.is_settled == is_settled)
+    return stmt
+
+
+def debts_page_query(guild_id: int, member_id: Optional[int], is_settled: Optional[bool],
+                     after_id: Optional[int], before_id: Optional[int], limit: int) -> StatementLambdaElement:
+    """Strona długów po ID (keyset); przy before_id kolejność jest malejąca"""
+    stmt = lambda_stmt(lambda: select(*DEBT_COLUMNS).where(Debt.guild_id == guild_id))
+    if member_id is not None:
+        stmt += lambda s: s.where(or_(Debt.debtor_id == member_id, Debt.creditor_id == member_id))
+    if is_settled is not None:
+        stmt += lambda s: s.where(Debt.is_settled == is_settled)
+
+    if before_id is not None:
+        stmt += lambda s: s.where(Debt.id < before_id).order_by(Debt.id.desc())
+    elif after_id is not None:
+        stmt += lambda s: s.where(Debt.id > after_id).order_by(Debt.id)
+    else:
+        stmt += lambda s: s.order_by(Debt.id)
+
+    stmt += lambda s: s.limit(limit)
+    return stmt
+
+
+def debt_balances_query(guild_id: int, member_id: Optional[int] = None) -> StatementLambdaElement:
+    """Salda par serwera (opcjonalnie z udziałem członka)"""
+    stmt = lambda_stmt(lambda: select(*DEBT_BALANCE_COLUMNS).where(DebtBalance.guild_id == guild_id))
+    if member_id is not None:
+        stmt += lambda s: s.where(or_(DebtBalance.debtor_id == member_id, DebtBalance.creditor_id == member_id))
+    stmt += lambda s: s.order_by(DebtBalance.debtor_id, DebtBalance.creditor_id, DebtBalance.currency)
+    return stmt
+
+
+def debt_totals_query(guild_id: int, member_id: Optional[int] = None,
+                      is_settled: Optional[bool] = None) -> StatementLambdaElement:
+    """Sumy długów według pary i waluty (kolejność kolumn jak DEBT_BALANCE_COLUMNS)"""
+    stmt = lambda_stmt(lambda: select(
+        Debt.guild_id,
+        Debt.debtor_id,
+        Debt.creditor_id,
+        Debt.currency,
+        func.sum(Debt.amount),
+        func.count()
+    ).where(Debt.guild_id == guild_id))
+    if member_id is not None:
+        stmt += lambda s: s.where(or_(Debt.debtor_id == member_id, Debt.creditor_id == member_id))
+    if is_settled is not None:
+        stmt += lambda s: s.where(Debt.is_settled == is_settled)
+    stmt += lambda s: s.group_by(Debt.debtor_id, Debt.creditor_id, Debt.currency).order_by(
+        Debt.debtor_id, Debt.creditor_id, Debt.currency
+    )
+    return stmt
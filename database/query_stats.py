@@ -0,0 +1,282 @@
+"""
+Pomiar zapytań SQL - czas, liczba wierszy i liczba zapytań na wywołanie komendy
+"""
+import functools
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, replace
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from utils.env import env_choice, env_int
+from utils.logger import get_logger
+
+QUERY_STATS_MODES = ("ON", "OFF")
+
+# Najwięcej różnych instrukcji w statystykach - kolejne trafiają do OTHER_STATEMENT
+MAX_STATEMENTS = 500
+OTHER_STATEMENT = "<pozostałe>"
+
+# Klucz stosu czasów rozpoczęcia zapytań w Connection.info
+START_TIMES_KEY = "query_stats_start"
+
+# Najdłuższy fragment SQL w logu wolnych zapytań
+LOGGED_STATEMENT_LENGTH = 500
+
+WHITESPACE = re.compile(r"\s+")
+
+
+@dataclass(frozen=True)
+class QueryStatsPolicy:
+    """Ustawienia pomiaru zapytań"""
+    enabled: bool = True
+    slow_query_ms: int = 200  # próg logu wolnych zapytań, 0 = bez logu
+
+    @classmethod
+    def from_env(cls) -> 'QueryStatsPolicy':
+        """Tworzy politykę ze zmiennych środowiskowych DB_QUERY_STATS i DB_SLOW_QUERY_MS"""
+        default = cls()
+        return cls(
+            enabled=env_choice("DB_QUERY_STATS", "ON" if default.enabled else "OFF", QUERY_STATS_MODES) == "ON",
+            slow_query_ms=env_int("DB_SLOW_QUERY_MS", default.slow_query_ms)
+        )
+
+
+@dataclass(slots=True)
+class StatementStats:
+    """Zagregowane wykonania jednej instrukcji SQL"""
+    statement: str
+    count: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+    rows: int = 0
+
+
+@dataclass(slots=True)
+class CommandQueries:
+    """Zapytania jednego wywołania komendy"""
+    name: str
+    queries: int = 0
+    time: float = 0.0
+    rows: int = 0
+    writes: int = 0  # operacje zlecone pisarzowi (wykonuje je wspólna partia)
+
+
+@dataclass(slots=True)
+class CommandStats:
+    """Zagregowane wywołania jednej komendy"""
+    name: str
+    invocations: int = 0
+    queries: int = 0
+    max_queries: int = 0
+    time: float = 0.0
+    rows: int = 0
+    writes: int = 0
+
+
+# Bieżące wywołanie komendy; AsyncConfigManager przenosi kontekst do wątków bazy
+current_command: ContextVar[Optional[CommandQueries]] = ContextVar("current_command", default=None)
+
+
+class _CountingCursor(sqlite3.Cursor):
+    """Kursor przekazujący liczbę pobranych wierszy do on_rows"""
+    on_rows = None
+
+    def fetchone(self):
+        row = super().fetchone()
+        if row is not None and self.on_rows:
+            self.on_rows(1)
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        rows = super().fetchmany(*args, **kwargs)
+        if rows and self.on_rows:
+            self.on_rows(len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = super().fetchall()
+        if rows and self.on_rows:
+            self.on_rows(len(rows))
+        return rows
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """Połączenie sqlite3 tworzące kursory zliczające wiersze"""
+
+    def cursor(self, factory=_CountingCursor):
+        return super().cursor(factory)
+
+
+class QueryStats:
+    """Zbiera statystyki zapytań z silników SQLAlchemy
+
+    Zdarzenia before/after_cursor_execute mierzą czas każdej instrukcji;
+    wiersze to liczba zmienionych (DML) albo pobranych wierszy (SELECT,
+    liczone przez kursor przy pobieraniu). Zapytania wykonane w ramach
+    komendy (command()) są przypisywane do niej przez current_command.
+    Instrukcje wolniejsze niż slow_query_ms trafiają do logu - z typami
+    zamiast wartości parametrów.
+    """
+
+    def __init__(self, policy: Optional[QueryStatsPolicy] = None):
+        self.policy = policy or QueryStatsPolicy.from_env()
+        self.logger = get_logger(__name__)
+        self._lock = threading.Lock()
+        self._statements: Dict[str, StatementStats] = {}
+        self._commands: Dict[str, CommandStats] = {}
+        self.queries_total = 0
+        self.slow_total = 0
+        self.time_total = 0.0
+
+    @property
+    def connect_args(self) -> Dict[str, Any]:
+        """Argumenty sqlite3.connect dla silników objętych pomiarem"""
+        return {"factory": InstrumentedConnection} if self.policy.enabled else {}
+
+    def attach(self, engine: Engine):
+        """Rejestruje pomiar zapytań silnika"""
+        if not self.policy.enabled:
+            return
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+        event.listen(engine, "handle_error", self._handle_error)
+
+    @contextmanager
+    def command(self, name: str) -> Iterator[CommandQueries]:
+        """Przypisuje zapytania wykonane w bloku do wywołania komendy name"""
+        queries = CommandQueries(name)
+        token = current_command.set(queries)
+        try:
+            yield queries
+        finally:
+            current_command.reset(token)
+            if self.policy.enabled:
+                self._finish_command(queries)
+
+    def record_write(self):
+        """Odnotowuje operację zapisu zleconą przez bieżącą komendę"""
+        queries = current_command.get()
+        if queries is not None:
+            queries.writes += 1
+
+    def statements(self, limit: int = 10) -> List[StatementStats]:
+        """Instrukcje o największym łącznym czasie"""
+        with self._lock:
+            ranked = sorted(self._statements.values(), key=lambda stats: stats.total_time, reverse=True)
+            return [replace(stats) for stats in ranked[:limit]]
+
+    def commands(self, limit: int = 10) -> List[CommandStats]:
+        """Komendy o największym łącznym czasie zapytań"""
+        with self._lock:
+            ranked = sorted(self._commands.values(), key=lambda stats: stats.time, reverse=True)
+            return [replace(stats) for stats in ranked[:limit]]
+
+    def summary(self) -> Dict[str, Any]:
+        """Zwraca liczniki ogólne"""
+        with self._lock:
+            return {
+                "enabled": self.policy.enabled,
+                "slow_query_ms": self.policy.slow_query_ms,
+                "queries_total": self.queries_total,
+                "slow_total": self.slow_total,
+                "time_total_ms": round(self.time_total * 1000, 2),
+                "statements": len(self._statements)
+            }
+
+    def reset(self):
+        """Zeruje zebrane statystyki"""
+        with self._lock:
+            self._statements.clear()
+            self._commands.clear()
+            self.queries_total = 0
+            self.slow_total = 0
+            self.time_total = 0.0
+
+    # --- Zdarzenia silnika ---
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault(START_TIMES_KEY, []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info[START_TIMES_KEY].pop()
+        queries = current_command.get()
+
+        with self._lock:
+            stats = self._statement_stats(statement)
+            stats.count += 1
+            stats.total_time += elapsed
+            stats.max_time = max(stats.max_time, elapsed)
+            self.queries_total += 1
+            self.time_total += elapsed
+            if queries is not None:
+                queries.queries += 1
+                queries.time += elapsed
+
+        if cursor.rowcount > 0:
+            self._add_rows(stats, queries, cursor.rowcount)
+        elif isinstance(cursor, _CountingCursor):
+            cursor.on_rows = functools.partial(self._add_rows, stats, queries)
+
+        if self.policy.slow_query_ms and elapsed * 1000 >= self.policy.slow_query_ms:
+            with self._lock:
+                self.slow_total += 1
+            self.logger.warning(
+                f"Wolne zapytanie: {elapsed * 1000:.1f} ms"
+                f"{f' (komenda {queries.name})' if queries else ''}: "
+                f"{WHITESPACE.sub(' ', statement)[:LOGGED_STATEMENT_LENGTH]} | "
+                f"parametry: {self._redact(parameters, executemany)}"
+            )
+
+    @staticmethod
+    def _handle_error(exception_context):
+        connection = exception_context.connection
+        if connection is not None and connection.info.get(START_TIMES_KEY):
+            connection.info[START_TIMES_KEY].pop()
+
+    # --- Pomocnicze ---
+
+    def _statement_stats(self, statement: str) -> StatementStats:
+        stats = self._statements.get(statement)
+        if stats is None:
+            if len(self._statements) >= MAX_STATEMENTS:
+                statement = OTHER_STATEMENT
+                stats = self._statements.get(statement)
+            if stats is None:
+                stats = self._statements[statement] = StatementStats(statement)
+        return stats
+
+    def _add_rows(self, stats: StatementStats, queries: Optional[CommandQueries], rows: int):
+        with self._lock:
+            stats.rows += rows
+            if queries is not None:
+                queries.rows += rows
+
+    def _finish_command(self, queries: CommandQueries):
+        with self._lock:
+            stats = self._commands.get(queries.name)
+            if stats is None:
+                stats = self._commands[queries.name] = CommandStats(queries.name)
+            stats.invocations += 1
+            stats.queries += queries.queries
+            stats.max_queries = max(stats.max_queries, queries.queries)
+            stats.time += queries.time
+            stats.rows += queries.rows
+            stats.writes += queries.writes
+
+    @staticmethod
+    def _redact(parameters: Any, executemany: bool) -> str:
+        """Opis parametrów bez wartości - tylko typy (lub liczba zestawów dla executemany)"""
+        if executemany:
+            return f"{len(parameters)} zestawów"
+        if isinstance(parameters, dict):
+            return "{" + ", ".join(f"{key}: {type(value).__name__}" for key, value in parameters.items()) + "}"
+        if parameters:
+            return "(" + ", ".join(type(value).__name__ for value in parameters) + ")"
+        return "()"
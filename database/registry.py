@@ -18,7 +18,10 @@ def configure_models():
     from .models.schedule import Schedule
     from .models.debt import Debt
     from .models.debt_schedule import DebtSchedule
+    from .models.debt_balance import DebtBalance
     from .models.log import Log
+    from .models.log_rollup import LogRollup
+    from .models.rollup_state import RollupState
 
     # Zwróć listę wszystkich klas modeli
     return [
@@ -29,5 +32,8 @@ def configure_models():
         Schedule,
         Debt,
         DebtSchedule,
-        Log
+        DebtBalance,
+        Log,
+        LogRollup,
+        RollupState
     ]
\ No newline at end of file
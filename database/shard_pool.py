@@ -0,0 +1,137 @@
+"""
+Osobne pliki SQLite dla danych poszczególnych serwerów (sharding)
+"""
+import os
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+
+from database.migrations import (MigrationRunner, SHARDED_MODELS, release_guild_data_from_main_database,
+                                 shard_migrations)
+from database.query_stats import QueryStats
+from database.sqlite_profile import SqliteProfile
+from utils.env import env_int, env_str
+from utils.logger import get_logger
+
+SHARD_FILE_PATTERN = re.compile(r"^guild-(\d+)\.db$")
+
+
+@dataclass(frozen=True)
+class ShardPolicy:
+    """Ustawienia shardingu bazy danych"""
+    directory: str = ""  # katalog plików serwerów, pusty = jedna wspólna baza
+    max_open: int = 32  # najwięcej jednocześnie otwartych plików serwerów
+    writers: int = 4  # wątki zatwierdzające zapisy różnych serwerów równolegle
+
+    @classmethod
+    def from_env(cls) -> 'ShardPolicy':
+        """Tworzy politykę ze zmiennych środowiskowych DB_SHARD_*"""
+        default = cls()
+        return cls(
+            directory=env_str("DB_SHARD_DIR", default.directory),
+            max_open=env_int("DB_SHARD_MAX_OPEN", default.max_open),
+            writers=env_int("DB_SHARD_WRITERS", default.writers)
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.directory)
+
+
+class ShardPool:
+    """Silniki plików baz serwerów zarządzane jako LRU o ograniczonym rozmiarze
+
+    Każdy serwer ma własny plik guild-<id>.db z tabelami SHARDED_MODELS
+    (długi, ich powiązania z harmonogramami i salda). Tabele referencyjne,
+    harmonogramy, ustawienia i logi zostają we wspólnej bazie. Nowy plik
+    dostaje schemat i dotychczasowe dane serwera ze wspólnej bazy, które są
+    z niej usuwane po zatwierdzeniu kopii. Po przekroczeniu max_open najdawniej używany silnik jest zamykany;
+    kolejne użycie otwiera go ponownie (kosztem jednego odczytu wersji schematu).
+    """
+
+    def __init__(self, policy: ShardPolicy, storage_profile: SqliteProfile, source: Engine,
+                 query_stats: Optional[QueryStats] = None):
+        self.policy = policy
+        self.storage_profile = storage_profile
+        self.source = source
+        self.query_stats = query_stats
+        self.logger = get_logger(__name__)
+
+        os.makedirs(self.policy.directory, exist_ok=True)
+        self._engines: "OrderedDict[int, Engine]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Statystyki
+        self.opened_total = 0
+        self.evicted_total = 0
+
+    def path(self, guild_id: int) -> str:
+        """Ścieżka pliku bazy serwera"""
+        return os.path.join(self.policy.directory, f"guild-{int(guild_id)}.db")
+
+    def guild_ids(self) -> List[int]:
+        """ID serwerów, które mają już własny plik bazy"""
+        return sorted(
+            int(match.group(1))
+            for match in map(SHARD_FILE_PATTERN.match, os.listdir(self.policy.directory))
+            if match
+        )
+
+    def engine(self, guild_id: int) -> Engine:
+        """Silnik bazy serwera (otwierany i migrowany przy pierwszym użyciu)"""
+        with self._lock:
+            engine = self._engines.get(guild_id)
+            if engine is not None:
+                self._engines.move_to_end(guild_id)
+                return engine
+
+            engine = self._open(guild_id)
+            self._engines[guild_id] = engine
+            self.opened_total += 1
+
+            while len(self._engines) > max(self.policy.max_open, 1):
+                _, evicted = self._engines.popitem(last=False)
+                # Połączenia w użyciu pozostają ważne do oddania do puli
+                evicted.dispose()
+                self.evicted_total += 1
+            return engine
+
+    def binds(self, guild_id: int) -> Dict[type, Engine]:
+        """Mapowanie modeli na silnik serwera dla Session(binds=...)"""
+        engine = self.engine(guild_id)
+        return {model: engine for model in SHARDED_MODELS}
+
+    def stats(self) -> Dict[str, int]:
+        """Zwraca statystyki puli"""
+        with self._lock:
+            return {
+                "open": len(self._engines),
+                "max_open": self.policy.max_open,
+                "opened_total": self.opened_total,
+                "evicted_total": self.evicted_total
+            }
+
+    def close(self):
+        """Zamyka wszystkie otwarte silniki"""
+        with self._lock:
+            for engine in self._engines.values():
+                engine.dispose()
+            self._engines.clear()
+
+    def _open(self, guild_id: int) -> Engine:
+        connect_args = self.query_stats.connect_args if self.query_stats else {}
+        engine = create_engine(f"sqlite:///{self.path(guild_id)}", connect_args=connect_args)
+        if self.query_stats:
+            self.query_stats.attach(engine)
+        self.storage_profile.apply(engine)
+        MigrationRunner(engine, shard_migrations(self.source, guild_id)).run()
+        # Także przy każdym otwarciu - awaria po kopii, a przed usunięciem, zostawiłaby wiersze
+        released = release_guild_data_from_main_database(self.source, guild_id)
+        if released:
+            self.logger.info(f"Przeniesiono do pliku serwera {guild_id}: długów={released}")
+        return engine
@@ -0,0 +1,71 @@
+"""
+Profil wydajnościowy SQLite ustawiany na każdym nowym połączeniu
+"""
+from dataclasses import dataclass
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from utils.env import env_choice, env_int
+
+JOURNAL_MODES = ("DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF")
+SYNCHRONOUS_MODES = ("OFF", "NORMAL", "FULL", "EXTRA")
+TEMP_STORES = ("DEFAULT", "FILE", "MEMORY")
+AUTO_VACUUM_MODES = ("NONE", "FULL", "INCREMENTAL")
+
+
+@dataclass(frozen=True)
+class SqliteProfile:
+    """Ustawienia PRAGMA dla połączeń SQLite"""
+    journal_mode: str = "WAL"
+    synchronous: str = "NORMAL"
+    mmap_size: int = 256 * 1024 * 1024  # bajty
+    cache_size: int = -64 * 1024  # wartość ujemna = KiB, czyli 64 MiB
+    busy_timeout: int = 5000  # ms
+    temp_store: str = "MEMORY"
+    auto_vacuum: str = "INCREMENTAL"  # działa dla nowych baz; istniejące konwertuje konserwacja przy DB_MAINTENANCE_FULL_VACUUM=ON
+    wal_checkpoint_interval: int = 300  # s, 0 = wyłączone
+
+    @classmethod
+    def from_env(cls) -> 'SqliteProfile':
+        """Tworzy profil ze zmiennych środowiskowych SQLITE_*"""
+        default = cls()
+        return cls(
+            journal_mode=env_choice("SQLITE_JOURNAL_MODE", default.journal_mode, JOURNAL_MODES),
+            synchronous=env_choice("SQLITE_SYNCHRONOUS", default.synchronous, SYNCHRONOUS_MODES),
+            mmap_size=env_int("SQLITE_MMAP_SIZE", default.mmap_size),
+            cache_size=env_int("SQLITE_CACHE_SIZE", default.cache_size),
+            busy_timeout=env_int("SQLITE_BUSY_TIMEOUT", default.busy_timeout),
+            temp_store=env_choice("SQLITE_TEMP_STORE", default.temp_store, TEMP_STORES),
+            auto_vacuum=env_choice("SQLITE_AUTO_VACUUM", default.auto_vacuum, AUTO_VACUUM_MODES),
+            wal_checkpoint_interval=env_int("SQLITE_WAL_CHECKPOINT_INTERVAL", default.wal_checkpoint_interval)
+        )
+
+    def pragmas(self) -> list[str]:
+        """Zwraca instrukcje PRAGMA w kolejności wykonania"""
+        return [
+            # Najpierw busy_timeout - kolejne PRAGMA mogą czekać na blokadę
+            f"PRAGMA busy_timeout={int(self.busy_timeout)}",
+            f"PRAGMA journal_mode={self.journal_mode}",
+            f"PRAGMA synchronous={self.synchronous}",
+            f"PRAGMA mmap_size={int(self.mmap_size)}",
+            f"PRAGMA cache_size={int(self.cache_size)}",
+            f"PRAGMA temp_store={self.temp_store}",
+        ]
+
+    def apply(self, engine: Engine):
+        """Rejestruje ustawianie profilu na każdym nowym połączeniu silnika"""
+        pragmas = self.pragmas()
+
+        @event.listens_for(engine, "connect")
+        def set_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            try:
+                # auto_vacuum działa tylko przed utworzeniem pierwszej tabeli, a na
+                # istniejącej bazie wymaga blokady zapisu - ustawiany tylko dla pustego pliku
+                if cursor.execute("PRAGMA page_count").fetchone()[0] == 0:
+                    cursor.execute(f"PRAGMA auto_vacuum={self.auto_vacuum}")
+                for pragma in pragmas:
+                    cursor.execute(pragma)
+            finally:
+                cursor.close()
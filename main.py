@@ -10,8 +10,8 @@ def main():
     log_info('main', "Discord Channel Cleaner - Uruchamianie")
 
     # Inicjalizacja menedżera konfiguracji (tworzy tabele)
-    from config.config_manager import ConfigManager
-    ConfigManager()
+    from config.config_manager import get_config_manager
+    get_config_manager()
     log_info('main', "Baza danych zainicjalizowana")
 
     # Utwórz i uruchom bota
@@ -6,7 +6,7 @@ from datetime import datetime
 from typing import Optional
 
 
-@dataclass
+@dataclass(slots=True)
 class CleaningSchedule:
     """Model reprezentujący harmonogram czyszczenia kanału"""
     channel_id: int
@@ -7,7 +7,7 @@ from decimal import Decimal
 from typing import Optional
 
 
-@dataclass
+@dataclass(slots=True)
 class Debt:
     """Model reprezentujący dług między użytkownikami"""
     debtor_id: int
@@ -0,0 +1,16 @@
+"""
+Model danych dla salda długów pary użytkowników - Single Responsibility Principle
+"""
+from dataclasses import dataclass
+from decimal import Decimal
+
+
+@dataclass(slots=True)
+class DebtBalance:
+    """Model reprezentujący łączną kwotę niespłaconych długów dłużnika wobec wierzyciela"""
+    guild_id: int
+    debtor_id: int
+    creditor_id: int
+    currency: str
+    amount: Decimal
+    debt_count: int = 0
@@ -0,0 +1,23 @@
+"""
+Model danych dla strony listy długów - Single Responsibility Principle
+"""
+from dataclasses import dataclass, field
+from typing import Optional
+
+from models.debt import Debt
+
+
+@dataclass
+class DebtPage:
+    """Strona długów uporządkowana rosnąco po ID (paginacja keyset)"""
+    debts: list[Debt] = field(default_factory=list)
+    has_previous: bool = False
+    has_next: bool = False
+
+    @property
+    def first_id(self) -> Optional[int]:
+        return self.debts[0].debt_id if self.debts else None
+
+    @property
+    def last_id(self) -> Optional[int]:
+        return self.debts[-1].debt_id if self.debts else None
@@ -6,7 +6,7 @@ from datetime import datetime
 from typing import Optional
 
 
-@dataclass
+@dataclass(slots=True)
 class DebtReminderSchedule:
     """Model reprezentujący harmonogram przypomnień o długach"""
     guild_id: int
@@ -0,0 +1,21 @@
+"""
+Model danych dla wpisu w logach audytowych - Single Responsibility Principle
+"""
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+
+def _utc_now() -> datetime:
+    # Ten sam format co server_default=func.now() w SQLite (UTC, bez strefy)
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+@dataclass
+class LogEntry:
+    """Model reprezentujący wpis audytowy oczekujący na zapis"""
+    user_id: int
+    guild_id: int
+    log_level_name: str
+    action_type_name: str
+    details: str
+    created_at: datetime = field(default_factory=_utc_now)
@@ -0,0 +1,15 @@
+"""
+Model danych dla licznika wpisów logów w okresie - Single Responsibility Principle
+"""
+from dataclasses import dataclass
+
+
+@dataclass(slots=True)
+class LogRollup:
+    """Liczba wpisów danego typu akcji i poziomu w godzinie lub dniu (UTC)"""
+    guild_id: int
+    granularity: str  # "hour" / "day"
+    period: str  # "YYYY-MM-DD HH" / "YYYY-MM-DD"
+    action_type: str
+    log_level: str
+    count: int = 0
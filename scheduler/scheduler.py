@@ -2,53 +2,222 @@
 Zarządzanie harmonogramami - Single Responsibility Principle
 """
 import asyncio
-from datetime import datetime
-from typing import List
+from datetime import datetime, timedelta
+from typing import Hashable, Optional
 from models.cleaning_schedule import CleaningSchedule
 from models.debt_reminder_schedule import DebtReminderSchedule
-from utils.validators import TimeValidator
+from scheduler.timer_queue import TimerQueue
 from services.channel_cleaner import ChannelCleaner
+from services.db_backup import DatabaseBackup
+from services.db_maintenance import DatabaseMaintenance
 from services.debt_reminder import DebtReminder
+from services.log_retention import LogRetention
+from services.log_rollup import LogRollups
 from utils.logger import get_logger
 
+# Klucz zadania uruchamiającego harmonogramy o danej godzinie: (SCHEDULES_TIMER, "HH:MM")
+SCHEDULES_TIMER = "schedules"
+
+LOG_ROLLUPS_TIMER = "log_rollups"
+LOG_RETENTION_TIMER = "log_retention"
+DB_BACKUP_TIMER = "db_backup"
+DB_MAINTENANCE_TIMER = "db_maintenance"
+WAL_CHECKPOINT_TIMER = "wal_checkpoint"
+
+# Ponowna próba wczytania indeksu harmonogramów po błędzie bazy (sekundy)
+SCHEDULE_INDEX_RETRY = 60
+
 
 class Scheduler:
-    """Zarządza harmonogramami różnych zadań"""
+    """Zarządza harmonogramami różnych zadań
+
+    Terminy wszystkich zadań leżą w kopcu (TimerQueue), a pętla śpi dokładnie
+    do najbliższego z nich - bez budzenia się, gdy nic nie przypada. Każda
+    godzina z harmonogramami czyszczenia/przypomnień to jedno zadanie,
+    planowane ponownie na następny dzień po wykonaniu, więc żadna minuta nie
+    jest pominięta ani obsłużona dwa razy, nawet gdy poprzednie zadanie się
+    przeciągnie. Zmiana harmonogramów (ScheduleIndex) budzi pętlę od razu.
+    """
 
     def __init__(self, bot, config_manager):
         self.bot = bot
         self.config_manager = config_manager
         self.cleaner = ChannelCleaner()
         self.debt_reminder = DebtReminder(bot, config_manager)
-        self.validator = TimeValidator()
+        self.log_retention = LogRetention(config_manager.sync)
+        self.log_rollups = LogRollups(config_manager.sync)
+        self.maintenance = DatabaseMaintenance(config_manager.sync)
+        self.backup = DatabaseBackup(config_manager.sync)
         self.logger = get_logger(__name__)
+        self.timers = TimerQueue()
+        self._schedules_changed = asyncio.Event()
+        self._started = False
 
     async def start(self):
-        """Uruchamia proces sprawdzania harmonogramów"""
+        """Uruchamia proces sprawdzania harmonogramów (kolejne wywołania nic nie robią)"""
+        if self._started:
+            self.logger.warning("Harmonogram już działa - pominięto ponowne uruchomienie")
+            return
+        self._started = True
+
         await self.bot.wait_until_ready()
 
-        self.logger.info("Rozpoczęto monitorowanie harmonogramów")
+        loop = asyncio.get_running_loop()
+        self.config_manager.sync.schedule_index.subscribe(
+            lambda: loop.call_soon_threadsafe(self._schedules_changed.set)
+        )
+        self._plan_maintenance_tasks(datetime.now())
+        await self._sync_schedule_timers()
+
+        self.logger.info(f"Rozpoczęto monitorowanie harmonogramów: zadań={len(self.timers)}")
 
         while not self.bot.is_closed():
-            await self._check_and_execute_schedules()
-            await asyncio.sleep(60)  # Sprawdzaj co minutę
+            await self._wait_for_next_timer()
+
+            if self._schedules_changed.is_set():
+                self._schedules_changed.clear()
+                await self._sync_schedule_timers()
+
+            for key, when in self.timers.pop_due(datetime.now()):
+                try:
+                    await self._fire(key, when)
+                except Exception as e:
+                    self.logger.error(f"Błąd zadania harmonogramu {key}: {e}", exc_info=True)
+
+    async def _wait_for_next_timer(self):
+        """Śpi do najbliższego terminu albo do zmiany harmonogramów"""
+        next_time = self.timers.next_time()
+        timeout = None if next_time is None else max((next_time - datetime.now()).total_seconds(), 0)
+        try:
+            await asyncio.wait_for(self._schedules_changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _sync_schedule_timers(self):
+        """Dopasowuje zadania godzin harmonogramów do indeksu harmonogramów"""
+        run_times = set(await self.config_manager.get_schedule_run_times())
+        now = datetime.now()
+
+        for key in self.timers.keys():
+            if isinstance(key, tuple) and key[0] == SCHEDULES_TIMER and key[1] not in run_times:
+                self.timers.cancel(key)
+
+        for run_time in run_times:
+            key = (SCHEDULES_TIMER, run_time)
+            if key not in self.timers:
+                self._plan_daily(key, run_time, now)
+
+        if not self.config_manager.sync.schedule_index.is_loaded:
+            self.timers.schedule(SCHEDULES_TIMER, now + timedelta(seconds=SCHEDULE_INDEX_RETRY))
+
+    def _plan_maintenance_tasks(self, now: datetime):
+        """Planuje pierwsze uruchomienia zadań konserwacyjnych"""
+        self.timers.schedule(LOG_ROLLUPS_TIMER, now)
+        self._plan_daily(LOG_RETENTION_TIMER, self.log_retention.policy.run_time, now)
+
+        if self.backup.is_enabled:
+            self._plan_daily(DB_BACKUP_TIMER, self.backup.policy.run_time, now)
+
+        if self.maintenance.policy.in_window(now.strftime("%H:%M")):
+            self.timers.schedule(DB_MAINTENANCE_TIMER, now)
+        else:
+            self._plan_daily(DB_MAINTENANCE_TIMER, self.maintenance.policy.window_start, now)
+
+        profile = self.config_manager.storage_profile
+        if profile.journal_mode == "WAL" and profile.wal_checkpoint_interval > 0:
+            self.timers.schedule(WAL_CHECKPOINT_TIMER, now + timedelta(seconds=profile.wal_checkpoint_interval))
+
+    def _plan_daily(self, key: Hashable, run_time: str, after: datetime):
+        """Planuje zadanie na najbliższą godzinę run_time (HH:MM) późniejszą niż after"""
+        next_time = self._next_daily(run_time, after)
+        if next_time is None:
+            self.logger.error(f"Nieprawidłowa godzina zadania {key}: {run_time!r}")
+            return
+        self.timers.schedule(key, next_time)
 
-    async def _check_and_execute_schedules(self):
-        """Sprawdza i wykonuje harmonogramy"""
-        current_time = self.validator.get_current_time()
+    @staticmethod
+    def _next_daily(run_time: str, after: datetime) -> Optional[datetime]:
+        try:
+            hour, minute = map(int, run_time.split(":"))
+            next_time = after.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        except ValueError:
+            return None
+        if next_time <= after:
+            next_time += timedelta(days=1)
+        return next_time
+
+    async def _fire(self, key: Hashable, when: datetime):
+        """Planuje następne uruchomienie zadania i wykonuje je"""
+        # Zadania dzienne liczą następny termin od planowanego - opóźnienie nie przesuwa kolejnych
+        after = max(when, datetime.now())
+
+        if isinstance(key, tuple) and key[0] == SCHEDULES_TIMER:
+            self._plan_daily(key, key[1], after)
+            await self._execute_schedules(key[1])
+
+        elif key == SCHEDULES_TIMER:
+            await self._sync_schedule_timers()
+
+        elif key == LOG_ROLLUPS_TIMER:
+            interval = max(self.log_rollups.policy.interval_minutes, 1)
+            self.timers.schedule(key, after + timedelta(minutes=interval))
+            await self._execute_log_rollups()
+
+        elif key == LOG_RETENTION_TIMER:
+            self._plan_daily(key, self.log_retention.policy.run_time, after)
+            await self._execute_log_retention()
+
+        elif key == DB_BACKUP_TIMER:
+            self._plan_daily(key, self.backup.policy.run_time, after)
+            await self._execute_db_backup()
+
+        elif key == DB_MAINTENANCE_TIMER:
+            # ANALYZE/optimize, VACUUM, spójność (raz dziennie w oknie ciszy)
+            self._plan_daily(key, self.maintenance.policy.window_start, after)
+            if self.maintenance.is_due(datetime.now()):
+                await self._execute_db_maintenance()
+
+        elif key == WAL_CHECKPOINT_TIMER:
+            # Okresowy checkpoint, żeby plik dziennika WAL nie rósł bez końca
+            interval = self.config_manager.storage_profile.wal_checkpoint_interval
+            self.timers.schedule(key, after + timedelta(seconds=interval))
+            await self.config_manager.checkpoint_wal()
+
+    async def _execute_schedules(self, run_time: str):
+        """Wykonuje harmonogramy czyszczenia i przypomnień przypadające na godzinę run_time"""
+        cleaning_schedules, reminder_schedules = await self.config_manager.get_due_schedules(run_time)
 
-        # Sprawdź harmonogramy czyszczenia
-        cleaning_schedules = self.config_manager.get_all_cleaning_schedules()
+        # Wykonaj harmonogramy czyszczenia
         for schedule in cleaning_schedules:
-            if schedule.matches_current_time(current_time):
+            if schedule.matches_current_time(run_time):
                 await self._execute_cleaning_schedule(schedule)
 
-        # Sprawdź harmonogramy przypomnień o długach
-        reminder_schedules = self.config_manager.get_debt_reminder_schedules()
+        # Wykonaj harmonogramy przypomnień o długach
         for schedule in reminder_schedules:
-            if schedule.is_active and schedule.run_time == current_time:
+            if schedule.is_active and schedule.run_time == run_time:
                 await self._execute_debt_reminder_schedule(schedule)
 
+    async def _execute_log_rollups(self):
+        """Dolicza nowe logi do liczników w wątku bazy danych"""
+        try:
+            await self.config_manager.run(self.log_rollups.run)
+        except Exception as e:
+            self.logger.error(f"Błąd agregacji logów: {e}", exc_info=True)
+
+    async def _execute_db_backup(self):
+        """Kopia zapasowa bazy w wątku bazy danych"""
+        try:
+            await self.config_manager.run(self.backup.run)
+        except Exception as e:
+            self.logger.error(f"Błąd kopii zapasowej bazy danych: {e}", exc_info=True)
+
+    async def _execute_db_maintenance(self):
+        """Konserwacja bazy w wątku bazy danych"""
+        try:
+            await self.config_manager.run(self.maintenance.run)
+        except Exception as e:
+            self.logger.error(f"Błąd konserwacji bazy danych: {e}", exc_info=True)
+
     async def _execute_cleaning_schedule(self, schedule: CleaningSchedule):
         """Wykonuje czyszczenie dla danego harmonogramu"""
         try:
@@ -66,13 +235,13 @@ class Scheduler:
 
             # Aktualizuj czas ostatniego uruchomienia
             if schedule.schedule_id:
-                self.config_manager.update_cleaning_schedule_last_run(
+                await self.config_manager.update_cleaning_schedule_last_run(
                     schedule.schedule_id,
                     datetime.now()
                 )
 
             # Zaloguj akcję
-            self.config_manager.add_log(
+            await self.config_manager.add_log(
                 user_id=self.bot.user.id,
                 guild_id=schedule.guild_id,
                 log_level_name="INFO",
@@ -102,7 +271,7 @@ class Scheduler:
             await self.debt_reminder.send_reminders(schedule)
 
             # Zaloguj akcję
-            self.config_manager.add_log(
+            await self.config_manager.add_log(
                 user_id=self.bot.user.id,
                 guild_id=schedule.guild_id,
                 log_level_name="INFO",
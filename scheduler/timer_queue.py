@@ -0,0 +1,60 @@
+"""
+Kolejka zadań według czasu uruchomienia - Single Responsibility Principle
+"""
+import heapq
+import itertools
+from datetime import datetime
+from typing import Dict, Hashable, List, Optional, Tuple
+
+
+class TimerQueue:
+    """Kopiec (heapq) zadań uporządkowanych według czasu następnego uruchomienia
+
+    Każdy klucz ma co najwyżej jeden aktywny termin. Ponowne zaplanowanie
+    albo anulowanie nie przebudowuje kopca - nieaktualne wpisy są pomijane
+    przy zdejmowaniu, więc obie operacje kosztują O(log n).
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[datetime, int, Hashable]] = []
+        self._active: Dict[Hashable, int] = {}  # klucz -> numer aktualnego wpisu w kopcu
+        self._counter = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._active)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._active
+
+    def schedule(self, key: Hashable, when: datetime):
+        """Ustawia termin zadania (zastępuje poprzedni)"""
+        entry = next(self._counter)
+        self._active[key] = entry
+        heapq.heappush(self._heap, (when, entry, key))
+
+    def cancel(self, key: Hashable):
+        """Usuwa zadanie z kolejki"""
+        self._active.pop(key, None)
+
+    def keys(self) -> List[Hashable]:
+        return list(self._active)
+
+    def next_time(self) -> Optional[datetime]:
+        """Najbliższy termin albo None, gdy kolejka jest pusta"""
+        self._discard_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: datetime) -> List[Tuple[Hashable, datetime]]:
+        """Zdejmuje zadania o terminie nie późniejszym niż now (rosnąco po terminie)"""
+        due = []
+        while True:
+            self._discard_stale()
+            if not self._heap or self._heap[0][0] > now:
+                return due
+            when, _, key = heapq.heappop(self._heap)
+            del self._active[key]
+            due.append((key, when))
+
+    def _discard_stale(self):
+        while self._heap and self._active.get(self._heap[0][2]) != self._heap[0][1]:
+            heapq.heappop(self._heap)
@@ -0,0 +1,151 @@
+"""
+Serwis kopii zapasowych bazy danych - Single Responsibility Principle
+"""
+import gzip
+import os
+import shutil
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from utils.env import env_int, env_str
+from utils.logger import get_logger
+
+BACKUP_SUFFIX = ".db.gz"
+
+
+@dataclass(frozen=True)
+class BackupPolicy:
+    """Ustawienia kopii zapasowych"""
+    backup_dir: str = "data/backups"
+    keep: int = 7  # liczba przechowywanych kopii
+    run_time: str = "03:30"  # HH:MM, "off" = bez kopii automatycznej
+
+    @classmethod
+    def from_env(cls) -> 'BackupPolicy':
+        """Tworzy politykę ze zmiennych środowiskowych DB_BACKUP_*"""
+        default = cls()
+        return cls(
+            backup_dir=env_str("DB_BACKUP_DIR", default.backup_dir),
+            keep=env_int("DB_BACKUP_KEEP", default.keep),
+            run_time=env_str("DB_BACKUP_TIME", default.run_time)
+        )
+
+
+@dataclass
+class BackupResult:
+    """Podsumowanie jednej kopii zapasowej"""
+    path: str
+    pages: int = 0
+    database_bytes: int = 0
+    compressed_bytes: int = 0
+    removed: int = 0  # usunięte stare kopie
+    guilds: int = 0  # skopiowane pliki serwerów (sharding)
+    duration: float = 0.0
+
+
+class BackupInProgressError(RuntimeError):
+    """Inna kopia zapasowa jest w trakcie"""
+
+
+class DatabaseBackup:
+    """Wykonuje spójną kopię działającej bazy, kompresuje ją i rotuje stare kopie
+
+    Kopia powstaje najpierw jako nieskompresowany plik tymczasowy w katalogu
+    kopii, a gotowe archiwum pojawia się pod docelową nazwą dopiero po
+    pełnym zapisie (os.replace), więc w katalogu nie ma niepełnych kopii.
+    Przy shardingu pliki serwerów trafiają do guilds/<id>/ z osobną rotacją.
+    Operacja jest blokująca - uruchamiać poza pętlą zdarzeń.
+    """
+
+    def __init__(self, config_manager, policy: Optional[BackupPolicy] = None):
+        self.config_manager = config_manager
+        self.policy = policy or BackupPolicy.from_env()
+        self.logger = get_logger(__name__)
+        self._lock = threading.Lock()
+
+    @property
+    def is_enabled(self) -> bool:
+        return self.policy.run_time.lower() != "off"
+
+    def run(self) -> BackupResult:
+        """Tworzy kopię zapasową (zgłasza BackupInProgressError, jeśli inna trwa)"""
+        if not self._lock.acquire(blocking=False):
+            raise BackupInProgressError("Kopia zapasowa jest już w trakcie")
+
+        try:
+            return self._run()
+        finally:
+            self._lock.release()
+
+    def list_backups(self, directory: Optional[str] = None) -> List[str]:
+        """Ścieżki kopii od najstarszej do najnowszej"""
+        directory = directory or self.policy.backup_dir
+        if not os.path.isdir(directory):
+            return []
+        names = sorted(name for name in os.listdir(directory) if name.endswith(BACKUP_SUFFIX))
+        return [os.path.join(directory, name) for name in names]
+
+    def _run(self) -> BackupResult:
+        start = time.perf_counter()
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+
+        result = BackupResult(path="")
+        result.path, result.pages, result.database_bytes, result.compressed_bytes = self._backup_file(
+            self.policy.backup_dir, f"bot_database-{stamp}"
+        )
+        result.removed = self._rotate(self.policy.backup_dir)
+
+        shards = self.config_manager.shards
+        for guild_id in shards.guild_ids() if shards else []:
+            directory = os.path.join(self.policy.backup_dir, "guilds", str(guild_id))
+            _, pages, database_bytes, compressed_bytes = self._backup_file(
+                directory, f"guild-{guild_id}-{stamp}", guild_id
+            )
+            result.pages += pages
+            result.database_bytes += database_bytes
+            result.compressed_bytes += compressed_bytes
+            result.removed += self._rotate(directory)
+            result.guilds += 1
+
+        result.duration = time.perf_counter() - start
+
+        self.logger.info(
+            f"Kopia zapasowa bazy: {result.path}, stron={result.pages}, "
+            f"rozmiar={result.database_bytes} B, skompresowana={result.compressed_bytes} B, "
+            f"plików serwerów={result.guilds}, usunięto starych={result.removed}, czas={result.duration:.2f}s"
+        )
+        return result
+
+    def _backup_file(self, directory: str, name: str, guild_id: Optional[int] = None) -> Tuple[str, int, int, int]:
+        """Kopiuje i kompresuje jedną bazę; zwraca (ścieżka, strony, rozmiar, rozmiar po kompresji)"""
+        os.makedirs(directory, exist_ok=True)
+        raw_path = os.path.join(directory, f"{name}.db.tmp")
+        part_path = os.path.join(directory, f"{name}{BACKUP_SUFFIX}.part")
+        path = os.path.join(directory, f"{name}{BACKUP_SUFFIX}")
+
+        try:
+            pages = self.config_manager.backup(raw_path, guild_id=guild_id)
+            database_bytes = os.path.getsize(raw_path)
+
+            with open(raw_path, "rb") as source, gzip.open(part_path, "wb", compresslevel=6) as target:
+                shutil.copyfileobj(source, target, length=1024 * 1024)
+            os.replace(part_path, path)
+        finally:
+            for temp_path in (raw_path, part_path):
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+
+        return path, pages, database_bytes, os.path.getsize(path)
+
+    def _rotate(self, directory: str) -> int:
+        """Usuwa najstarsze kopie w katalogu ponad limit keep"""
+        if self.policy.keep <= 0:
+            return 0
+
+        expired = self.list_backups(directory)[:-self.policy.keep]
+        for path in expired:
+            os.remove(path)
+        return len(expired)
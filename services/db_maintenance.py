@@ -0,0 +1,175 @@
+"""
+Serwis konserwacji bazy danych - Single Responsibility Principle
+"""
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Optional
+
+from utils.env import env_choice, env_int, env_str
+from utils.logger import get_logger
+
+INTEGRITY_CHECKS = ("QUICK", "FULL", "OFF")
+FULL_VACUUM_MODES = ("ON", "OFF")
+AUTO_VACUUM_INCREMENTAL = 2  # wartość PRAGMA auto_vacuum
+
+
+@dataclass(frozen=True)
+class MaintenancePolicy:
+    """Ustawienia okna i zakresu konserwacji bazy"""
+    window_start: str = "04:30"  # HH:MM
+    window_end: str = "05:30"  # HH:MM, może przypadać po północy
+    analysis_limit: int = 1000  # wiersze indeksu na tabelę przy PRAGMA optimize
+    full_analyze_days: int = 7  # co ile dni pełne ANALYZE, 0 = nigdy
+    vacuum_pages: int = 0  # strony na przebieg incremental_vacuum, 0 = wszystkie wolne
+    integrity_check: str = "QUICK"
+    full_vacuum: str = "OFF"  # ON = jednorazowa konwersja auto_vacuum pełnym VACUUM (blokuje zapisy)
+
+    @classmethod
+    def from_env(cls) -> 'MaintenancePolicy':
+        """Tworzy politykę ze zmiennych środowiskowych DB_MAINTENANCE_*"""
+        default = cls()
+        return cls(
+            window_start=env_str("DB_MAINTENANCE_WINDOW_START", default.window_start),
+            window_end=env_str("DB_MAINTENANCE_WINDOW_END", default.window_end),
+            analysis_limit=env_int("DB_MAINTENANCE_ANALYSIS_LIMIT", default.analysis_limit),
+            full_analyze_days=env_int("DB_MAINTENANCE_FULL_ANALYZE_DAYS", default.full_analyze_days),
+            vacuum_pages=env_int("DB_MAINTENANCE_VACUUM_PAGES", default.vacuum_pages),
+            integrity_check=env_choice("DB_MAINTENANCE_INTEGRITY_CHECK", default.integrity_check, INTEGRITY_CHECKS),
+            full_vacuum=env_choice("DB_MAINTENANCE_FULL_VACUUM", default.full_vacuum, FULL_VACUUM_MODES)
+        )
+
+    def in_window(self, current_time: str) -> bool:
+        """Sprawdza, czy godzina HH:MM mieści się w oknie [start, end)"""
+        if self.window_start <= self.window_end:
+            return self.window_start <= current_time < self.window_end
+        return current_time >= self.window_start or current_time < self.window_end
+
+
+@dataclass
+class MaintenanceResult:
+    """Podsumowanie jednego przebiegu konserwacji"""
+    size_before: int = 0
+    size_after: int = 0
+    wal_before: int = 0
+    wal_after: int = 0
+    pages_freed: int = 0
+    full_analyze: bool = False
+    full_vacuum: bool = False
+    integrity_problems: List[str] = field(default_factory=list)
+    guilds: int = 0  # pliki serwerów objęte konserwacją (sharding)
+    duration: float = 0.0
+
+
+class DatabaseMaintenance:
+    """Odświeża statystyki planera, odzyskuje wolne strony i sprawdza spójność pliku
+
+    Kolejne kroki są niezależne - błąd jednego jest logowany i nie przerywa
+    pozostałych. Przy shardingu statystyki, wolne strony i spójność są
+    obsługiwane także w plikach serwerów; pliki te powstają od razu
+    z auto_vacuum=INCREMENTAL, więc nie wymagają konwersji. Wszystkie kroki
+    są blokujące, więc uruchamiać poza pętlą zdarzeń.
+    """
+
+    def __init__(self, config_manager, policy: Optional[MaintenancePolicy] = None):
+        self.config_manager = config_manager
+        self.policy = policy or MaintenancePolicy.from_env()
+        self.logger = get_logger(__name__)
+        self.last_run_date = None
+        self._last_full_analyze: Optional[datetime] = None
+
+    def is_due(self, now: datetime) -> bool:
+        """Konserwacja uruchamia się raz dziennie, w oknie ciszy"""
+        return self.last_run_date != now.date() and self.policy.in_window(now.strftime("%H:%M"))
+
+    def run(self) -> MaintenanceResult:
+        """Wykonuje pełny przebieg konserwacji"""
+        start = time.perf_counter()
+        self.last_run_date = datetime.now().date()
+        result = MaintenanceResult()
+
+        stats_before = self.config_manager.get_storage_stats()
+        result.size_before = stats_before.get("size_bytes", 0)
+        result.wal_before = stats_before.get("wal_bytes", 0)
+
+        self._step("optymalizacja statystyk", self._optimize, result)
+        self._step("odzyskiwanie wolnych stron", self._vacuum, result, stats_before)
+        self._step("checkpoint WAL", self.config_manager.checkpoint_wal, "TRUNCATE")
+        if self.policy.integrity_check != "OFF":
+            self._step("sprawdzenie spójności", self._check_integrity, result)
+
+        shards = self.config_manager.shards
+        for guild_id in shards.guild_ids() if shards else []:
+            self._step(f"konserwacja pliku serwera {guild_id}", self._maintain_guild_file, result, guild_id)
+            result.guilds += 1
+
+        stats_after = self.config_manager.get_storage_stats()
+        result.size_after = stats_after.get("size_bytes", 0)
+        result.wal_after = stats_after.get("wal_bytes", 0)
+        result.duration = time.perf_counter() - start
+
+        self.logger.info(
+            f"Konserwacja bazy: rozmiar {result.size_before} -> {result.size_after} B, "
+            f"WAL {result.wal_before} -> {result.wal_after} B, zwolniono stron={result.pages_freed}, "
+            f"pełne ANALYZE={result.full_analyze}, pełny VACUUM={result.full_vacuum}, "
+            f"spójność={'OK' if not result.integrity_problems else 'BŁĘDY'}, "
+            f"plików serwerów={result.guilds}, czas={result.duration:.2f}s"
+        )
+        return result
+
+    def _step(self, name: str, func, *args):
+        try:
+            func(*args)
+        except Exception as e:
+            self.logger.error(f"Konserwacja bazy - błąd kroku '{name}': {e}", exc_info=True)
+
+    def _optimize(self, result: MaintenanceResult):
+        now = datetime.now()
+        full = self.policy.full_analyze_days > 0 and (
+            self._last_full_analyze is None
+            or (now - self._last_full_analyze).days >= self.policy.full_analyze_days
+        )
+        self.config_manager.optimize(analysis_limit=self.policy.analysis_limit, full_analyze=full)
+        if full:
+            self._last_full_analyze = now
+        result.full_analyze = full
+
+    def _vacuum(self, result: MaintenanceResult, stats: dict):
+        if stats.get("auto_vacuum") != AUTO_VACUUM_INCREMENTAL:
+            if self.config_manager.storage_profile.auto_vacuum != "INCREMENTAL":
+                return
+            if self.policy.full_vacuum != "ON":
+                self.logger.info(
+                    "Konserwacja bazy: plik bez auto_vacuum=INCREMENTAL, wolne strony nie są zwalniane "
+                    "(DB_MAINTENANCE_FULL_VACUUM=ON włącza jednorazową konwersję)"
+                )
+                return
+            # Plik utworzony bez auto_vacuum - jednorazowa konwersja pełnym VACUUM
+            self.logger.info("Konserwacja bazy: przełączanie auto_vacuum na INCREMENTAL (pełny VACUUM)")
+            self.config_manager.vacuum(auto_vacuum="INCREMENTAL")
+            result.full_vacuum = True
+            result.pages_freed = stats.get("freelist_count", 0)
+            return
+
+        result.pages_freed = self.config_manager.incremental_vacuum(self.policy.vacuum_pages)
+
+    def _check_integrity(self, result: MaintenanceResult, guild_id: Optional[int] = None):
+        problems = self.config_manager.check_integrity(
+            full=self.policy.integrity_check == "FULL", guild_id=guild_id
+        )
+        if problems:
+            source = f"plik serwera {guild_id}" if guild_id is not None else "wspólna baza"
+            self.logger.error(
+                f"Konserwacja bazy: wykryto problemy ze spójnością - {source} ({len(problems)}): "
+                f"{'; '.join(problems[:10])}"
+            )
+            result.integrity_problems.extend(problems)
+
+    def _maintain_guild_file(self, result: MaintenanceResult, guild_id: int):
+        """Statystyki, wolne strony i spójność pliku serwera (zakres jak dla wspólnej bazy)"""
+        self.config_manager.optimize(
+            analysis_limit=self.policy.analysis_limit, full_analyze=result.full_analyze, guild_id=guild_id
+        )
+        result.pages_freed += self.config_manager.incremental_vacuum(self.policy.vacuum_pages, guild_id=guild_id)
+        if self.policy.integrity_check != "OFF":
+            self._check_integrity(result, guild_id)
@@ -23,42 +23,38 @@ class DebtReminder:
                 self.logger.error(f"Nie znaleziono kanału: {schedule.channel_id}")
                 return
 
-            # Pobierz wszystkie niezapłacone długi na serwerze
-            debts = self.config_manager.get_debts(
-                guild_id=schedule.guild_id,
-                is_settled=False
-            )
+            # Pobierz salda niespłaconych długów (jeden wiersz na parę i walutę)
+            balances = await self.config_manager.get_debt_balances(schedule.guild_id)
 
-            if not debts:
+            if not balances:
                 self.logger.info(f"Brak długów do przypomnienia na kanale {channel.id}")
                 return
 
-            # Podziel długi na grupy dla czytelności
-            debt_groups = {}
-            for debt in debts:
-                key = (debt.debtor_id, debt.creditor_id)
-                if key not in debt_groups:
-                    debt_groups[key] = []
-                debt_groups[key].append(debt)
+            # Opisy tylko dla wysyłanych przypomnień i tylko gdy szablon ich używa
+            needs_description = "{description}" in schedule.message_template
 
             # Wyślij przypomnienia
-            for (debtor_id, creditor_id), debt_list in list(debt_groups.items())[:10]:  # Ogranicz do 10 przypomnień
-                total_amount = sum(debt.amount for debt in debt_list)
-
+            for balance in balances[:10]:  # Ogranicz do 10 przypomnień
                 # Pobierz dane użytkowników
-                debtor = channel.guild.get_member(debtor_id)
-                creditor = channel.guild.get_member(creditor_id)
+                debtor = channel.guild.get_member(balance.debtor_id)
+                creditor = channel.guild.get_member(balance.creditor_id)
 
                 if not debtor or not creditor:
                     continue
 
+                descriptions = []
+                if needs_description:
+                    descriptions = await self.config_manager.get_open_debt_descriptions(
+                        schedule.guild_id, balance.debtor_id, balance.creditor_id, balance.currency
+                    )
+
                 # Formatuj wiadomość
                 message = schedule.format_message(
                     debtor_name=debtor.display_name,
                     creditor_name=creditor.display_name,
-                    amount=str(total_amount),
-                    currency=debt_list[0].currency,
-                    description=", ".join(d.description for d in debt_list if d.description)
+                    amount=str(balance.amount),
+                    currency=balance.currency,
+                    description=", ".join(descriptions)
                 )
 
                 # Wyślij jako embed dla lepszego wyglądu
@@ -69,11 +65,14 @@ class DebtReminder:
                 )
                 embed.add_field(name="Dłużnik", value=debtor.mention, inline=True)
                 embed.add_field(name="Wierzyciel", value=creditor.mention, inline=True)
-                embed.add_field(name="Łączna kwota", value=f"{total_amount} {debt_list[0].currency}", inline=True)
+                embed.add_field(name="Łączna kwota", value=f"{balance.amount} {balance.currency}", inline=True)
                 embed.set_footer(text="Przypomnienie automatyczne")
 
                 await channel.send(embed=embed)
-                self.logger.info(f"Wysłano przypomnienie: {debtor_id} → {creditor_id}: {total_amount}")
+                self.logger.info(
+                    f"Wysłano przypomnienie: {balance.debtor_id} → {balance.creditor_id}: "
+                    f"{balance.amount} {balance.currency}"
+                )
 
         except Exception as e:
             self.logger.error(f"Błąd wysyłania przypomnień: {e}", exc_info=True)
\ No newline at end of file
@@ -0,0 +1,237 @@
+"""
+Serwis importu i eksportu długów (CSV / NDJSON) - Single Responsibility Principle
+"""
+import csv
+import json
+import os
+import tempfile
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import Iterator, List, Optional
+
+from models.debt import Debt
+from utils.logger import get_logger
+
+FORMATS = ("csv", "ndjson")
+FIELDS = ["debt_id", "debtor_id", "creditor_id", "amount", "currency", "description",
+          "is_settled", "created_at", "updated_at"]
+MAX_AMOUNT = Decimal("99999999.99")  # DECIMAL(10, 2) w tabeli długów
+MAX_REPORTED_ERRORS = 10
+
+
+@dataclass
+class DebtImportResult:
+    """Podsumowanie importu długów"""
+    imported: int = 0
+    rejected: int = 0
+    failed: int = 0  # poprawne wiersze z partii odrzuconych przez bazę
+    errors: List[str] = field(default_factory=list)
+
+    def add_error(self, line_number: int, message: str):
+        self.rejected += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(f"Wiersz {line_number}: {message}")
+
+
+def detect_format(filename: str) -> Optional[str]:
+    """Rozpoznaje format pliku po rozszerzeniu (.csv, .ndjson, .jsonl)"""
+    extension = os.path.splitext(filename.lower())[1]
+    if extension == ".csv":
+        return "csv"
+    if extension in (".ndjson", ".jsonl"):
+        return "ndjson"
+    return None
+
+
+class DebtTransfer:
+    """Eksport i import długów serwera
+
+    Obie operacje są blokujące (uruchamiać poza pętlą zdarzeń) i działają
+    strumieniowo: eksport czyta długi kursorem partiami prosto do pliku,
+    a import wczytuje plik wiersz po wierszu i zapisuje partie po batch_size
+    w osobnych transakcjach. Zużycie pamięci nie zależy od rozmiaru rejestru.
+    """
+
+    def __init__(self, config_manager, batch_size: int = 1000):
+        self.config_manager = config_manager
+        self.batch_size = batch_size
+        self.logger = get_logger(__name__)
+
+    def export(self, guild_id: int, file_format: str) -> tuple[str, int]:
+        """Zapisuje długi serwera do pliku tymczasowego
+
+        :return: Ścieżka pliku (do usunięcia przez wywołującego) i liczba wierszy
+        """
+        if file_format not in FORMATS:
+            raise ValueError(f"Nieobsługiwany format: {file_format}")
+
+        fd, path = tempfile.mkstemp(prefix=f"debts-{guild_id}-", suffix=f".{file_format}")
+        rows = 0
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8", newline="") as file:
+                debts = self.config_manager.iter_debts(guild_id, batch_size=self.batch_size)
+                if file_format == "csv":
+                    writer = csv.DictWriter(file, fieldnames=FIELDS)
+                    writer.writeheader()
+                    for debt in debts:
+                        writer.writerow(self._to_record(debt))
+                        rows += 1
+                else:
+                    for debt in debts:
+                        file.write(json.dumps(self._to_record(debt), ensure_ascii=False) + "\n")
+                        rows += 1
+        except Exception:
+            os.remove(path)
+            raise
+
+        self.logger.info(f"Eksport długów serwera {guild_id}: {rows} wierszy ({file_format})")
+        return path, rows
+
+    def import_file(self, guild_id: int, path: str, file_format: str) -> DebtImportResult:
+        """Waliduje plik i wstawia poprawne długi partiami po batch_size"""
+        if file_format not in FORMATS:
+            raise ValueError(f"Nieobsługiwany format: {file_format}")
+
+        result = DebtImportResult()
+        batch: List[Debt] = []
+
+        with open(path, "r", encoding="utf-8-sig", newline="") as file:
+            for line_number, record in self._read_records(file, file_format, result):
+                try:
+                    batch.append(self._to_debt(guild_id, record))
+                except ValueError as e:
+                    result.add_error(line_number, str(e))
+                    continue
+
+                if len(batch) >= self.batch_size:
+                    self._flush(batch, result)
+                    batch = []
+
+        self._flush(batch, result)
+        self.logger.info(
+            f"Import długów serwera {guild_id}: zaimportowano={result.imported}, "
+            f"odrzucono={result.rejected}, błędy zapisu={result.failed}"
+        )
+        return result
+
+    def _flush(self, batch: List[Debt], result: DebtImportResult):
+        if not batch:
+            return
+        imported = self.config_manager.import_debts(batch)
+        result.imported += imported
+        result.failed += len(batch) - imported
+
+    @staticmethod
+    def _read_records(file, file_format: str, result: DebtImportResult) -> Iterator[tuple[int, dict]]:
+        if file_format == "csv":
+            reader = csv.DictReader(file)
+            missing = {"debtor_id", "creditor_id", "amount"} - set(reader.fieldnames or [])
+            if missing:
+                raise ValueError(f"Brak kolumn: {', '.join(sorted(missing))}")
+            for record in reader:
+                yield reader.line_num, record
+            return
+
+        for line_number, line in enumerate(file, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                result.add_error(line_number, "niepoprawny JSON")
+                continue
+            if not isinstance(record, dict):
+                result.add_error(line_number, "oczekiwano obiektu JSON")
+                continue
+            yield line_number, record
+
+    @staticmethod
+    def _to_record(debt: Debt) -> dict:
+        return {
+            "debt_id": debt.debt_id,
+            "debtor_id": debt.debtor_id,
+            "creditor_id": debt.creditor_id,
+            "amount": str(debt.amount),
+            "currency": debt.currency,
+            "description": debt.description or "",
+            "is_settled": debt.is_settled,
+            "created_at": debt.created_at.isoformat() if debt.created_at else None,
+            "updated_at": debt.updated_at.isoformat() if debt.updated_at else None
+        }
+
+    @staticmethod
+    def _to_user_id(record: dict, name: str) -> int:
+        """ID użytkownika z liczby całkowitej lub tekstu (NDJSON może mieć dowolny typ)"""
+        value = record.get(name)
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)
+        if isinstance(value, bool) or not isinstance(value, (int, str)):
+            raise ValueError(f"niepoprawne {name}")
+        try:
+            return int(value)
+        except ValueError:
+            raise ValueError(f"niepoprawne {name}")
+
+    @staticmethod
+    def _to_debt(guild_id: int, record: dict) -> Debt:
+        """Waliduje rekord i tworzy dług (ID z pliku jest pomijane - nadaje je baza)
+
+        Każde pole jest sprawdzane także co do typu - błędny wiersz jest
+        odrzucany z numerem, zamiast wycofywać przy zapisie całą partię.
+        """
+        debtor_id = DebtTransfer._to_user_id(record, "debtor_id")
+        creditor_id = DebtTransfer._to_user_id(record, "creditor_id")
+        if debtor_id == creditor_id:
+            raise ValueError("dłużnik i wierzyciel to ta sama osoba")
+
+        raw_amount = record.get("amount")
+        if isinstance(raw_amount, bool) or not isinstance(raw_amount, (int, float, str)):
+            raise ValueError("niepoprawna kwota")
+        try:
+            amount = Decimal(str(raw_amount)).quantize(Decimal("0.01"))
+        except (InvalidOperation, ValueError):
+            raise ValueError("niepoprawna kwota")
+        if not amount.is_finite():
+            raise ValueError("niepoprawna kwota")
+        if amount <= 0:
+            raise ValueError("kwota musi być większa od 0")
+        if amount > MAX_AMOUNT:
+            raise ValueError("kwota poza zakresem")
+
+        currency = record.get("currency") or "PLN"
+        if not isinstance(currency, str):
+            raise ValueError("niepoprawna waluta")
+        currency = currency.upper()
+        if len(currency) != 3 or not currency.isalpha():
+            raise ValueError(f"niepoprawna waluta: {currency}")
+
+        description = record.get("description")
+        if description is not None and not isinstance(description, str):
+            raise ValueError("opis musi być tekstem")
+
+        is_settled = record.get("is_settled", False)
+        if isinstance(is_settled, str):
+            is_settled = is_settled.strip().lower() in ("1", "true", "tak", "yes")
+        elif is_settled is None:
+            is_settled = False
+        elif not isinstance(is_settled, bool) and is_settled not in (0, 1):
+            raise ValueError("niepoprawne is_settled")
+
+        try:
+            created_at = datetime.fromisoformat(record["created_at"]) if record.get("created_at") else None
+            updated_at = datetime.fromisoformat(record["updated_at"]) if record.get("updated_at") else None
+        except (TypeError, ValueError):
+            raise ValueError("niepoprawna data (oczekiwano ISO 8601)")
+
+        return Debt(
+            debtor_id=debtor_id,
+            creditor_id=creditor_id,
+            amount=amount,
+            currency=currency,
+            description=description or None,
+            guild_id=guild_id,
+            is_settled=bool(is_settled),
+            created_at=created_at,
+            updated_at=updated_at
+        )
@@ -0,0 +1,128 @@
+"""
+Serwis retencji logów audytowych - Single Responsibility Principle
+"""
+import gzip
+import json
+import os
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from utils.env import env_int, env_str
+from utils.logger import get_logger
+
+
+@dataclass(frozen=True)
+class LogRetentionPolicy:
+    """Ustawienia retencji tabeli logs"""
+    max_age_days: int = 90  # 0 = bez limitu wieku
+    max_rows_per_guild: int = 0  # 0 = bez limitu wierszy
+    archive_dir: str = "data/archive/logs"
+    batch_size: int = 1000
+    run_time: str = "04:00"  # HH:MM
+
+    @classmethod
+    def from_env(cls) -> 'LogRetentionPolicy':
+        """Tworzy politykę ze zmiennych środowiskowych LOG_RETENTION_*"""
+        default = cls()
+        return cls(
+            max_age_days=env_int("LOG_RETENTION_DAYS", default.max_age_days),
+            max_rows_per_guild=env_int("LOG_RETENTION_MAX_ROWS_PER_GUILD", default.max_rows_per_guild),
+            archive_dir=env_str("LOG_RETENTION_ARCHIVE_DIR", default.archive_dir),
+            batch_size=env_int("LOG_RETENTION_BATCH_SIZE", default.batch_size),
+            run_time=env_str("LOG_RETENTION_TIME", default.run_time)
+        )
+
+
+@dataclass
+class LogRetentionResult:
+    """Podsumowanie jednego przebiegu retencji"""
+    rows_archived: int = 0
+    rows_deleted: int = 0
+    archive_bytes: int = 0
+    reclaimed_bytes: int = 0
+    duration: float = 0.0
+
+
+class LogRetention:
+    """Przenosi wygasłe logi do skompresowanych archiwów miesięcznych i usuwa je z bazy
+
+    Wiersze są przetwarzane partiami po batch_size, a każda partia jest
+    usuwana w osobnej, krótkiej transakcji, więc blokada zapisu nie jest
+    trzymana przez cały przebieg.
+    """
+
+    def __init__(self, config_manager, policy: Optional[LogRetentionPolicy] = None):
+        self.config_manager = config_manager
+        self.policy = policy or LogRetentionPolicy.from_env()
+        self.logger = get_logger(__name__)
+
+    def run(self) -> LogRetentionResult:
+        """Wykonuje retencję (blokująco - uruchamiać poza pętlą zdarzeń)"""
+        start = time.perf_counter()
+        result = LogRetentionResult()
+        stats_before = self.config_manager.get_storage_stats()
+
+        # Limit wieku
+        if self.policy.max_age_days > 0:
+            cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=self.policy.max_age_days)
+            self._prune(result, created_before=cutoff)
+
+        # Limit wierszy na serwer
+        if self.policy.max_rows_per_guild > 0:
+            cutoffs = self.config_manager.get_log_row_budget_cutoffs(self.policy.max_rows_per_guild)
+            for guild_id, keep_from_id in cutoffs.items():
+                self._prune(result, guild_id=guild_id, below_id=keep_from_id)
+
+        stats_after = self.config_manager.get_storage_stats()
+        result.reclaimed_bytes = max(0, stats_after.get("free_bytes", 0) - stats_before.get("free_bytes", 0))
+        result.duration = time.perf_counter() - start
+
+        self.logger.info(
+            f"Retencja logów: zarchiwizowano={result.rows_archived}, usunięto={result.rows_deleted}, "
+            f"archiwum={result.archive_bytes} B, odzyskano={result.reclaimed_bytes} B, "
+            f"czas={result.duration:.2f}s"
+        )
+        return result
+
+    def _prune(self, result: LogRetentionResult, **criteria):
+        while True:
+            rows = self.config_manager.get_logs_for_archive(limit=self.policy.batch_size, **criteria)
+            if not rows:
+                return
+
+            # Najpierw archiwum, potem usunięcie - awaria w międzyczasie nie gubi danych
+            result.archive_bytes += self._archive(rows)
+            result.rows_archived += len(rows)
+
+            deleted = self.config_manager.delete_logs([row["id"] for row in rows])
+            result.rows_deleted += deleted
+            if deleted == 0:
+                self.logger.warning("Retencja logów przerwana - nie udało się usunąć partii")
+                return
+
+    def _archive(self, rows: list[dict]) -> int:
+        """Dopisuje wiersze do plików <archive_dir>/YYYY-MM.ndjson.gz, zwraca liczbę zapisanych bajtów"""
+        os.makedirs(self.policy.archive_dir, exist_ok=True)
+
+        by_month = defaultdict(list)
+        for row in rows:
+            created_at = row["created_at"]
+            by_month[created_at.strftime("%Y-%m") if created_at else "unknown"].append(row)
+
+        written = 0
+        for month, month_rows in by_month.items():
+            path = os.path.join(self.policy.archive_dir, f"{month}.ndjson.gz")
+            size_before = os.path.getsize(path) if os.path.exists(path) else 0
+
+            # Tryb "ab" dopisuje kolejny człon gzip - plik pozostaje poprawnym archiwum
+            with gzip.open(path, "ab") as archive:
+                for row in month_rows:
+                    record = dict(row, created_at=row["created_at"].isoformat() if row["created_at"] else None)
+                    archive.write(json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n")
+
+            written += os.path.getsize(path) - size_before
+
+        return written
@@ -0,0 +1,69 @@
+"""
+Serwis liczników logów audytowych - Single Responsibility Principle
+"""
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from utils.env import env_int
+from utils.logger import get_logger
+
+
+@dataclass(frozen=True)
+class LogRollupPolicy:
+    """Ustawienia agregacji logów do log_rollups"""
+    interval_minutes: int = 60  # co ile minut doliczać nowe logi
+    batch_size: int = 5000  # wpisy logów na transakcję
+    hourly_keep_days: int = 35  # liczniki godzinowe starsze niż tyle dni są usuwane, 0 = bez limitu
+
+    @classmethod
+    def from_env(cls) -> 'LogRollupPolicy':
+        """Tworzy politykę ze zmiennych środowiskowych LOG_ROLLUP_*"""
+        default = cls()
+        return cls(
+            interval_minutes=env_int("LOG_ROLLUP_INTERVAL_MINUTES", default.interval_minutes),
+            batch_size=env_int("LOG_ROLLUP_BATCH_SIZE", default.batch_size),
+            hourly_keep_days=env_int("LOG_ROLLUP_HOURLY_KEEP_DAYS", default.hourly_keep_days)
+        )
+
+
+@dataclass
+class LogRollupResult:
+    """Podsumowanie jednego przebiegu agregacji"""
+    rows_processed: int = 0
+    hourly_pruned: int = 0
+    duration: float = 0.0
+
+
+class LogRollups:
+    """Dolicza nowe wpisy logów do liczników godzinowych i dziennych
+
+    Każdy przebieg przetwarza tylko wpisy o ID większym niż zapamiętany
+    znacznik postępu, więc jego koszt zależy od liczby nowych logów,
+    a nie od rozmiaru tabeli. Komenda $stats czyta wyłącznie liczniki.
+    """
+
+    def __init__(self, config_manager, policy: Optional[LogRollupPolicy] = None):
+        self.config_manager = config_manager
+        self.policy = policy or LogRollupPolicy.from_env()
+        self.logger = get_logger(__name__)
+
+    def run(self) -> LogRollupResult:
+        """Wykonuje agregację (blokująco - uruchamiać poza pętlą zdarzeń)"""
+        start = time.perf_counter()
+        result = LogRollupResult()
+
+        result.rows_processed = self.config_manager.rollup_logs(max(self.policy.batch_size, 1))
+
+        if self.policy.hourly_keep_days > 0:
+            cutoff = datetime.now(timezone.utc) - timedelta(days=self.policy.hourly_keep_days)
+            result.hourly_pruned = self.config_manager.prune_log_rollups("hour", cutoff.strftime("%Y-%m-%d %H"))
+
+        result.duration = time.perf_counter() - start
+        if result.rows_processed or result.hourly_pruned:
+            self.logger.info(
+                f"Agregacja logów: przetworzono={result.rows_processed}, "
+                f"usunięto liczników godzinowych={result.hourly_pruned}, czas={result.duration:.2f}s"
+            )
+        return result
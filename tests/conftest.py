@@ -0,0 +1,17 @@
+"""
+Wspólne fikstury i stałe testów
+"""
+import pytest
+
+from config.config_manager import ConfigManager
+
+GUILD_ID = 1
+
+
+@pytest.fixture
+def manager(request):
+    """Menedżer na bazie w pamięci, a przy parametryzacji pośredniej "file" - na pliku tymczasowym"""
+    storage = getattr(request, "param", "memory")
+    manager = ConfigManager.in_memory() if storage == "memory" else ConfigManager.temporary()
+    yield manager
+    manager.close()
@@ -0,0 +1,77 @@
+"""
+Ścieżka odczytu długów - liczba zapytań nie zależy od liczby wierszy, opisy dla przypomnień
+"""
+from decimal import Decimal
+
+from sqlalchemy import event
+
+from config.config_manager import ConfigManager
+from models.debt import Debt
+from models.debt_reminder_schedule import DebtReminderSchedule
+from tests.conftest import GUILD_ID
+
+
+def count_queries(manager: ConfigManager, func) -> int:
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(manager.engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        func()
+    finally:
+        event.remove(manager.engine, "before_cursor_execute", before_cursor_execute)
+    return len(statements)
+
+
+def add_debts(manager: ConfigManager, count: int, schedule_ids: list):
+    for i in range(count):
+        assert manager.add_debt(Debt(
+            debtor_id=10 + i % 3,
+            creditor_id=20,
+            amount=Decimal("1.50"),
+            guild_id=GUILD_ID,
+            schedule_ids=list(schedule_ids)
+        ))
+
+
+def add_reminder_schedule(manager: ConfigManager) -> int:
+    schedule = DebtReminderSchedule(guild_id=GUILD_ID, channel_id=100, run_time="12:00",
+                                    frequency_id=1, added_by=1)
+    assert manager.add_debt_reminder_schedule(schedule)
+    return schedule.schedule_id
+
+
+def test_get_debts_query_count_does_not_grow_with_rows(manager):
+    schedule_id = add_reminder_schedule(manager)
+
+    add_debts(manager, 2, [schedule_id])
+    few = count_queries(manager, lambda: manager.get_debts(GUILD_ID))
+
+    add_debts(manager, 60, [schedule_id])
+    debts = []
+    many = count_queries(manager, lambda: debts.extend(manager.get_debts(GUILD_ID)))
+
+    assert len(debts) == 62
+    assert all(debt.schedule_ids == [schedule_id] for debt in debts)
+    assert few == many == 2
+
+
+def test_get_debts_without_schedule_ids_is_one_query(manager):
+    add_debts(manager, 30, [])
+
+    assert count_queries(manager, lambda: manager.get_debts(GUILD_ID, include_schedule_ids=False)) == 1
+
+
+def test_open_debt_descriptions_of_one_pair_and_currency(manager):
+    for description, currency in (("pizza", "PLN"), ("kino", "PLN"), (None, "PLN"), ("bilet", "EUR")):
+        assert manager.add_debt(Debt(debtor_id=10, creditor_id=20, amount=Decimal("5"), guild_id=GUILD_ID,
+                                     description=description, currency=currency))
+    assert manager.add_debt(Debt(debtor_id=11, creditor_id=20, amount=Decimal("5"), guild_id=GUILD_ID,
+                                 description="obiad"))
+    settled = Debt(debtor_id=10, creditor_id=20, amount=Decimal("5"), guild_id=GUILD_ID, description="stary")
+    assert manager.add_debt(settled)
+    assert manager.settle_debt(settled.debt_id, GUILD_ID)
+
+    assert manager.get_open_debt_descriptions(GUILD_ID, 10, 20, "PLN") == ["pizza", "kino"]
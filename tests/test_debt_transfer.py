@@ -0,0 +1,25 @@
+"""
+Import długów odrzuca wiersze z błędnymi typami pól, nie całą partię
+"""
+import json
+
+from services.debt_transfer import DebtTransfer
+from tests.conftest import GUILD_ID
+
+
+def test_ndjson_rows_with_wrong_field_types_are_rejected_with_line_numbers(manager, tmp_path):
+    rows = [
+        {"debtor_id": 10, "creditor_id": 20, "amount": "5.00", "description": "pizza"},
+        {"debtor_id": 10, "creditor_id": 20, "amount": "5.00", "description": 123},
+        {"debtor_id": True, "creditor_id": 20, "amount": "5.00"},
+        {"debtor_id": 10.9, "creditor_id": 20, "amount": "5.00"},
+        {"debtor_id": "11", "creditor_id": 20.0, "amount": 7},
+    ]
+    path = tmp_path / "debts.ndjson"
+    path.write_text("\n".join(json.dumps(row) for row in rows) + "\n", encoding="utf-8")
+
+    result = DebtTransfer(manager).import_file(GUILD_ID, str(path), "ndjson")
+
+    assert (result.imported, result.rejected, result.failed) == (2, 3, 0)
+    assert [error.split(":")[0] for error in result.errors] == ["Wiersz 2", "Wiersz 3", "Wiersz 4"]
+    assert sorted(debt.description or "" for debt in manager.get_debts(GUILD_ID)) == ["", "pizza"]
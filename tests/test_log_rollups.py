@@ -0,0 +1,49 @@
+"""
+Liczniki logów (rollup_logs) i ich współpraca z retencją
+"""
+from sqlalchemy import select
+
+from config.config_manager import ConfigManager
+from database.models.log import Log
+from tests.conftest import GUILD_ID
+
+
+def add_logs(manager: ConfigManager, count: int):
+    for i in range(count):
+        assert manager.add_log(1, GUILD_ID, "INFO", "ADD_DEBT", f"wpis {i}")
+
+
+def log_ids(manager: ConfigManager) -> list:
+    with manager.engine.connect() as connection:
+        return list(connection.execute(select(Log.id).order_by(Log.id)).scalars())
+
+
+def total(manager: ConfigManager) -> int:
+    return sum(rollup.count for rollup in manager.get_log_rollups(GUILD_ID, "day", "0000"))
+
+
+def test_rollup_counts_only_new_entries(manager):
+    add_logs(manager, 3)
+    assert manager.rollup_logs(batch_size=2) == 3
+    assert manager.rollup_logs() == 0
+
+    add_logs(manager, 2)
+    assert manager.rollup_logs() == 2
+    assert total(manager) == 5
+
+
+def test_entries_added_after_purge_are_counted(manager):
+    add_logs(manager, 3)
+    assert manager.rollup_logs() == 3
+    purged = log_ids(manager)
+    assert manager.delete_logs(purged) == 3
+
+    add_logs(manager, 1)
+    [new_id] = log_ids(manager)
+    assert new_id > max(purged)
+
+    # Nowy wpis nie jest jeszcze policzony, więc retencja nie może go usunąć
+    assert manager.get_logs_for_archive(10) == []
+    assert manager.rollup_logs() == 1
+    assert total(manager) == 4
+    assert [log["id"] for log in manager.get_logs_for_archive(10)] == [new_id]
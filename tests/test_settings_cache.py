@@ -0,0 +1,39 @@
+"""
+Pamięć podręczna ustawień - ochrona przed nieaktualnym odczytem i ograniczony rozmiar
+"""
+from config.settings_cache import SettingsCache
+
+
+def test_read_started_before_a_write_is_not_cached():
+    cache = SettingsCache()
+
+    generation = cache.generation(1)
+    cache.update(1, "prefix", "!")
+    cache.put(1, {"prefix": "$"}, generation)
+    assert cache.get(1) is None
+
+    cache.put(1, {"prefix": "!"}, cache.generation(1))
+    generation = cache.generation(1)
+    cache.update(1, "prefix", "?")
+    cache.put(1, {"prefix": "!"}, generation)
+    assert cache.get(1)["prefix"] == "?"
+
+
+def test_write_after_eviction_still_rejects_the_stale_read():
+    cache = SettingsCache(max_entries=1)
+    cache.put(1, {"prefix": "$"}, cache.generation(1))
+
+    generation = cache.generation(1)
+    cache.put(2, {}, cache.generation(2))  # wypiera serwer 1
+    cache.update(1, "prefix", "!")
+    cache.put(1, {"prefix": "$"}, generation)
+    assert cache.get(1) is None
+
+
+def test_state_is_bounded_by_max_entries():
+    cache = SettingsCache(max_entries=10)
+    for owner_id in range(1000):
+        cache.update(owner_id, "prefix", "!")
+        cache.put(owner_id, {"prefix": "!"}, cache.generation(owner_id))
+
+    assert len(cache._entries) == 10
@@ -0,0 +1,60 @@
+"""
+Sharding - przeniesienie danych serwera ze wspólnej bazy do jego pliku
+"""
+import os
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import func, select
+
+from config.config_manager import ConfigManager
+from database.models.debt import Debt as DebtRow
+from database.models.debt_balance import DebtBalance
+from database.shard_pool import ShardPolicy
+from models.debt import Debt
+from tests.conftest import GUILD_ID
+
+
+@pytest.fixture
+def paths(tmp_path):
+    return str(tmp_path / "bot_database.db"), str(tmp_path / "guilds")
+
+
+def open_manager(db_path: str, shard_dir: str = "") -> ConfigManager:
+    return ConfigManager(db_path, shard_policy=ShardPolicy(directory=shard_dir))
+
+
+def count(manager: ConfigManager, model) -> int:
+    with manager.engine.connect() as connection:
+        return connection.execute(select(func.count()).select_from(model)).scalar()
+
+
+def test_guild_data_moves_to_shard_and_is_not_copied_again(paths):
+    db_path, shard_dir = paths
+
+    manager = open_manager(db_path)
+    debt = Debt(debtor_id=10, creditor_id=20, amount=Decimal("5.00"), guild_id=GUILD_ID)
+    assert manager.add_debt(debt)
+    manager.close()
+
+    manager = open_manager(db_path, shard_dir)
+    assert manager.settle_debt(debt.debt_id, GUILD_ID)
+    # Po skopiowaniu do pliku serwera wspólna baza nie ma już jego długów ani sald
+    assert count(manager, DebtRow) == 0
+    assert count(manager, DebtBalance) == 0
+    manager.close()
+
+    manager = open_manager(db_path, shard_dir)
+    [reloaded] = manager.get_debts(GUILD_ID)
+    assert reloaded.is_settled
+    manager.close()
+
+    # Nowy plik serwera nie może przywrócić nieaktualnych wierszy ze wspólnej bazy
+    shard_path = os.path.join(shard_dir, f"guild-{GUILD_ID}.db")
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(shard_path + suffix):
+            os.remove(shard_path + suffix)
+    manager = open_manager(db_path, shard_dir)
+    assert manager.get_debts(GUILD_ID) == []
+    assert manager.rebuild_debt_balances(GUILD_ID, verify_only=True) == {"pairs": 0, "mismatches": 0}
+    manager.close()
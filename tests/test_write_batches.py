@@ -0,0 +1,80 @@
+"""
+Partie zapisów (group commit) - błąd jednej operacji nie wpływa na pozostałe
+"""
+import asyncio
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import func, select
+
+from config.async_config_manager import AsyncConfigManager
+from config.config_manager import ConfigManager
+from database.models.log import Log
+from models.debt import Debt
+from tests.conftest import GUILD_ID
+
+
+def debt() -> Debt:
+    return Debt(debtor_id=10, creditor_id=20, amount=Decimal("5.00"), guild_id=GUILD_ID)
+
+
+@pytest.mark.parametrize("manager", ["memory", "file"], indirect=True)
+def test_mixed_batch_with_unknown_log_reference_commits_other_operations(manager):
+    calls = [
+        ("add_debt", (debt(),), {}),
+        ("add_log", (1, GUILD_ID, "INFO", "NO_SUCH_ACTION", "nieznany typ akcji"), {}),
+        ("add_debt", (debt(),), {}),
+        ("add_log", (1, GUILD_ID, "INFO", "ADD_DEBT", "dodano dług"), {}),
+    ]
+
+    outcomes = manager.execute_writes(calls)
+
+    assert [outcome.value for outcome in outcomes] == [True, False, True, True]
+    assert len(manager.get_debts(GUILD_ID)) == 2
+    with manager.engine.connect() as connection:
+        assert connection.execute(select(func.count()).select_from(Log)).scalar() == 1
+
+
+@pytest.mark.parametrize("manager", ["memory", "file"], indirect=True)
+def test_failing_operation_in_batch_is_rolled_back_alone(manager):
+    calls = [
+        ("add_debt", (debt(),), {}),
+        ("add_debt", (None,), {}),
+        ("add_debt", (debt(),), {}),
+    ]
+
+    outcomes = manager.execute_writes(calls)
+
+    assert [outcome.ok for outcome in outcomes] == [True, False, True]
+    assert len(manager.get_debts(GUILD_ID)) == 2
+
+
+def test_sync_writes_from_worker_threads_go_through_writer():
+    async def scenario():
+        manager = AsyncConfigManager(ConfigManager.temporary())
+        manager.start()
+        try:
+            for _ in range(3):
+                await manager.write("add_log", 1, GUILD_ID, "INFO", "ADD_DEBT", "wpis")
+
+            submitted = []
+            submit = manager.writer.submit
+
+            async def recording_submit(name, *args, **kwargs):
+                submitted.append(name)
+                return await submit(name, *args, **kwargs)
+
+            manager.writer.submit = recording_submit
+
+            # Usługi konserwacyjne i import wywołują synchroniczny ConfigManager w puli wątków
+            imported = await manager.run(manager.sync.import_debts, [debt(), debt()])
+            rolled_up = await manager.run(manager.sync.rollup_logs)
+            deleted = await manager.run(manager.sync.delete_logs, [1, 2])
+
+            assert (imported, rolled_up, deleted) == (2, 3, 2)
+            assert submitted == ["import_guild_debts", "rollup_logs_batch", "delete_logs"]
+        finally:
+            await manager.close()
+            manager.sync.close()
+
+    asyncio.run(scenario())
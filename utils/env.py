@@ -0,0 +1,24 @@
+"""
+Odczyt ustawień ze zmiennych środowiskowych
+"""
+import os
+
+
+def env_str(name: str, default: str) -> str:
+    """Zwraca wartość tekstową zmiennej lub wartość domyślną"""
+    value = os.getenv(name)
+    return value.strip() if value and value.strip() else default
+
+
+def env_int(name: str, default: int) -> int:
+    """Zwraca wartość liczbową zmiennej lub wartość domyślną"""
+    value = os.getenv(name)
+    return int(value) if value and value.strip() else default
+
+
+def env_choice(name: str, default: str, choices: tuple) -> str:
+    """Zwraca jedną z dozwolonych wartości (bez rozróżniania wielkości liter)"""
+    value = env_str(name, default).upper()
+    if value not in choices:
+        raise ValueError(f"Nieprawidłowa wartość {name}={value}, dozwolone: {', '.join(choices)}")
+    return value